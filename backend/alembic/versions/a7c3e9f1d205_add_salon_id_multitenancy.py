@@ -0,0 +1,78 @@
+"""multi-tenancy: salon_id on salon data, bot_token/admin_ids on salon_info
+
+Revision ID: a7c3e9f1d205
+Revises: f2b8d1c6a704
+Create Date: 2026-10-19 19:05:12.402871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e9f1d205'
+down_revision: Union[str, None] = 'f2b8d1c6a704'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Таблицы с данными салона (TenantScoped в app.models)
+TENANT_TABLES = (
+    'faq_items',
+    'services',
+    'slots',
+    'bookings',
+    'expenses',
+    'schedule_templates',
+    'revenue_daily',
+    'jobs',
+)
+
+
+def upgrade() -> None:
+    op.add_column('salon_info', sa.Column('bot_token', sa.String(length=100), nullable=True))
+    op.add_column('salon_info', sa.Column('admin_ids', sa.String(length=500), server_default='', nullable=False))
+
+    # Существующие данные принадлежат салону по умолчанию (id=1): единственную
+    # строку salon_info перенумеровываем в 1, а если её нет — создаём
+    op.execute(
+        "UPDATE salon_info SET id = 1 "
+        "WHERE id = (SELECT min(id) FROM salon_info) "
+        "AND NOT EXISTS (SELECT 1 FROM salon_info WHERE id = 1)"
+    )
+    op.execute(
+        "INSERT INTO salon_info "
+        "(id, name, description, address, phone, working_hours_text, instagram, preparation_text, admin_ids) "
+        "SELECT 1, 'Салон', '', '', '', '', '', '', '' "
+        "WHERE NOT EXISTS (SELECT 1 FROM salon_info WHERE id = 1)"
+    )
+    op.execute("SELECT setval(pg_get_serial_sequence('salon_info', 'id'), (SELECT max(id) FROM salon_info))")
+
+    for table in TENANT_TABLES:
+        op.add_column(table, sa.Column('salon_id', sa.Integer(), nullable=True))
+        op.execute(f"UPDATE {table} SET salon_id = 1")
+        op.alter_column(table, 'salon_id', nullable=False)
+        op.create_foreign_key(f'fk_{table}_salon_id', table, 'salon_info', ['salon_id'], ['id'])
+        op.create_index(op.f(f'ix_{table}_salon_id'), table, ['salon_id'], unique=False)
+
+    # Уникальность слотов и шаблонов — в пределах салона
+    op.drop_constraint('uq_slot_datetime', 'slots', type_='unique')
+    op.create_unique_constraint('uq_slot_datetime', 'slots', ['salon_id', 'date', 'start_time', 'end_time'])
+    op.drop_constraint('uq_day_of_week', 'schedule_templates', type_='unique')
+    op.create_unique_constraint('uq_day_of_week', 'schedule_templates', ['salon_id', 'day_of_week'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_day_of_week', 'schedule_templates', type_='unique')
+    op.create_unique_constraint('uq_day_of_week', 'schedule_templates', ['day_of_week'])
+    op.drop_constraint('uq_slot_datetime', 'slots', type_='unique')
+    op.create_unique_constraint('uq_slot_datetime', 'slots', ['date', 'start_time', 'end_time'])
+
+    for table in reversed(TENANT_TABLES):
+        op.drop_index(op.f(f'ix_{table}_salon_id'), table_name=table)
+        op.drop_constraint(f'fk_{table}_salon_id', table, type_='foreignkey')
+        op.drop_column(table, 'salon_id')
+
+    op.drop_column('salon_info', 'admin_ids')
+    op.drop_column('salon_info', 'bot_token')
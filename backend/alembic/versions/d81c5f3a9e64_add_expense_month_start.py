@@ -0,0 +1,31 @@
+"""add expenses.month_start
+
+Revision ID: d81c5f3a9e64
+Revises: b47d2e9f5a13
+Create Date: 2026-10-19 15:08:11.730964
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd81c5f3a9e64'
+down_revision: Union[str, None] = 'b47d2e9f5a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('expenses', sa.Column('month_start', sa.Date(), nullable=True))
+    # "2026-02" -> 2026-02-01 для существующих строк
+    op.execute("UPDATE expenses SET month_start = to_date(month || '-01', 'YYYY-MM-DD')")
+    op.alter_column('expenses', 'month_start', nullable=False)
+    op.create_index(op.f('ix_expenses_month_start'), 'expenses', ['month_start'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_expenses_month_start'), table_name='expenses')
+    op.drop_column('expenses', 'month_start')
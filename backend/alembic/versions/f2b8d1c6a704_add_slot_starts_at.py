@@ -0,0 +1,40 @@
+"""add slots.starts_at / ends_at
+
+Revision ID: f2b8d1c6a704
+Revises: e6a0c4d7b852
+Create Date: 2026-10-19 17:22:45.913207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b8d1c6a704'
+down_revision: Union[str, None] = 'e6a0c4d7b852'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('slots', sa.Column('starts_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('slots', sa.Column('ends_at', sa.DateTime(timezone=True), nullable=True))
+    # date + time — локальное время салона (Минск, UTC+3 без перехода на летнее)
+    op.execute(
+        "UPDATE slots SET "
+        "starts_at = (date + start_time) AT TIME ZONE 'Europe/Minsk', "
+        "ends_at = (date + end_time) AT TIME ZONE 'Europe/Minsk'"
+    )
+    op.alter_column('slots', 'starts_at', nullable=False)
+    op.alter_column('slots', 'ends_at', nullable=False)
+    op.create_index(op.f('ix_slots_starts_at'), 'slots', ['starts_at'], unique=False)
+    op.create_index('ix_slot_status_starts_at', 'slots', ['status', 'starts_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_slot_status_starts_at', table_name='slots')
+    op.drop_index(op.f('ix_slots_starts_at'), table_name='slots')
+    op.drop_column('slots', 'ends_at')
+    op.drop_column('slots', 'starts_at')
@@ -1,23 +1,42 @@
 from datetime import date, datetime, timedelta, timezone
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import contains_eager, joinedload, selectinload
 
 from app.api.deps import get_telegram_user, require_admin
+from app.api.slots import SLOT_CUTOFF_MINUTES
 from app.bot.notifications import (
+    BookingNotice,
     notify_admins_cancelled_booking,
     notify_admins_new_booking,
     notify_admins_rescheduled_booking,
     notify_client_booking_cancelled_by_admin,
     notify_client_booking_confirmed,
     notify_client_booking_rescheduled,
+    notify_bulk_cancelled,
+    notify_bulk_rescheduled,
+)
+from app.core import queries, revenue
+from app.core.cache import invalidate
+from app.core.database import get_db, get_read_db, get_read_session_factory
+from app.core.events import publish_booking, publish_days, publish_slot
+from app.core.export import EXPORT_FORMAT_PATTERN, SessionFactory, export_response
+from app.core.idempotency import Idempotency, StageResponse, idempotency
+from app.models.models import Booking, BookingStatus, Service, Slot, SlotStatus, User
+from app.schemas.schemas import (
+    BookingBulkCancel,
+    BookingBulkReschedule,
+    BookingBulkResult,
+    BookingCreate,
+    BookingReschedule,
+    BookingResponse,
+    SlotRangeFilter,
 )
-from app.core.database import get_db
-from app.models.models import Booking, BookingStatus, SalonInfo, Service, Slot, SlotStatus, User
-from app.schemas.schemas import BookingCreate, BookingReschedule, BookingResponse
 
 router = APIRouter(prefix="/api/bookings", tags=["bookings"])
 logger = logging.getLogger(__name__)
@@ -26,6 +45,8 @@ logger = logging.getLogger(__name__)
 MINSK_TZ = timezone(timedelta(hours=3))
 CANCEL_MIN_HOURS = 10
 
+_booking_json = TypeAdapter(BookingResponse)
+
 _BOOKING_LOAD_OPTIONS = (
     selectinload(Booking.client),
     selectinload(Booking.service),
@@ -35,7 +56,7 @@ _BOOKING_LOAD_OPTIONS = (
 
 async def _get_verified_user(db: AsyncSession, telegram_id: int) -> User:
     """Загружает пользователя и проверяет что профиль заполнен."""
-    result = await db.execute(select(User).where(User.telegram_id == telegram_id))
+    result = await db.execute(queries.user_by_telegram_id(telegram_id))
     user = result.scalar_one_or_none()
     if not user:
         raise HTTPException(status_code=404, detail="Пользователь не найден. Сначала вызовите /api/users/auth")
@@ -46,9 +67,7 @@ async def _get_verified_user(db: AsyncSession, telegram_id: int) -> User:
 
 async def _get_available_slot(db: AsyncSession, slot_id: int) -> Slot:
     """Загружает слот с блокировкой и проверяет доступность."""
-    result = await db.execute(
-        select(Slot).where(Slot.id == slot_id).with_for_update()
-    )
+    result = await db.execute(queries.slot_for_update(slot_id))
     slot = result.scalar_one_or_none()
     if not slot:
         raise HTTPException(status_code=404, detail="Слот не найден")
@@ -62,6 +81,10 @@ async def _get_available_slot(db: AsyncSession, slot_id: int) -> Slot:
     return slot
 
 
+def _dump_booking(booking: Booking) -> bytes:
+    return _booking_json.dump_json(_booking_json.validate_python(booking, from_attributes=True))
+
+
 async def _load_booking_with_relations(db: AsyncSession, booking_id: int) -> Booking:
     """Загружает booking с client, service, slot."""
     result = await db.execute(
@@ -89,7 +112,7 @@ async def _send_new_booking_notifications(booking: Booking, db: AsyncSession) ->
 
     # Загружаем адрес салона для уведомления клиента
     try:
-        salon_result = await db.execute(select(SalonInfo).limit(1))
+        salon_result = await db.execute(queries.salon_info())
         salon = salon_result.scalar_one_or_none()
         salon_address = salon.address if salon else ""
         salon_prep_text = salon.preparation_text if salon else ""
@@ -113,20 +136,28 @@ async def _send_new_booking_notifications(booking: Booking, db: AsyncSession) ->
         logger.error("Failed to notify client %d about booking: %s", booking.client.telegram_id, e)
 
 
-async def _cancel_and_release_slot(booking: Booking, db: AsyncSession) -> Booking:
-    """Общая логика отмены: меняет статус, освобождает слот, коммитит."""
+async def _cancel_and_release_slot(booking: Booking, db: AsyncSession, stage: StageResponse) -> Booking:
+    """Общая логика отмены: меняет статус, освобождает слот, коммитит (ответ — в stage до commit)."""
+    await revenue.apply_transitions(
+        db, [revenue.transition(booking, booking.status, BookingStatus.cancelled)]
+    )
     booking.status = BookingStatus.cancelled
 
     # Восстанавливаем слот только если он был забронирован
-    slot_result = await db.execute(
-        select(Slot).where(Slot.id == booking.slot_id).with_for_update()
-    )
+    slot_result = await db.execute(queries.slot_for_update(booking.slot_id))
     slot = slot_result.scalar_one_or_none()
     if slot and slot.status == SlotStatus.booked:
         slot.status = SlotStatus.available
 
+    await db.flush()
+    booking = await _load_booking_with_relations(db, booking.id)
+    stage(_dump_booking(booking))
     await db.commit()
-    return await _load_booking_with_relations(db, booking.id)
+    await invalidate("slots")
+    if slot:
+        publish_slot(slot)
+    publish_booking("cancelled", booking.id, booking.slot.date)
+    return booking
 
 
 async def _send_cancel_notifications(booking: Booking, by_admin: bool = False) -> None:
@@ -169,9 +200,20 @@ async def create_booking(
     data: BookingCreate,
     tg_user: dict = Depends(get_telegram_user),
     db: AsyncSession = Depends(get_db),
-) -> BookingResponse:
-    """Клиент записывается на свободный слот. telegram_id из initData."""
-    user = await _get_verified_user(db, tg_user["id"])
+    idem: Idempotency = Depends(idempotency),
+) -> Response:
+    """Клиент записывается на свободный слот. telegram_id из initData.
+
+    Повтор с тем же Idempotency-Key возвращает сохранённый ответ.
+    """
+    async def create(stage: StageResponse) -> None:
+        await _create_booking(db, data, tg_user["id"], stage)
+
+    return await idem.run(db, tg_user["id"], create)
+
+
+async def _create_booking(db: AsyncSession, data: BookingCreate, telegram_id: int, stage: StageResponse) -> Booking:
+    user = await _get_verified_user(db, telegram_id)
 
     service = await db.get(Service, data.service_id)
     if not service or not service.is_active:
@@ -188,9 +230,17 @@ async def create_booking(
     )
     slot.status = SlotStatus.booked
     db.add(booking)
+    await revenue.apply_transitions(
+        db, [revenue.Transition(slot.date, service.id, service.price, None, BookingStatus.confirmed)]
+    )
+    await db.flush()
+    booking = await _load_booking_with_relations(db, booking.id)
+    stage(_dump_booking(booking))
     await db.commit()
+    await invalidate("slots")
+    publish_slot(slot)
+    publish_booking("created", booking.id, slot.date)
 
-    booking = await _load_booking_with_relations(db, booking.id)
     await _send_new_booking_notifications(booking, db)
     return booking
 
@@ -198,17 +248,10 @@ async def create_booking(
 @router.get("/my", response_model=list[BookingResponse])
 async def get_my_bookings(
     tg_user: dict = Depends(get_telegram_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> list[BookingResponse]:
     """Записи клиента."""
-    telegram_id = tg_user["id"]
-    result = await db.execute(
-        select(Booking)
-        .join(User)
-        .where(User.telegram_id == telegram_id)
-        .options(*_BOOKING_LOAD_OPTIONS)
-        .order_by(Booking.created_at.desc())
-    )
+    result = await db.execute(queries.bookings_for_client(tg_user["id"]))
     return result.scalars().all()
 
 
@@ -217,9 +260,16 @@ async def cancel_booking(
     booking_id: int,
     tg_user: dict = Depends(get_telegram_user),
     db: AsyncSession = Depends(get_db),
-) -> BookingResponse:
+    idem: Idempotency = Depends(idempotency),
+) -> Response:
     """Клиент отменяет свою запись. Минимум за 10 часов до начала."""
-    telegram_id = tg_user["id"]
+    async def cancel(stage: StageResponse) -> None:
+        await _cancel_booking(db, booking_id, tg_user["id"], stage)
+
+    return await idem.run(db, tg_user["id"], cancel)
+
+
+async def _cancel_booking(db: AsyncSession, booking_id: int, telegram_id: int, stage: StageResponse) -> Booking:
     result = await db.execute(
         select(Booking)
         .join(User)
@@ -242,7 +292,7 @@ async def cancel_booking(
             detail=f"Отмена возможна не позднее чем за {CANCEL_MIN_HOURS} часов до записи",
         )
 
-    booking = await _cancel_and_release_slot(booking, db)
+    booking = await _cancel_and_release_slot(booking, db, stage)
     await _send_cancel_notifications(booking)
     return booking
 
@@ -250,10 +300,18 @@ async def cancel_booking(
 @router.patch("/{booking_id}/admin-cancel", response_model=BookingResponse)
 async def admin_cancel_booking(
     booking_id: int,
-    _admin: int = Depends(require_admin),
+    admin_id: int = Depends(require_admin),
     db: AsyncSession = Depends(get_db),
-) -> BookingResponse:
+    idem: Idempotency = Depends(idempotency),
+) -> Response:
     """Админ отменяет запись клиента (без ограничения по времени)."""
+    async def cancel(stage: StageResponse) -> None:
+        await _admin_cancel_booking(db, booking_id, stage)
+
+    return await idem.run(db, admin_id, cancel)
+
+
+async def _admin_cancel_booking(db: AsyncSession, booking_id: int, stage: StageResponse) -> Booking:
     result = await db.execute(
         select(Booking)
         .where(Booking.id == booking_id)
@@ -266,7 +324,7 @@ async def admin_cancel_booking(
 
     _validate_cancellable(booking)
 
-    booking = await _cancel_and_release_slot(booking, db)
+    booking = await _cancel_and_release_slot(booking, db, stage)
     await _send_cancel_notifications(booking, by_admin=True)
     return booking
 
@@ -275,10 +333,20 @@ async def admin_cancel_booking(
 async def admin_reschedule_booking(
     booking_id: int,
     data: BookingReschedule,
-    _admin: int = Depends(require_admin),
+    admin_id: int = Depends(require_admin),
     db: AsyncSession = Depends(get_db),
-) -> BookingResponse:
+    idem: Idempotency = Depends(idempotency),
+) -> Response:
     """Админ переносит запись клиента на другой слот."""
+    async def reschedule(stage: StageResponse) -> None:
+        await _admin_reschedule_booking(db, booking_id, data, stage)
+
+    return await idem.run(db, admin_id, reschedule)
+
+
+async def _admin_reschedule_booking(
+    db: AsyncSession, booking_id: int, data: BookingReschedule, stage: StageResponse
+) -> Booking:
     # 1. Загружаем booking с блокировкой
     result = await db.execute(
         select(Booking)
@@ -298,17 +366,13 @@ async def admin_reschedule_booking(
         raise HTTPException(status_code=400, detail="Новый слот совпадает с текущим")
 
     # 3. Загружаем старый слот с блокировкой, сохраняем дату/время для уведомления
-    old_slot_result = await db.execute(
-        select(Slot).where(Slot.id == booking.slot_id).with_for_update()
-    )
+    old_slot_result = await db.execute(queries.slot_for_update(booking.slot_id))
     old_slot = old_slot_result.scalar_one()
     old_date_str = str(old_slot.date)
     old_time_str = old_slot.start_time.strftime("%H:%M")
 
     # 4. Загружаем новый слот с блокировкой
-    new_slot_result = await db.execute(
-        select(Slot).where(Slot.id == data.new_slot_id).with_for_update()
-    )
+    new_slot_result = await db.execute(queries.slot_for_update(data.new_slot_id))
     new_slot = new_slot_result.scalar_one_or_none()
     if not new_slot:
         raise HTTPException(status_code=404, detail="Новый слот не найден")
@@ -316,22 +380,33 @@ async def admin_reschedule_booking(
         raise HTTPException(status_code=400, detail="Новый слот недоступен")
 
     # 5. Атомарный swap
+    await revenue.apply_transitions(db, [
+        revenue.Transition(old_slot.date, booking.service_id, booking.service.price, BookingStatus.confirmed, None),
+        revenue.Transition(new_slot.date, booking.service_id, booking.service.price, None, BookingStatus.confirmed),
+    ])
     old_slot.status = SlotStatus.available
     new_slot.status = SlotStatus.booked
     booking.slot_id = data.new_slot_id
     booking.reminded = False
-
-    await db.commit()
+    await db.flush()
 
     # 6. Перезагружаем booking с relations (сохраняем id до expire — иначе MissingGreenlet)
+    #    до commit: ответ сохраняется вместе с переносом
     booking_id_val = booking.id
     db.expire(booking)
     booking = await _load_booking_with_relations(db, booking_id_val)
+    stage(_dump_booking(booking))
+
+    await db.commit()
+    await invalidate("slots")
+    publish_slot(old_slot)
+    publish_slot(new_slot)
+    publish_booking("rescheduled", booking.id, new_slot.date, old_slot.date)
 
     # 7. Уведомления (не блокируют ответ)
     # Загружаем адрес салона для уведомления клиента
     try:
-        salon_result = await db.execute(select(SalonInfo).limit(1))
+        salon_result = await db.execute(queries.salon_info())
         salon = salon_result.scalar_one_or_none()
         salon_address = salon.address if salon else ""
     except Exception as e:
@@ -369,6 +444,166 @@ async def admin_reschedule_booking(
     return booking
 
 
+async def _lock_confirmed_in_range(db: AsyncSession, data: SlotRangeFilter) -> list[Booking]:
+    """Подтверждённые записи диапазона под блокировкой (с client/service/slot)."""
+    result = await db.execute(
+        select(Booking)
+        .join(Slot)
+        .where(Booking.status == BookingStatus.confirmed, *queries.slot_range_conditions(data))
+        .options(*_BOOKING_LOAD_OPTIONS)
+        .order_by(Slot.date, Slot.start_time)
+        .with_for_update(of=Booking)
+    )
+    return list(result.scalars().all())
+
+
+def _notice(booking: Booking, new_slot: Slot | None = None) -> BookingNotice:
+    return BookingNotice(
+        telegram_id=booking.client.telegram_id,
+        first_name=booking.client.first_name,
+        username=booking.client.username,
+        service_name=booking.service.name,
+        slot_date=str(booking.slot.date),
+        slot_time=booking.slot.start_time.strftime("%H:%M"),
+        new_date=str(new_slot.date) if new_slot else None,
+        new_time=new_slot.start_time.strftime("%H:%M") if new_slot else None,
+    )
+
+
+@router.patch("/admin-bulk-cancel", response_model=BookingBulkResult)
+async def admin_bulk_cancel(
+    data: BookingBulkCancel,
+    background_tasks: BackgroundTasks,
+    _admin: int = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+) -> BookingBulkResult:
+    """Админ отменяет все подтверждённые записи диапазона одной транзакцией.
+
+    Уведомления уходят одной пачкой после ответа: клиентам — каждому своё,
+    админам — одна сводка.
+    """
+    bookings = await _lock_confirmed_in_range(db, data)
+    if not bookings:
+        return BookingBulkResult(processed=0)
+
+    notices = [_notice(b) for b in bookings]
+    released = SlotStatus.blocked if data.block_slots else SlotStatus.available
+    await db.execute(
+        update(Booking)
+        .where(Booking.id.in_([b.id for b in bookings]))
+        .values(status=BookingStatus.cancelled)
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        update(Slot)
+        .where(Slot.id.in_([b.slot_id for b in bookings]), Slot.status == SlotStatus.booked)
+        .values(status=released)
+        .execution_options(synchronize_session=False)
+    )
+    await revenue.apply_transitions(
+        db, [revenue.transition(b, BookingStatus.confirmed, BookingStatus.cancelled) for b in bookings]
+    )
+    await db.commit()
+    await invalidate("slots")
+    publish_days(min(b.slot.date for b in bookings), max(b.slot.date for b in bookings))
+    for b in bookings:
+        publish_booking("cancelled", b.id, b.slot.date)
+
+    background_tasks.add_task(notify_bulk_cancelled, notices)
+    return BookingBulkResult(processed=len(bookings))
+
+
+@router.patch("/admin-bulk-reschedule", response_model=BookingBulkResult)
+async def admin_bulk_reschedule(
+    data: BookingBulkReschedule,
+    background_tasks: BackgroundTasks,
+    _admin: int = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+) -> BookingBulkResult:
+    """Админ сдвигает записи диапазона на shift_days дней одной транзакцией.
+
+    Каждая запись переезжает на свободный слот с тем же временем начала;
+    записи без такого слота (или со слотом раньше чем через SLOT_CUTOFF_MINUTES)
+    остаются на месте и возвращаются в skipped.
+    """
+    bookings = await _lock_confirmed_in_range(db, data)
+    if not bookings:
+        return BookingBulkResult(processed=0)
+
+    shift = timedelta(days=data.shift_days)
+    target_dates = {b.slot.date + shift for b in bookings}
+    free_result = await db.execute(
+        select(Slot)
+        .where(Slot.date.in_(target_dates), Slot.status == SlotStatus.available)
+        .with_for_update()
+    )
+    # Как и в выдаче слотов клиенту: на прошедшие и ближайшие слоты не переносим
+    cutoff = datetime.now(MINSK_TZ).replace(tzinfo=None) + timedelta(minutes=SLOT_CUTOFF_MINUTES)
+    free_slots = {
+        (s.date, s.start_time): s
+        for s in free_result.scalars()
+        if datetime.combine(s.date, s.start_time) >= cutoff
+    }
+
+    moves: list[tuple[Booking, Slot]] = []
+    skipped: list[int] = []
+    for booking in bookings:
+        new_slot = free_slots.pop((booking.slot.date + shift, booking.slot.start_time), None)
+        if new_slot is None:
+            skipped.append(booking.id)
+        else:
+            moves.append((booking, new_slot))
+
+    if not moves:
+        return BookingBulkResult(processed=0, skipped=skipped)
+
+    notices = [_notice(b, s) for b, s in moves]
+    released = SlotStatus.blocked if data.block_slots else SlotStatus.available
+    old_slot_ids = [b.slot_id for b, _ in moves]  # до UPDATE: bulk по PK синхронизирует объекты сессии
+    moved = [(b.id, b.slot.date, s.date) for b, s in moves]
+    touched_days = {old for _, old, _ in moved} | {new for _, _, new in moved}
+    transitions = []
+    for b, s in moves:
+        transitions.append(revenue.transition(b, BookingStatus.confirmed, None))
+        transitions.append(
+            revenue.Transition(s.date, b.service_id, b.service.price, None, BookingStatus.confirmed)
+        )
+    await revenue.apply_transitions(db, transitions)
+    # Bulk UPDATE по первичному ключу: один executemany вместо N flush
+    await db.execute(
+        update(Booking),
+        [{"id": b.id, "slot_id": s.id, "reminded": False} for b, s in moves],
+    )
+    await db.execute(
+        update(Slot)
+        .where(Slot.id.in_(old_slot_ids))
+        .values(status=released)
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        update(Slot)
+        .where(Slot.id.in_([s.id for _, s in moves]))
+        .values(status=SlotStatus.booked)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    await invalidate("slots")
+    publish_days(min(touched_days), max(touched_days))
+    for booking_id, old_day, new_day in moved:
+        publish_booking("rescheduled", booking_id, new_day, old_day)
+
+    try:
+        salon_result = await db.execute(queries.salon_info())
+        salon = salon_result.scalar_one_or_none()
+        salon_address = salon.address if salon else ""
+    except Exception as e:
+        logger.error("Failed to load salon info for bulk reschedule notification: %s", e)
+        salon_address = ""
+
+    background_tasks.add_task(notify_bulk_rescheduled, notices, salon_address)
+    return BookingBulkResult(processed=len(moves), skipped=skipped)
+
+
 @router.get("/all", response_model=list[BookingResponse])
 async def get_all_bookings(
     filter_date: date | None = Query(None, alias="date"),
@@ -392,3 +627,58 @@ async def get_all_bookings(
     query = query.order_by(Booking.created_at.desc()).offset(skip).limit(limit)
     result = await db.execute(query)
     return result.scalars().all()
+
+
+EXPORT_COLUMNS = [
+    "id", "date", "start_time", "end_time", "status", "service", "price",
+    "client_name", "client_username", "client_phone", "telegram_id", "created_at",
+]
+
+
+def _booking_row(booking: Booking) -> dict:
+    slot, service, client = booking.slot, booking.service, booking.client
+    return {
+        "id": booking.id,
+        "date": slot.date.isoformat(),
+        "start_time": slot.start_time.strftime("%H:%M"),
+        "end_time": slot.end_time.strftime("%H:%M"),
+        "status": booking.status.value,
+        "service": service.name,
+        "price": float(service.price),
+        "client_name": client.first_name,
+        "client_username": client.username,
+        "client_phone": client.phone,
+        "telegram_id": client.telegram_id,
+        "created_at": booking.created_at.isoformat() if booking.created_at else None,
+    }
+
+
+@router.get("/export")
+async def export_bookings(
+    date_from: date | None = Query(None),
+    date_to: date | None = Query(None),
+    status: str | None = Query(None, pattern="^(confirmed|cancelled|completed|pending)$"),
+    fmt: str = Query("csv", alias="format", pattern=EXPORT_FORMAT_PATTERN),
+    _admin: int = Depends(require_admin),
+    session_factory: SessionFactory = Depends(get_read_session_factory),
+) -> StreamingResponse:
+    """Выгрузка записей (CSV / NDJSON) потоком — для админа, без лимита по строкам."""
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="Начальная дата позже конечной")
+
+    # Все связи many-to-one — берём их JOIN'ом в той же строке: selectinload под
+    # yield_per с фильтром салона (with_loader_criteria) SQLAlchemy не поддерживает
+    query = (
+        select(Booking)
+        .join(Slot)
+        .options(contains_eager(Booking.slot), joinedload(Booking.client), joinedload(Booking.service))
+    )
+    if date_from is not None:
+        query = query.where(Slot.date >= date_from)
+    if date_to is not None:
+        query = query.where(Slot.date <= date_to)
+    if status is not None:
+        query = query.where(Booking.status == status)
+    query = query.order_by(Slot.date, Slot.start_time)
+
+    return export_response(session_factory, query, EXPORT_COLUMNS, _booking_row, fmt, "bookings")
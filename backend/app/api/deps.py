@@ -4,6 +4,7 @@ from fastapi import Depends, Header, HTTPException
 
 from app.core.config import settings
 from app.core.telegram_auth import TelegramAuthError, validate_init_data
+from app.core.tenant import DEFAULT_SALON_ID, get_tenant, set_current_salon, tenant_admin_ids
 
 logger = logging.getLogger(__name__)
 
@@ -11,6 +12,27 @@ logger = logging.getLogger(__name__)
 _DEV_USER = {"id": 0, "username": "dev", "first_name": "Developer"}
 
 
+def _bot_token() -> str | None:
+    # initData подписана ботом того салона, из чьего Mini App пришёл запрос
+    tenant = get_tenant()
+    return tenant.bot_token if tenant else None
+
+
+async def resolve_salon(x_salon_id: int | None = Header(None)) -> int:
+    """Салон запроса по заголовку X-Salon-Id (нет заголовка — салон по умолчанию).
+
+    Глобальная зависимость приложения: выставляет салон в контекст до всех
+    остальных зависимостей, дальше запросы к БД и кэшу идут уже от его имени.
+    async обязательно — sync-зависимость выполнялась бы в потоке, и contextvar
+    не дошёл бы до эндпоинта.
+    """
+    salon_id = DEFAULT_SALON_ID if x_salon_id is None else x_salon_id
+    if get_tenant(salon_id) is None:
+        raise HTTPException(status_code=404, detail="Салон не найден")
+    set_current_salon(salon_id)
+    return salon_id
+
+
 async def get_telegram_user(authorization: str = Header("")) -> dict:
     """Извлекает и валидирует пользователя из Telegram initData.
 
@@ -27,7 +49,7 @@ async def get_telegram_user(authorization: str = Header("")) -> dict:
         # Если заголовок есть — пробуем валидировать, но не падаем
         if authorization.startswith("tma "):
             try:
-                return validate_init_data(authorization[4:])
+                return validate_init_data(authorization[4:], _bot_token())
             except TelegramAuthError:
                 return _DEV_USER
         return _DEV_USER
@@ -41,17 +63,18 @@ async def get_telegram_user(authorization: str = Header("")) -> dict:
 
     init_data = authorization[4:]
     try:
-        return validate_init_data(init_data)
+        return validate_init_data(init_data, _bot_token())
     except TelegramAuthError as e:
         logger.warning("Telegram auth failed: %s", e)
         raise HTTPException(status_code=401, detail="Invalid Telegram authorization")
 
 
 async def require_admin(tg_user: dict = Depends(get_telegram_user)) -> int:
-    """Проверяет что запрос от админа."""
+    """Проверяет что запрос от админа текущего салона."""
     telegram_id = tg_user["id"]
-    if not settings.admin_id_list:
+    admin_ids = tenant_admin_ids()
+    if not admin_ids:
         raise HTTPException(status_code=503, detail="ADMIN_IDS not configured")
-    if telegram_id not in settings.admin_id_list:
+    if telegram_id not in admin_ids:
         raise HTTPException(status_code=403, detail="Admin access required")
     return telegram_id
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from app.api.deps import get_telegram_user
+from app.core.events import hub, sse_stream
+from app.core.tenant import current_salon_id, tenant_admin_ids
+
+router = APIRouter(prefix="/api/events", tags=["events"])
+
+# Content-Encoding выставлен — GZipMiddleware пропускает поток как есть
+# (иначе gzip копит мелкие чанки и события доходят пачками)
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Content-Encoding": "identity",
+    "X-Accel-Buffering": "no",
+}
+
+
+@router.get("/")
+async def stream_events(tg_user: dict = Depends(get_telegram_user)) -> StreamingResponse:
+    """Server-Sent Events: изменения слотов (всем) и записей (админам) в реальном времени."""
+    salon_id = current_salon_id()
+    admin = tg_user["id"] in tenant_admin_ids(salon_id)
+
+    async def events():
+        async with hub.subscribe(salon_id, admin=admin) as sub:
+            async for chunk in sse_stream(sub):
+                yield chunk
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
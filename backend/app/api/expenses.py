@@ -1,18 +1,53 @@
+from datetime import date
+
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import require_admin
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db, get_read_session_factory
+from app.core.export import EXPORT_FORMAT_PATTERN, SessionFactory, export_response
 from app.models.models import Expense
-from app.schemas.schemas import ExpenseCreate, ExpenseResponse
+from app.schemas.schemas import ExpenseCreate, ExpenseMonthTotal, ExpenseResponse
 
 router = APIRouter(prefix="/api/expenses", tags=["expenses"])
 
+MONTH_PATTERN = r"^\d{4}-(0[1-9]|1[0-2])$"
+EXPORT_COLUMNS = ["id", "month", "name", "amount", "created_at"]
+MAX_TOTALS_MONTHS = 36
+
+
+def month_start(month: str) -> date:
+    """"2026-02" -> date(2026, 2, 1)."""
+    return date.fromisoformat(f"{month}-01")
+
+
+def _month_count(first: date, last: date) -> int:
+    return (last.year - first.year) * 12 + last.month - first.month + 1
+
+
+def _month_range(first: date, last: date) -> list[date]:
+    months = []
+    for i in range(_month_count(first, last)):
+        index = first.month - 1 + i
+        months.append(date(first.year + index // 12, index % 12 + 1, 1))
+    return months
+
+
+def _expense_row(expense: Expense) -> dict:
+    return {
+        "id": expense.id,
+        "month": expense.month,
+        "name": expense.name,
+        "amount": float(expense.amount),
+        "created_at": expense.created_at.isoformat() if expense.created_at else None,
+    }
+
 
 @router.get("/", response_model=list[ExpenseResponse])
 async def get_expenses(
-    month: str = Query(..., description="Месяц в формате YYYY-MM", pattern=r"^\d{4}-(0[1-9]|1[0-2])$"),
+    month: str = Query(..., description="Месяц в формате YYYY-MM", pattern=MONTH_PATTERN),
     _admin: int = Depends(require_admin),
     db: AsyncSession = Depends(get_db),
 ) -> list[ExpenseResponse]:
@@ -25,6 +60,59 @@ async def get_expenses(
     return result.scalars().all()
 
 
+@router.get("/export")
+async def export_expenses(
+    month_from: str | None = Query(None, description="С месяца YYYY-MM", pattern=MONTH_PATTERN),
+    month_to: str | None = Query(None, description="По месяц YYYY-MM", pattern=MONTH_PATTERN),
+    fmt: str = Query("csv", alias="format", pattern=EXPORT_FORMAT_PATTERN),
+    _admin: int = Depends(require_admin),
+    session_factory: SessionFactory = Depends(get_read_session_factory),
+) -> StreamingResponse:
+    """Выгрузка расходов (CSV / NDJSON) потоком — для админа."""
+    if month_from and month_to and month_from > month_to:
+        raise HTTPException(status_code=400, detail="Начальный месяц позже конечного")
+
+    query = select(Expense)
+    if month_from is not None:
+        query = query.where(Expense.month_start >= month_start(month_from))
+    if month_to is not None:
+        query = query.where(Expense.month_start <= month_start(month_to))
+    query = query.order_by(Expense.month_start, Expense.id)
+
+    return export_response(session_factory, query, EXPORT_COLUMNS, _expense_row, fmt, "expenses")
+
+
+@router.get("/totals", response_model=list[ExpenseMonthTotal])
+async def get_expense_totals(
+    month_from: str = Query(..., description="С месяца YYYY-MM", pattern=MONTH_PATTERN),
+    month_to: str = Query(..., description="По месяц YYYY-MM", pattern=MONTH_PATTERN),
+    _admin: int = Depends(require_admin),
+    db: AsyncSession = Depends(get_read_db),
+) -> list[ExpenseMonthTotal]:
+    """Суммы расходов по месяцам за период (GROUP BY) — для админа.
+
+    Месяцы без расходов возвращаются с нулём, чтобы годовой P&L строился одним запросом.
+    """
+    first, last = month_start(month_from), month_start(month_to)
+    if first > last:
+        raise HTTPException(status_code=400, detail="Начальный месяц позже конечного")
+    if _month_count(first, last) > MAX_TOTALS_MONTHS:
+        raise HTTPException(status_code=400, detail=f"Период не может быть больше {MAX_TOTALS_MONTHS} месяцев")
+    months = _month_range(first, last)
+
+    result = await db.execute(
+        select(Expense.month_start, func.sum(Expense.amount), func.count(Expense.id))
+        .where(Expense.month_start >= first, Expense.month_start <= last)
+        .group_by(Expense.month_start)
+    )
+    totals = {m: (float(total), count) for m, total, count in result.all()}
+    return [
+        ExpenseMonthTotal(month=f"{m:%Y-%m}", total=total, count=count)
+        for m in months
+        for total, count in [totals.get(m, (0.0, 0))]
+    ]
+
+
 @router.post("/", response_model=ExpenseResponse)
 async def create_expense(
     data: ExpenseCreate,
@@ -32,7 +120,12 @@ async def create_expense(
     db: AsyncSession = Depends(get_db),
 ) -> ExpenseResponse:
     """Админ добавляет расход."""
-    expense = Expense(name=data.name, amount=data.amount, month=data.month)
+    expense = Expense(
+        name=data.name,
+        amount=data.amount,
+        month=data.month,
+        month_start=month_start(data.month),
+    )
     db.add(expense)
     await db.commit()
     await db.refresh(expense)
@@ -1,19 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from pydantic import TypeAdapter
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import require_admin
+from app.core.cache import cached, invalidate
 from app.core.database import get_db
+from app.core.tenant import current_salon_id
 from app.models.models import FaqItem, SalonInfo
 from app.schemas.schemas import FaqCreate, FaqReorder, FaqResponse, FaqUpdate, SalonUpdate
 
 router = APIRouter(prefix="/api", tags=["salon"])
 
+CATALOG_CACHE_TTL = 300  # салон и FAQ меняются редко; админские правки сбрасывают кэш
+_faq_json = TypeAdapter(list[FaqResponse])
+
 
-@router.get("/salon")
-async def get_salon_info(db: AsyncSession = Depends(get_db)) -> dict:
-    result = await db.execute(select(SalonInfo).limit(1))
-    salon = result.scalar_one_or_none()
+def _salon_dict(salon: SalonInfo | None) -> dict:
     if not salon:
         return {
             "name": "Салон",
@@ -33,37 +38,52 @@ async def get_salon_info(db: AsyncSession = Depends(get_db)) -> dict:
     }
 
 
+async def salon_payload(db: AsyncSession) -> bytes:
+    """JSON информации о салоне (через кэш). Общий для эндпоинта и прогрева."""
+    async def load() -> bytes:
+        salon = await db.get(SalonInfo, current_salon_id())
+        return json.dumps(_salon_dict(salon), ensure_ascii=False).encode()
+
+    return await cached("catalog", "salon", CATALOG_CACHE_TTL, load)
+
+
+async def faq_payload(db: AsyncSession) -> bytes:
+    """JSON FAQ (через кэш). Общий для эндпоинта и прогрева."""
+    async def load() -> bytes:
+        result = await db.execute(select(FaqItem).order_by(FaqItem.order_index))
+        return _faq_json.dump_json(_faq_json.validate_python(result.scalars().all(), from_attributes=True))
+
+    return await cached("catalog", "faq", CATALOG_CACHE_TTL, load)
+
+
+@router.get("/salon", response_model=dict)
+async def get_salon_info(db: AsyncSession = Depends(get_db)) -> Response:
+    return Response(await salon_payload(db), media_type="application/json")
+
+
 @router.patch("/salon")
 async def update_salon(
     data: SalonUpdate,
     admin_id: int = Depends(require_admin),
     db: AsyncSession = Depends(get_db),
 ) -> dict:
-    result = await db.execute(select(SalonInfo).limit(1))
-    salon = result.scalar_one_or_none()
+    salon = await db.get(SalonInfo, current_salon_id())
     if not salon:
-        salon = SalonInfo()
+        salon = SalonInfo(id=current_salon_id())
         db.add(salon)
 
     for key, value in data.model_dump(exclude_unset=True).items():
         setattr(salon, key, value)
 
     await db.commit()
+    await invalidate("catalog")
     await db.refresh(salon)
-    return {
-        "name": salon.name,
-        "description": salon.description,
-        "address": salon.address,
-        "phone": salon.phone,
-        "working_hours_text": salon.working_hours_text,
-        "instagram": salon.instagram,
-    }
+    return _salon_dict(salon)
 
 
 @router.get("/faq", response_model=list[FaqResponse])
-async def get_faq(db: AsyncSession = Depends(get_db)) -> list[FaqResponse]:
-    result = await db.execute(select(FaqItem).order_by(FaqItem.order_index))
-    return result.scalars().all()
+async def get_faq(db: AsyncSession = Depends(get_db)) -> Response:
+    return Response(await faq_payload(db), media_type="application/json")
 
 
 @router.post("/faq", response_model=FaqResponse, status_code=201)
@@ -75,6 +95,7 @@ async def create_faq(
     item = FaqItem(**data.model_dump())
     db.add(item)
     await db.commit()
+    await invalidate("catalog")
     await db.refresh(item)
     return item
 
@@ -95,6 +116,7 @@ async def update_faq(
         setattr(item, key, value)
 
     await db.commit()
+    await invalidate("catalog")
     await db.refresh(item)
     return item
 
@@ -112,6 +134,7 @@ async def delete_faq(
 
     await db.delete(item)
     await db.commit()
+    await invalidate("catalog")
 
 
 @router.put("/faq/reorder", response_model=list[FaqResponse])
@@ -131,6 +154,7 @@ async def reorder_faq(
         items_map[faq_id].order_index = idx
 
     await db.commit()
+    await invalidate("catalog")
 
     result = await db.execute(select(FaqItem).order_by(FaqItem.order_index))
     return result.scalars().all()
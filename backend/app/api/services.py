@@ -1,22 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from pydantic import TypeAdapter
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import require_admin
+from app.core import revenue
+from app.core.cache import cached, invalidate
 from app.core.database import get_db
 from app.models.models import Service
 from app.schemas.schemas import ServiceCreate, ServiceResponse, ServiceUpdate
 
 router = APIRouter(prefix="/api/services", tags=["services"])
 
+CATALOG_CACHE_TTL = 300  # услуги меняются редко; админские правки сбрасывают кэш
+_services_json = TypeAdapter(list[ServiceResponse])
+
+
+async def services_payload(db: AsyncSession) -> bytes:
+    """JSON активных услуг (через кэш). Общий для эндпоинта и прогрева."""
+    async def load() -> bytes:
+        result = await db.execute(
+            select(Service).where(Service.is_active.is_(True)).order_by(Service.id)
+        )
+        return _services_json.dump_json(_services_json.validate_python(result.scalars().all(), from_attributes=True))
+
+    return await cached("catalog", "services", CATALOG_CACHE_TTL, load)
+
 
 @router.get("/", response_model=list[ServiceResponse])
-async def get_services(db: AsyncSession = Depends(get_db)) -> list[ServiceResponse]:
+async def get_services(db: AsyncSession = Depends(get_db)) -> Response:
     """Список активных услуг."""
-    result = await db.execute(
-        select(Service).where(Service.is_active.is_(True)).order_by(Service.id)
-    )
-    return result.scalars().all()
+    return Response(await services_payload(db), media_type="application/json")
 
 
 @router.get("/all", response_model=list[ServiceResponse])
@@ -38,6 +52,7 @@ async def create_service(
     service = Service(**data.model_dump())
     db.add(service)
     await db.commit()
+    await invalidate("catalog")
     await db.refresh(service)
     return service
 
@@ -54,10 +69,14 @@ async def update_service(
     if not service:
         raise HTTPException(status_code=404, detail="Service not found")
 
-    for key, value in data.model_dump(exclude_unset=True).items():
+    changes = data.model_dump(exclude_unset=True)
+    if "price" in changes and changes["price"] != float(service.price):
+        await revenue.reprice_service(db, service.id, changes["price"])
+    for key, value in changes.items():
         setattr(service, key, value)
 
     await db.commit()
+    await invalidate("catalog")
     await db.refresh(service)
     return service
 
@@ -79,3 +98,4 @@ async def delete_service(
 
     service.is_active = False
     await db.commit()
+    await invalidate("catalog")
@@ -1,44 +1,97 @@
 from datetime import date, datetime, time, timedelta, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import func, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from pydantic import TypeAdapter
+from sqlalchemy import and_, case, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import require_admin
+from app.core import queries
+from app.core.cache import cached, invalidate
 from app.core.database import get_db
+from app.core.events import publish_days, publish_slot
+from app.core.jobs import JobContext, enqueue, job_handler
+from app.core.occupancy import occupancy_between
+from app.core.schedule import active_templates, day_has_slots, template_slots
 from app.models.models import Slot, SlotStatus
-from app.schemas.schemas import SlotCreate, SlotResponse, SlotUpdate
+from app.schemas.schemas import (
+    JobResponse,
+    SlotBulkUpdate,
+    SlotBulkUpdateResult,
+    SlotCreate,
+    SlotGenerateRange,
+    SlotResponse,
+    SlotUpdate,
+)
 
 router = APIRouter(prefix="/api/slots", tags=["slots"])
 
 MINSK_TZ = timezone(timedelta(hours=3))
 SLOT_CUTOFF_MINUTES = 60
+SLOTS_CACHE_TTL = 30  # секунд; любые изменения слотов/записей сбрасывают кэш сразу
+
+_slots_json = TypeAdapter(list[SlotResponse])
+_availability_json = TypeAdapter(dict[str, int])
+
+
+async def slots_payload(db: AsyncSession, day: date, duration: int | None = None) -> bytes:
+    """JSON свободных слотов на дату (через кэш). Общий для эндпоинта и прогрева."""
+    cutoff = None
+    cache_key = f"day:{day}"
+
+    # Если дата сегодня — убираем слоты, до которых < 30 мин
+    now_minsk = datetime.now(MINSK_TZ)
+    if day == now_minsk.date():
+        cutoff = (now_minsk + timedelta(minutes=SLOT_CUTOFF_MINUTES)).replace(second=0, microsecond=0)
+        cache_key += f":{cutoff:%H%M}"
+    if duration is not None:
+        cache_key += f":d{duration}"
+
+    async def load() -> bytes:
+        result = await db.execute(queries.available_slots_for_day(day, cutoff))
+        slots = result.scalars().all()
+        if duration is not None:
+            occupancy = (await occupancy_between(db, day, day))[day]
+            fits = set(occupancy.start_times(duration))
+            slots = [slot for slot in slots if slot.start_time in fits]
+        return _slots_json.dump_json(_slots_json.validate_python(slots, from_attributes=True))
+
+    return await cached("slots", cache_key, SLOTS_CACHE_TTL, load)
+
+
+async def availability_payload(
+    db: AsyncSession, date_from: date, date_to: date, duration: int | None = None
+) -> bytes:
+    """JSON {дата: число свободных слотов} за диапазон (через кэш); дни без слотов не попадают.
+
+    С duration — число слотов, с которых подряд свободно не меньше duration минут.
+    """
+    async def load() -> bytes:
+        occupancy = await occupancy_between(db, date_from, date_to)
+        counts = {str(day): occ.count(duration) for day, occ in occupancy.items()}
+        return _availability_json.dump_json({day: n for day, n in counts.items() if n})
+
+    cache_key = f"avail:{date_from}:{date_to}" + (f":d{duration}" if duration is not None else "")
+    return await cached("slots", cache_key, SLOTS_CACHE_TTL, load)
 
 
 @router.get("/", response_model=list[SlotResponse])
 async def get_slots(
     date: date = Query(..., description="Дата в формате YYYY-MM-DD"),
+    duration: int | None = Query(None, ge=10, le=480, description="Только слоты, где помещается услуга (мин)"),
     db: AsyncSession = Depends(get_db),
-) -> list[SlotResponse]:
+) -> Response:
     """Свободные слоты на указанную дату (для клиента)."""
-    query = select(Slot).where(Slot.date == date, Slot.status == SlotStatus.available)
-
-    # Если дата сегодня — убираем слоты, до которых < 30 мин
-    now_minsk = datetime.now(MINSK_TZ)
-    if date == now_minsk.date():
-        cutoff = (now_minsk + timedelta(minutes=SLOT_CUTOFF_MINUTES)).time()
-        query = query.where(Slot.start_time >= cutoff)
-
-    result = await db.execute(query.order_by(Slot.start_time))
-    return result.scalars().all()
+    return Response(await slots_payload(db, date, duration), media_type="application/json")
 
 
-@router.get("/availability")
+@router.get("/availability", response_model=dict[str, int])
 async def get_slot_availability(
     date_from: date = Query(..., alias="from", description="Начальная дата YYYY-MM-DD"),
     date_to: date = Query(..., alias="to", description="Конечная дата YYYY-MM-DD"),
+    duration: int | None = Query(None, ge=10, le=480, description="Считать только окна под услугу (мин)"),
     db: AsyncSession = Depends(get_db),
-) -> dict[str, int]:
+) -> Response:
     """Количество свободных слотов по датам (для календаря)."""
     if (date_to - date_from).days > 31:
         raise HTTPException(status_code=400, detail="Максимальный диапазон — 31 день")
@@ -48,17 +101,8 @@ async def get_slot_availability(
     if date_from < today:
         date_from = today
 
-    query = (
-        select(Slot.date, func.count(Slot.id))
-        .where(
-            Slot.date >= date_from,
-            Slot.date <= date_to,
-            Slot.status == SlotStatus.available,
-        )
-        .group_by(Slot.date)
-    )
-    result = await db.execute(query)
-    return {str(row[0]): row[1] for row in result.all()}
+    payload = await availability_payload(db, date_from, date_to, duration)
+    return Response(payload, media_type="application/json")
 
 
 @router.get("/all", response_model=list[SlotResponse])
@@ -115,6 +159,8 @@ async def generate_slots(
         current_minutes = slot_end
 
     await db.commit()
+    await invalidate("slots")
+    publish_days(data.date, data.date)
     # Batch reload instead of N individual refreshes
     result = await db.execute(
         select(Slot).where(Slot.date == data.date).order_by(Slot.start_time)
@@ -122,6 +168,100 @@ async def generate_slots(
     return result.scalars().all()
 
 
+@job_handler("generate_slots_range")
+async def _generate_slots_range_job(ctx: JobContext, date_from: str, date_to: str) -> dict:
+    """Фоновая задача: слоты по шаблонам на каждый день диапазона, коммит по дням."""
+    first, last = date.fromisoformat(date_from), date.fromisoformat(date_to)
+    days = [first + timedelta(days=i) for i in range((last - first).days + 1)]
+    created = days_filled = 0
+
+    async with ctx.session_factory() as db:
+        templates = await active_templates(db)
+        for i, day in enumerate(days, 1):
+            template = templates.get(day.weekday())
+            if template and not await day_has_slots(db, day):
+                slots = template_slots(template, day)
+                db.add_all(slots)
+                await db.commit()
+                created += len(slots)
+                days_filled += 1
+            await ctx.progress(i, len(days), f"{day}")
+
+    if created:
+        await invalidate("slots")
+        publish_days(first, last)
+    return {"created": created, "days": days_filled}
+
+
+@router.post("/generate-range", response_model=JobResponse, status_code=202)
+async def generate_slots_range(
+    data: SlotGenerateRange,
+    admin_id: int = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+) -> JobResponse:
+    """Админ генерирует слоты по шаблонам на диапазон дат. Выполняется в фоне:
+    ответ сразу, прогресс — GET /api/jobs/{id}. Дни, где слоты уже есть, пропускаются.
+    """
+    if data.date_from < datetime.now(MINSK_TZ).date():
+        raise HTTPException(status_code=400, detail="Нельзя создавать слоты на прошедшие даты")
+
+    return await enqueue(
+        db,
+        "generate_slots_range",
+        {"date_from": str(data.date_from), "date_to": str(data.date_to)},
+        created_by=admin_id,
+    )
+
+
+@router.patch("/bulk", response_model=SlotBulkUpdateResult)
+async def bulk_update_slots(
+    data: SlotBulkUpdate,
+    _admin: int = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+) -> SlotBulkUpdateResult:
+    """Админ блокирует/разблокирует диапазон слотов одним UPDATE (выходной, отпуск).
+
+    Занятые слоты не трогаются; прошедшие не открываются.
+    """
+    in_range = queries.slot_range_conditions(data)
+
+    is_past = Slot.starts_at <= datetime.now(MINSK_TZ)
+    is_booked = Slot.status == SlotStatus.booked
+
+    counts = (
+        await db.execute(
+            select(
+                func.count(),
+                func.coalesce(func.sum(case((is_booked, 1), else_=0)), 0),
+                func.coalesce(func.sum(case((and_(~is_booked, is_past), 1), else_=0)), 0),
+            ).where(*in_range)
+        )
+    ).one()
+    matched, skipped_booked = counts[0], counts[1]
+    skipped_past = counts[2] if data.status == "available" else 0
+
+    target = SlotStatus(data.status)
+    conditions = [*in_range, ~is_booked, Slot.status != target]
+    if target == SlotStatus.available:
+        conditions.append(~is_past)
+
+    # Условие "не занят" проверяется в самом UPDATE — параллельная запись не перезапишется
+    result = await db.execute(
+        update(Slot).where(*conditions).values(status=target).execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    if result.rowcount:
+        await invalidate("slots")
+        publish_days(data.date_from, data.date_to)
+
+    return SlotBulkUpdateResult(
+        matched=matched,
+        updated=result.rowcount,
+        skipped_booked=skipped_booked,
+        skipped_past=skipped_past,
+    )
+
+
 @router.patch("/{slot_id}", response_model=SlotResponse)
 async def update_slot(
     slot_id: int,
@@ -163,5 +303,7 @@ async def update_slot(
 
     slot.status = SlotStatus(data.status)
     await db.commit()
+    await invalidate("slots")
     await db.refresh(slot)
+    publish_slot(slot)
     return slot
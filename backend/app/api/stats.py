@@ -0,0 +1,58 @@
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import require_admin
+from app.core.database import get_read_db
+from app.core.revenue import REVENUE_STATUSES
+from app.models.models import BookingStatus, RevenueDaily
+from app.schemas.schemas import RevenuePoint
+
+router = APIRouter(prefix="/api/stats", tags=["stats"])
+
+MAX_RANGE_DAYS = 731
+
+
+@router.get("/revenue", response_model=list[RevenuePoint])
+async def get_revenue(
+    date_from: date = Query(...),
+    date_to: date = Query(...),
+    group: str = Query("day", pattern="^(day|month)$"),
+    _admin: int = Depends(require_admin),
+    db: AsyncSession = Depends(get_read_db),
+) -> list[RevenuePoint]:
+    """Выручка и число записей по дням/месяцам — для админа.
+
+    Читает только свёртку revenue_daily: не больше строк, чем дней × услуг × статусов
+    в периоде, независимо от размера истории записей.
+    """
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="Начальная дата позже конечной")
+    if (date_to - date_from).days > MAX_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail="Период не может быть больше двух лет")
+
+    is_revenue = RevenueDaily.status.in_(REVENUE_STATUSES)
+    result = await db.execute(
+        select(
+            RevenueDaily.day,
+            func.sum(case((is_revenue, RevenueDaily.bookings), else_=0)),
+            func.sum(case((is_revenue, RevenueDaily.revenue), else_=0)),
+            func.sum(case((RevenueDaily.status == BookingStatus.cancelled, RevenueDaily.bookings), else_=0)),
+        )
+        .where(RevenueDaily.day >= date_from, RevenueDaily.day <= date_to)
+        .group_by(RevenueDaily.day)
+        .order_by(RevenueDaily.day)
+    )
+
+    # Дни в периоде ограничены MAX_RANGE_DAYS — месяцы собираем здесь,
+    # без диалектозависимых to_char/strftime
+    points: dict[str, RevenuePoint] = {}
+    for day, bookings, revenue, cancelled in result.all():
+        period = day.isoformat() if group == "day" else f"{day:%Y-%m}"
+        point = points.setdefault(period, RevenuePoint(period=period, bookings=0, revenue=0, cancelled=0))
+        point.bookings += int(bookings or 0)
+        point.revenue += float(revenue or 0)
+        point.cancelled += int(cancelled or 0)
+    return list(points.values())
@@ -0,0 +1,59 @@
+import hmac
+import logging
+
+from fastapi import APIRouter, Header, HTTPException, Request
+from pydantic import ValidationError
+
+from app.bot.bot_instance import get_bot
+from app.core.config import settings
+from app.core.tenant import DEFAULT_SALON_ID, get_tenant
+
+router = APIRouter(prefix="/api/telegram", tags=["telegram"])
+logger = logging.getLogger(__name__)
+
+
+async def _accept_update(request: Request, secret_token: str, salon_id: int) -> dict:
+    if settings.bot_mode != "webhook":
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    if not settings.webhook_secret or not hmac.compare_digest(
+        secret_token.encode(), settings.webhook_secret.encode()
+    ):
+        logger.warning("Webhook request with invalid secret token")
+        raise HTTPException(status_code=401, detail="Invalid secret token")
+
+    if get_tenant(salon_id) is None:
+        raise HTTPException(status_code=404, detail="Салон не найден")
+
+    # aiogram импортируется только в webhook-режиме
+    from aiogram.types import Update
+
+    from app.bot.webhook import enqueue_update
+
+    try:
+        update = Update.model_validate(await request.json(), context={"bot": get_bot(salon_id)})
+    except (ValueError, ValidationError):
+        raise HTTPException(status_code=400, detail="Invalid update")
+
+    if not enqueue_update(update, salon_id):
+        raise HTTPException(status_code=503, detail="Update queue is full")
+    return {"ok": True}
+
+
+@router.post("/webhook")
+async def telegram_webhook(
+    request: Request,
+    x_telegram_bot_api_secret_token: str = Header(""),
+) -> dict:
+    """Приём апдейтов от Telegram (BOT_MODE=webhook). Обработка — в фоне из очереди."""
+    return await _accept_update(request, x_telegram_bot_api_secret_token, DEFAULT_SALON_ID)
+
+
+@router.post("/webhook/{salon_id}")
+async def telegram_salon_webhook(
+    salon_id: int,
+    request: Request,
+    x_telegram_bot_api_secret_token: str = Header(""),
+) -> dict:
+    """Webhook бота салона salon_id (см. app.bot.webhook.webhook_url_for)."""
+    return await _accept_update(request, x_telegram_bot_api_secret_token, salon_id)
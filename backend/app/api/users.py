@@ -5,8 +5,8 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_telegram_user
-from app.core.config import settings
 from app.core.database import get_db
+from app.core.tenant import tenant_admin_ids
 from app.models.models import User, UserRole
 from app.schemas.schemas import UserProfileUpdate, UserResponse
 
@@ -36,7 +36,7 @@ async def auth_user(
         if first_name and user.first_name != first_name:
             user.first_name = first_name
             changed = True
-        expected_role = UserRole.admin if telegram_id in settings.admin_id_list else UserRole.client
+        expected_role = UserRole.admin if telegram_id in tenant_admin_ids() else UserRole.client
         if user.role != expected_role:
             user.role = expected_role
             changed = True
@@ -45,7 +45,7 @@ async def auth_user(
             await db.refresh(user)
         return user
 
-    role = UserRole.admin if telegram_id in settings.admin_id_list else UserRole.client
+    role = UserRole.admin if telegram_id in tenant_admin_ids() else UserRole.client
     user = User(
         telegram_id=telegram_id,
         username=username,
@@ -1,5 +1,59 @@
-from aiogram import Bot
+"""Экземпляры Bot создаются при первом обращении, а не при импорте.
+
+Импорт aiogram — бо́льшая часть холодного старта API; процессы и тесты, которые
+не шлют сообщений, его не платят. `bot` — прокси: `bot.send_message(...)`
+работает как раньше и шлёт от бота текущего салона (app.core.tenant), в API
+aiogram (dp.feed_update, start_polling) передаём настоящий get_bot().
+
+Один Bot на токен: салоны с общим токеном делят и HTTP-сессию.
+"""
+
+from typing import TYPE_CHECKING, Any
 
 from app.core.config import settings
+from app.core.tenant import all_tenants, get_tenant
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+_bots: dict[str, "Bot"] = {}
+
+
+def _token_for(salon_id: int | None) -> str:
+    tenant = get_tenant(salon_id)
+    return tenant.bot_token if tenant else settings.bot_token
+
+
+def get_bot(salon_id: int | None = None) -> "Bot":
+    """Бот салона (по умолчанию — текущего)."""
+    token = _token_for(salon_id)
+    bot = _bots.get(token)
+    if bot is None:
+        from aiogram import Bot
+
+        bot = _bots[token] = Bot(token=token)
+    return bot
+
+
+def all_bots() -> list["Bot"]:
+    """Боты всех салонов без повторов — для polling и регистрации webhook."""
+    seen: dict[str, Bot] = {}
+    for tenant in all_tenants():
+        if tenant.bot_token not in seen:
+            seen[tenant.bot_token] = get_bot(tenant.id)
+    return list(seen.values())
+
+
+async def close_bot() -> None:
+    """Закрывает HTTP-сессии всех созданных ботов."""
+    for bot in _bots.values():
+        await bot.session.close()
+    _bots.clear()
+
+
+class _LazyBot:
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_bot(), name)
+
 
-bot = Bot(token=settings.bot_token)
+bot: "Bot" = _LazyBot()  # type: ignore[assignment]
@@ -0,0 +1,26 @@
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiogram import BaseMiddleware, Dispatcher
+from aiogram.types import TelegramObject
+
+from app.bot.handlers import router as bot_router
+from app.core.tenant import salon_for_token, use_salon
+
+
+class TenantMiddleware(BaseMiddleware):
+    """Апдейт обрабатывается от имени салона, чей бот его получил."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        with use_salon(salon_for_token(data["bot"].token)):
+            return await handler(event, data)
+
+
+dp = Dispatcher()
+dp.update.outer_middleware(TenantMiddleware())
+dp.include_router(bot_router)
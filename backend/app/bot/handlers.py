@@ -3,14 +3,24 @@ from aiogram.filters import CommandStart
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup, Message, WebAppInfo
 
 from app.core.config import settings
+from app.core.tenant import DEFAULT_SALON_ID, current_salon_id, get_tenant
 
 router = Router()
 
 
+def _mini_app_url() -> str:
+    """Mini App один на все салоны; салон передаётся в ?salon= (фронт шлёт его в X-Salon-Id)."""
+    if not settings.mini_app_url or current_salon_id() == DEFAULT_SALON_ID:
+        return settings.mini_app_url
+    separator = "&" if "?" in settings.mini_app_url else "?"
+    return f"{settings.mini_app_url}{separator}salon={current_salon_id()}"
+
+
 @router.message(CommandStart())
 async def cmd_start(message: Message) -> None:
+    tenant = get_tenant()
     text = (
-        f"{settings.salon_name}\n\n"
+        f"{tenant.name if tenant else settings.salon_name}\n\n"
         "Добро пожаловать! Нажмите кнопку ниже для записи."
     )
 
@@ -20,7 +30,7 @@ async def cmd_start(message: Message) -> None:
                 [
                     InlineKeyboardButton(
                         text="Записаться",
-                        web_app=WebAppInfo(url=settings.mini_app_url),
+                        web_app=WebAppInfo(url=_mini_app_url()),
                     )
                 ]
             ]
@@ -0,0 +1,96 @@
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.locks import try_advisory_xact_lock
+from app.models.models import JobRun, JobRunStatus
+
+logger = logging.getLogger(__name__)
+
+# Запуск "running" дольше этого считаем упавшим вместе с процессом — его можно перезанять
+STALE_RUN_AFTER = timedelta(minutes=10)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+async def claim_run(db: AsyncSession, job_name: str, run_key: str) -> bool:
+    """Атомарно занимает запуск (job_name, run_key) во всём кластере.
+
+    False — запуск уже выполнен или прямо сейчас выполняется другим процессом.
+    Advisory lock по имени задачи сериализует конкурирующие claim'ы между репликами.
+    """
+    if not await try_advisory_xact_lock(db, f"job:{job_name}"):
+        return False
+
+    result = await db.execute(
+        select(JobRun).where(JobRun.job_name == job_name, JobRun.run_key == run_key)
+    )
+    run = result.scalar_one_or_none()
+    now = _utcnow()
+
+    if run is None:
+        db.add(JobRun(job_name=job_name, run_key=run_key, status=JobRunStatus.running, started_at=now))
+    elif run.status == JobRunStatus.done:
+        return False
+    elif run.status == JobRunStatus.running and now - run.started_at < STALE_RUN_AFTER:
+        return False
+    else:
+        # Упавший или зависший запуск — повторяем
+        run.status = JobRunStatus.running
+        run.started_at = now
+        run.finished_at = None
+        run.attempts += 1
+
+    await db.commit()
+    return True
+
+
+async def finish_run(db: AsyncSession, job_name: str, run_key: str, ok: bool) -> None:
+    result = await db.execute(
+        select(JobRun).where(JobRun.job_name == job_name, JobRun.run_key == run_key)
+    )
+    run = result.scalar_one_or_none()
+    if run is None:
+        return
+    run.status = JobRunStatus.done if ok else JobRunStatus.failed
+    run.finished_at = _utcnow()
+    await db.commit()
+
+
+@asynccontextmanager
+async def job_run(
+    session_factory: async_sessionmaker, job_name: str, run_key: str
+) -> AsyncIterator[bool]:
+    """Выполняет блок ровно один раз на (job_name, run_key).
+
+    Отдаёт True, если запуск достался этому процессу. Исключение в блоке
+    помечает запуск failed — следующий цикл планировщика повторит его.
+    """
+    async with session_factory() as db:
+        claimed = await claim_run(db, job_name, run_key)
+    if not claimed:
+        yield False
+        return
+
+    ok = False
+    try:
+        yield True
+        ok = True
+    finally:
+        async with session_factory() as db:
+            await finish_run(db, job_name, run_key, ok)
+
+
+async def prune_runs(db: AsyncSession, keep: timedelta) -> int:
+    """Удаляет записи журнала старше keep."""
+    result = await db.execute(
+        delete(JobRun).where(JobRun.started_at < _utcnow() - keep)
+    )
+    await db.commit()
+    return result.rowcount
@@ -1,12 +1,15 @@
 import asyncio
 import logging
+from dataclasses import dataclass
 
 from app.bot.bot_instance import bot
-from app.core.config import settings
+from app.core.tenant import tenant_admin_ids
 
 logger = logging.getLogger(__name__)
 
 SEND_TIMEOUT = 10.0  # секунд на одно сообщение
+BATCH_CONCURRENCY = 5  # параллельных отправок при пакетной рассылке (лимит Telegram ~30 msg/s)
+MAX_MESSAGE_LENGTH = 4096  # лимит Telegram на длину сообщения
 
 # WARNING: все bot.send_message вызовы используют plain text (без parse_mode).
 # Если когда-либо добавите parse_mode="HTML", ВСЕ user-controlled строки
@@ -44,6 +47,35 @@ def _format_client_info(
     return "\n".join(lines)
 
 
+def _cancelled_by_admin_text(service_name: str, slot_date: str, slot_time: str) -> str:
+    return (
+        f"Ваша запись отменена администратором.\n\n"
+        f"Услуга: {service_name}\n"
+        f"Дата: {slot_date}\n"
+        f"Время: {slot_time}\n\n"
+        f"Для повторной записи откройте приложение."
+    )
+
+
+def _rescheduled_text(
+    service_name: str,
+    old_date: str,
+    old_time: str,
+    new_date: str,
+    new_time: str,
+    address: str = "",
+) -> str:
+    lines = [
+        "Ваша запись перенесена администратором.\n",
+        f"Услуга: {service_name}",
+        f"Было: {old_date} в {old_time}",
+        f"Стало: {new_date} в {new_time}",
+    ]
+    if address:
+        lines.append(f"\nАдрес: {address}")
+    return "\n".join(lines)
+
+
 async def notify_admins_new_booking(
     first_name: str | None,
     username: str | None,
@@ -128,13 +160,7 @@ async def notify_client_booking_cancelled_by_admin(
     slot_time: str,
 ) -> None:
     """Уведомляет клиента об отмене записи администратором."""
-    text = (
-        f"Ваша запись отменена администратором.\n\n"
-        f"Услуга: {service_name}\n"
-        f"Дата: {slot_date}\n"
-        f"Время: {slot_time}\n\n"
-        f"Для повторной записи откройте приложение."
-    )
+    text = _cancelled_by_admin_text(service_name, slot_date, slot_time)
     try:
         await asyncio.wait_for(
             bot.send_message(chat_id=telegram_id, text=text),
@@ -175,15 +201,7 @@ async def notify_client_booking_rescheduled(
     address: str = "",
 ) -> None:
     """Уведомляет клиента о переносе записи администратором."""
-    lines = [
-        "Ваша запись перенесена администратором.\n",
-        f"Услуга: {service_name}",
-        f"Было: {old_date} в {old_time}",
-        f"Стало: {new_date} в {new_time}",
-    ]
-    if address:
-        lines.append(f"\nАдрес: {address}")
-    text = "\n".join(lines)
+    text = _rescheduled_text(service_name, old_date, old_time, new_date, new_time, address)
     try:
         await asyncio.wait_for(
             bot.send_message(chat_id=telegram_id, text=text),
@@ -218,7 +236,7 @@ async def notify_admins_rescheduled_booking(
 
 async def _send_to_admins(text: str) -> None:
     """Отправляет сообщение всем админам. Ошибки логируются, не прерывают работу."""
-    for admin_id in settings.admin_id_list:
+    for admin_id in tenant_admin_ids():
         try:
             await asyncio.wait_for(
                 bot.send_message(chat_id=admin_id, text=text),
@@ -226,3 +244,90 @@ async def _send_to_admins(text: str) -> None:
             )
         except Exception as e:
             logger.warning("Failed to send notification to admin %s: %s", admin_id, e)
+
+
+# ── Пакетные уведомления (массовая отмена / перенос) ──
+
+
+@dataclass(frozen=True)
+class BookingNotice:
+    """Данные одной записи для пакетной рассылки."""
+
+    telegram_id: int
+    first_name: str | None
+    username: str | None
+    service_name: str
+    slot_date: str
+    slot_time: str
+    new_date: str | None = None  # для переноса
+    new_time: str | None = None
+
+
+def _short_client_name(notice: BookingNotice) -> str:
+    if notice.first_name:
+        return notice.first_name
+    if notice.username:
+        return f"@{notice.username}"
+    return "(не указан)"
+
+
+def _digest_text(title: str, lines: list[str]) -> str:
+    """Сводка для админов; хвост обрезается, чтобы уложиться в лимит Telegram."""
+    text = f"{title}\n"
+    for i, line in enumerate(lines):
+        tail = f"\n… и ещё {len(lines) - i}"
+        if len(text) + len(line) + 1 + len(tail) > MAX_MESSAGE_LENGTH:
+            return text + tail
+        text += f"\n{line}"
+    return text
+
+
+async def _send_batch(messages: list[tuple[int, str]]) -> int:
+    """Рассылает сообщения клиентам с ограничением параллельности. Возвращает число доставленных."""
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def send(chat_id: int, text: str) -> bool:
+        async with semaphore:
+            try:
+                await asyncio.wait_for(bot.send_message(chat_id=chat_id, text=text), timeout=SEND_TIMEOUT)
+                return True
+            except Exception as e:
+                logger.warning("Failed to send batch notification to %s: %s", chat_id, e)
+                return False
+
+    results = await asyncio.gather(*(send(chat_id, text) for chat_id, text in messages))
+    return sum(results)
+
+
+async def notify_bulk_cancelled(notices: list[BookingNotice]) -> None:
+    """Массовая отмена: каждому клиенту — своё сообщение, админам — одна сводка."""
+    if not notices:
+        return
+    sent = await _send_batch([
+        (n.telegram_id, _cancelled_by_admin_text(n.service_name, n.slot_date, n.slot_time))
+        for n in notices
+    ])
+    lines = [f"{n.slot_date} {n.slot_time} — {_short_client_name(n)}, {n.service_name}" for n in notices]
+    await _send_to_admins(
+        _digest_text(f"❌ Отменено записей: {len(notices)} (клиентам доставлено: {sent})", lines)
+    )
+
+
+async def notify_bulk_rescheduled(notices: list[BookingNotice], address: str = "") -> None:
+    """Массовый перенос: каждому клиенту — своё сообщение, админам — одна сводка."""
+    if not notices:
+        return
+    sent = await _send_batch([
+        (
+            n.telegram_id,
+            _rescheduled_text(n.service_name, n.slot_date, n.slot_time, n.new_date, n.new_time, address),
+        )
+        for n in notices
+    ])
+    lines = [
+        f"{n.slot_date} {n.slot_time} → {n.new_date} {n.new_time} — {_short_client_name(n)}, {n.service_name}"
+        for n in notices
+    ]
+    await _send_to_admins(
+        _digest_text(f"🔄 Перенесено записей: {len(notices)} (клиентам доставлено: {sent})", lines)
+    )
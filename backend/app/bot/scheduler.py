@@ -1,83 +1,152 @@
 import asyncio
 import logging
-from datetime import date, datetime, time, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 
-from sqlalchemy import select, and_
-from sqlalchemy.orm import selectinload
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
 
 from app.bot.bot_instance import bot
+from app.bot.job_ledger import job_run, prune_runs
 from app.bot.notifications import notify_client_post_session
-from app.core.config import settings
-from app.core.database import async_session
-from app.models.models import Booking, BookingStatus, SalonInfo, ScheduleTemplate, Slot, SlotStatus, User, UserRole
+from app.core import queries, revenue
+from app.core.cache import invalidate
+from app.core.database import read_session, scheduler_engine, scheduler_session as async_session
+from app.core.idempotency import prune_keys
+from app.core.jobs import prune_jobs
+from app.core.locks import advisory_unlock, try_advisory_lock
+from app.core.schedule import active_templates, day_has_slots, template_slots
+from app.core.warmup import warm_salon
+from app.core.tenant import DEFAULT_SALON_ID, Tenant, current_salon_id, load_tenants, tenant_admin_ids, use_salon
+from app.models.models import Booking, BookingStatus
 
 logger = logging.getLogger(__name__)
 
 # Europe/Minsk = UTC+3
 MINSK_TZ = timezone(timedelta(hours=3))
 
-# Защита от повторной утренней сводки (in-memory, но с DB-проверкой при старте)
-_last_summary_date: str | None = None
+# Ежедневные задачи: окно, в котором задача (до)выполняется, если ещё не выполнена
+# сегодня. Факт выполнения хранится в журнале job_runs — общий для всех реплик
+# и переживает рестарт, поэтому пропущенное окно догоняется в следующем цикле.
+MORNING_SUMMARY_HOUR = 8
+MORNING_SUMMARY_DEADLINE_HOUR = 12  # позже сводка "Доброе утро" уже не нужна
+AUTO_GENERATE_HOUR = 7
+# Максимум remind_before_hours (BookingCreate): дальше этого напоминания не ищем
+MAX_REMIND_BEFORE_HOURS = 24
+JOB_RUNS_RETENTION = timedelta(days=30)
+# Сколько салонов обрабатывается одновременно: задачи салона — несколько запросов
+# и рассылок, без ограничения большой деплой занял бы весь пул соединений планировщика
+SALON_CONCURRENCY = 4
 
 
-async def run_scheduler() -> None:
-    """Основной цикл планировщика. Проверяет каждые 60 сек."""
-    global _last_summary_date
+# Leader lock: из всех процессов (uvicorn workers, реплики) задачи крутит только один
+SCHEDULER_LOCK_NAME = "scheduler-leader"
+LEADER_RETRY_SECONDS = 30
 
-    # Защита от дублей утренней сводки после рестарта:
-    # Если стартуем после 8:01, считаем что сводка уже была отправлена сегодня
-    now = datetime.now(MINSK_TZ)
-    if now.hour > 8 or (now.hour == 8 and now.minute > 1):
-        _last_summary_date = now.strftime("%Y-%m-%d")
-        logger.info("Scheduler started after 8:01, skipping today's summary")
 
+async def run_scheduler_leader() -> None:
+    """Запускает планировщик, только удерживая Postgres advisory lock.
+
+    Остальные экземпляры ждут в резерве и перехватывают lock, если лидер упал
+    (Postgres снимает session-level lock при обрыве соединения).
+    """
+    while True:
+        try:
+            # AUTOCOMMIT — lock-соединение не висит "idle in transaction" часами
+            async with scheduler_engine.connect() as conn:
+                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                if await try_advisory_lock(conn, SCHEDULER_LOCK_NAME):
+                    logger.info("Scheduler leader lock acquired")
+                    try:
+                        await run_scheduler(lock_conn=conn)
+                    finally:
+                        await advisory_unlock(conn, SCHEDULER_LOCK_NAME)
+                else:
+                    logger.debug("Scheduler leader lock held by another process, standing by")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Scheduler leader lost: %s", e)
+        await asyncio.sleep(LEADER_RETRY_SECONDS)
+
+
+async def run_scheduler(lock_conn: AsyncConnection | None = None) -> None:
+    """Основной цикл планировщика. Проверяет каждые 60 сек.
+
+    lock_conn — соединение с leader lock: пингуем его каждый цикл, при обрыве
+    выходим с ошибкой, чтобы не работать параллельно с новым лидером.
+    """
     logger.info("Scheduler started")
     while True:
-        # Задачи бегут параллельно — падение одной не блокирует остальные
-        results = await asyncio.gather(
-            _check_reminders(),
-            _check_morning_summary(),
-            _auto_complete_bookings(),
-            _auto_generate_slots(),
-            _check_post_session_feedback(),
-            return_exceptions=True,
-        )
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                task_names = [
-                    "_check_reminders", "_check_morning_summary",
-                    "_auto_complete_bookings", "_auto_generate_slots",
-                    "_check_post_session_feedback",
-                ]
-                logger.error("Scheduler %s error: %s", task_names[i], result)
+        if lock_conn is not None:
+            await lock_conn.execute(text("SELECT 1"))
 
+        await run_scheduler_cycle()
         await asyncio.sleep(60)
 
 
+async def run_scheduler_cycle() -> None:
+    """Один проход: задачи каждого салона + общие (чистка журнала и ключей идемпотентности).
+
+    Реестр салонов перечитывается каждый цикл — новый салон подхватывается без рестарта.
+    """
+    try:
+        tenants = await load_tenants(async_session)
+    except Exception as e:
+        logger.error("Scheduler: salon registry not loaded: %s", e)
+        return
+
+    semaphore = asyncio.Semaphore(SALON_CONCURRENCY)
+    await asyncio.gather(*[_run_salon_tasks(tenant, semaphore) for tenant in tenants])
+
+    for task in (_prune_job_runs, _prune_idempotency_keys, _prune_jobs):
+        try:
+            await task()
+        except Exception as e:
+            logger.error("Scheduler %s error: %s", task.__name__, e)
+
+
+async def _run_salon_tasks(tenant: Tenant, semaphore: asyncio.Semaphore) -> None:
+    async with semaphore:
+        # Задачи создаются внутри use_salon и наследуют салон через contextvar
+        with use_salon(tenant.id):
+            tasks = (
+                _check_reminders,
+                _check_morning_summary,
+                _auto_complete_bookings,
+                _auto_generate_slots,
+                _check_post_session_feedback,
+            )
+            # Задачи бегут параллельно — падение одной не блокирует остальные
+            results = await asyncio.gather(*[task() for task in tasks], return_exceptions=True)
+    for task, result in zip(tasks, results):
+        if isinstance(result, Exception):
+            logger.error("Scheduler %s error (salon %d): %s", task.__name__, tenant.id, result)
+
+
+def _job_name(name: str) -> str:
+    """Имя в журнале job_runs: у каждого салона свои ежедневные запуски."""
+    salon_id = current_salon_id()
+    return name if salon_id == DEFAULT_SALON_ID else f"{name}@{salon_id}"
+
+
 async def _check_reminders() -> None:
-    """Отправляет напоминания клиентам перед записью."""
+    """Отправляет напоминания клиентам перед записью (один батч в минуту на кластер)."""
     now_minsk = datetime.now(MINSK_TZ)
 
+    async with job_run(async_session, _job_name("reminders"), now_minsk.strftime("%Y-%m-%dT%H:%M")) as claimed:
+        if claimed:
+            await _send_due_reminders(now_minsk)
+
+
+async def _send_due_reminders(now_minsk: datetime) -> None:
     async with async_session() as db:
         result = await db.execute(
-            select(Booking)
-            .join(Slot)
-            .where(
-                and_(
-                    Booking.status == BookingStatus.confirmed,
-                    Booking.reminded == False,
-                )
-            )
-            .options(
-                selectinload(Booking.client),
-                selectinload(Booking.service),
-                selectinload(Booking.slot),
-            )
+            queries.bookings_to_remind(now_minsk, now_minsk + timedelta(hours=MAX_REMIND_BEFORE_HOURS))
         )
         bookings = result.scalars().all()
 
         # Загружаем адрес салона (один раз для всех напоминаний)
-        salon_result = await db.execute(select(SalonInfo).limit(1))
+        salon_result = await db.execute(queries.salon_info())
         salon = salon_result.scalar_one_or_none()
         salon_address = salon.address if salon else ""
 
@@ -128,39 +197,25 @@ async def _check_reminders() -> None:
 
 
 async def _check_morning_summary() -> None:
-    """Отправляет админам утреннюю сводку записей на день в 8:00 по Минску."""
-    global _last_summary_date
+    """Отправляет админам утреннюю сводку записей на день с 8:00 по Минску.
 
+    Если 8:00 пропущено (рестарт, смена лидера) — досылает до 12:00.
+    """
     now_minsk = datetime.now(MINSK_TZ)
-    today_str = now_minsk.strftime("%Y-%m-%d")
-
-    # Только в 8:00-8:01 (окно 2 мин для 60-сек цикла)
-    if now_minsk.hour != 8 or now_minsk.minute > 1:
+    if not MORNING_SUMMARY_HOUR <= now_minsk.hour < MORNING_SUMMARY_DEADLINE_HOUR:
         return
 
-    if _last_summary_date == today_str:
-        return
+    async with job_run(async_session, _job_name("morning_summary"), now_minsk.strftime("%Y-%m-%d")) as claimed:
+        if claimed:
+            await _send_morning_summary(now_minsk)
 
-    async with async_session() as db:
-        today_date = now_minsk.date()
-        result = await db.execute(
-            select(Booking)
-            .join(Slot)
-            .join(User, Booking.client_id == User.id)
-            .where(
-                and_(
-                    Slot.date == today_date,
-                    Booking.status == BookingStatus.confirmed,
-                    User.role != UserRole.admin,
-                )
-            )
-            .options(
-                selectinload(Booking.client),
-                selectinload(Booking.service),
-                selectinload(Booking.slot),
-            )
-            .order_by(Slot.start_time)
-        )
+
+async def _send_morning_summary(now_minsk: datetime) -> None:
+    today_str = now_minsk.strftime("%Y-%m-%d")
+
+    # Отчёт только читает — идём на реплику, при её отставании на пул планировщика
+    async with read_session(fallback=async_session) as db:
+        result = await db.execute(queries.client_bookings_on_day(now_minsk.date()))
         bookings = result.scalars().all()
 
     if not bookings:
@@ -189,7 +244,7 @@ async def _check_morning_summary() -> None:
         current += footer
         messages.append(current)
 
-    for admin_id in settings.admin_id_list:
+    for admin_id in tenant_admin_ids():
         for msg in messages:
             try:
                 await asyncio.wait_for(
@@ -199,8 +254,6 @@ async def _check_morning_summary() -> None:
             except Exception as e:
                 logger.warning("Failed to send morning summary to admin %s: %s", admin_id, e)
 
-    # Ставим флаг ПОСЛЕ отправки, чтобы retry был возможен при ошибке
-    _last_summary_date = today_str
     logger.info("Morning summary sent for %s (%d bookings)", today_str, len(bookings))
 
 
@@ -209,25 +262,13 @@ async def _auto_complete_bookings() -> None:
     now_minsk = datetime.now(MINSK_TZ)
 
     async with async_session() as db:
-        # Фильтр по дате: только сегодня и ранее (не грузим будущие)
+        # Только уже начавшиеся записи за последнюю неделю (не грузим будущие)
         result = await db.execute(
-            select(Booking)
-            .join(Slot)
-            .where(
-                and_(
-                    Booking.status == BookingStatus.confirmed,
-                    Slot.date <= now_minsk.date(),
-                    Slot.date >= now_minsk.date() - timedelta(days=7),
-                )
-            )
-            .options(
-                selectinload(Booking.slot),
-                selectinload(Booking.service),
-            )
+            queries.confirmed_bookings_started_between(now_minsk - timedelta(days=7), now_minsk)
         )
         bookings = result.scalars().all()
 
-        completed_count = 0
+        completed = []
         for booking in bookings:
             slot = booking.slot
             appointment_dt = datetime.combine(
@@ -237,11 +278,14 @@ async def _auto_complete_bookings() -> None:
             end_dt = appointment_dt + timedelta(minutes=booking.service.duration_minutes)
             if end_dt <= now_minsk:
                 booking.status = BookingStatus.completed
-                completed_count += 1
+                completed.append(
+                    revenue.transition(booking, BookingStatus.confirmed, BookingStatus.completed)
+                )
 
-        if completed_count:
+        if completed:
+            await revenue.apply_transitions(db, completed)
             await db.commit()
-            logger.info("Auto-completed %d past bookings", completed_count)
+            logger.info("Auto-completed %d past bookings", len(completed))
 
 
 FEEDBACK_DELAY_HOURS = 1  # через 1 час после окончания сеанса
@@ -253,20 +297,8 @@ async def _check_post_session_feedback() -> None:
 
     async with async_session() as db:
         result = await db.execute(
-            select(Booking)
-            .join(Slot)
-            .where(
-                and_(
-                    Booking.status == BookingStatus.completed,
-                    Booking.feedback_sent == False,
-                    Slot.date <= now_minsk.date(),
-                    Slot.date >= now_minsk.date() - timedelta(days=7),
-                )
-            )
-            .options(
-                selectinload(Booking.client),
-                selectinload(Booking.service),
-                selectinload(Booking.slot),
+            queries.completed_without_feedback_between(
+                now_minsk - timedelta(days=7), now_minsk - timedelta(hours=FEEDBACK_DELAY_HOURS)
             )
         )
         bookings = result.scalars().all()
@@ -308,37 +340,28 @@ async def _check_post_session_feedback() -> None:
             logger.info("Sent %d post-session feedback messages", sent_count)
 
 
-# Авто-генерация: запускаем раз в день (в 7:00 по Минску)
-_last_autogen_date: str | None = None
-
 AUTO_GENERATE_DAYS_AHEAD = 14
 
 
 async def _auto_generate_slots() -> None:
     """Генерирует слоты на N дней вперёд по шаблонам расписания.
 
-    Запускается раз в день в 7:00 по Минску. Пропускает даты,
-    на которые слоты уже существуют.
+    Запускается раз в день начиная с 7:00 по Минску (пропущенный запуск
+    догоняется позже в тот же день). Пропускает даты, на которые слоты уже существуют.
     """
-    global _last_autogen_date
-
     now_minsk = datetime.now(MINSK_TZ)
-    today_str = now_minsk.strftime("%Y-%m-%d")
-
-    # Раз в день, в окне 7:00-7:01
-    if now_minsk.hour != 7 or now_minsk.minute > 1:
-        return
-    if _last_autogen_date == today_str:
+    if now_minsk.hour < AUTO_GENERATE_HOUR:
         return
 
+    async with job_run(async_session, _job_name("auto_generate_slots"), now_minsk.strftime("%Y-%m-%d")) as claimed:
+        if claimed:
+            await _generate_slots_from_templates(now_minsk)
+
+
+async def _generate_slots_from_templates(now_minsk: datetime) -> None:
     async with async_session() as db:
-        # Загружаем активные шаблоны
-        result = await db.execute(
-            select(ScheduleTemplate).where(ScheduleTemplate.is_active == True)
-        )
-        templates = {t.day_of_week: t for t in result.scalars().all()}
+        templates = await active_templates(db)
         if not templates:
-            _last_autogen_date = today_str
             logger.warning("No active schedule templates — auto-slot generation skipped")
             return
 
@@ -347,38 +370,61 @@ async def _auto_generate_slots() -> None:
 
         for offset in range(AUTO_GENERATE_DAYS_AHEAD):
             target_date = today + timedelta(days=offset)
-            weekday = target_date.weekday()  # 0=Mon..6=Sun
-
-            template = templates.get(weekday)
-            if not template:
-                continue
-
-            # Проверяем: есть ли уже слоты на эту дату?
-            existing = await db.execute(
-                select(Slot.id).where(Slot.date == target_date).limit(1)
-            )
-            if existing.scalar_one_or_none() is not None:
+            template = templates.get(target_date.weekday())  # 0=Mon..6=Sun
+            if not template or await day_has_slots(db, target_date):
                 continue
 
-            # Генерируем слоты по шаблону
-            current_minutes = template.start_time.hour * 60 + template.start_time.minute
-            end_minutes = template.end_time.hour * 60 + template.end_time.minute
-
-            while current_minutes + template.interval_minutes <= end_minutes:
-                slot_end = current_minutes + template.interval_minutes
-                if slot_end > 23 * 60 + 59:
-                    break
-                db.add(Slot(
-                    date=target_date,
-                    start_time=time(current_minutes // 60, current_minutes % 60),
-                    end_time=time(slot_end // 60, slot_end % 60),
-                    status=SlotStatus.available,
-                ))
-                total_created += 1
-                current_minutes = slot_end
+            slots = template_slots(template, target_date)
+            db.add_all(slots)
+            total_created += len(slots)
 
         if total_created:
             await db.commit()
+            await invalidate("slots")
             logger.info("Auto-generated %d slots for next %d days", total_created, AUTO_GENERATE_DAYS_AHEAD)
 
-    _last_autogen_date = today_str
+    if total_created:
+        # Новые дни — в кэш до первого клиента
+        try:
+            await warm_salon(async_session)
+        except Exception as e:
+            logger.warning("Cache rewarm after slot generation failed: %s", e)
+
+
+async def _prune_job_runs() -> None:
+    """Раз в день чистит журнал job_runs (минутные записи напоминаний копятся быстро)."""
+    now_minsk = datetime.now(MINSK_TZ)
+
+    async with job_run(async_session, "prune_job_runs", now_minsk.strftime("%Y-%m-%d")) as claimed:
+        if not claimed:
+            return
+        async with async_session() as db:
+            deleted = await prune_runs(db, JOB_RUNS_RETENTION)
+        if deleted:
+            logger.info("Pruned %d old job runs", deleted)
+
+
+async def _prune_idempotency_keys() -> None:
+    """Раз в день удаляет ключи идемпотентности старше IDEMPOTENCY_TTL (все салоны)."""
+    now_minsk = datetime.now(MINSK_TZ)
+
+    async with job_run(async_session, "prune_idempotency_keys", now_minsk.strftime("%Y-%m-%d")) as claimed:
+        if not claimed:
+            return
+        async with async_session() as db:
+            deleted = await prune_keys(db)
+        if deleted:
+            logger.info("Pruned %d expired idempotency keys", deleted)
+
+
+async def _prune_jobs() -> None:
+    """Раз в день удаляет завершённые фоновые задачи старше JOBS_RETENTION (все салоны)."""
+    now_minsk = datetime.now(MINSK_TZ)
+
+    async with job_run(async_session, "prune_jobs", now_minsk.strftime("%Y-%m-%d")) as claimed:
+        if not claimed:
+            return
+        async with async_session() as db:
+            deleted = await prune_jobs(db)
+        if deleted:
+            logger.info("Pruned %d finished jobs", deleted)
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+
+from aiogram.types import Update
+
+from app.bot.bot_instance import get_bot
+from app.bot.dispatcher import dp
+from app.core.config import settings
+from app.core.tenant import DEFAULT_SALON_ID, all_tenants
+
+logger = logging.getLogger(__name__)
+
+# Ограниченная очередь: при переполнении отвечаем Telegram 503, он повторит доставку.
+# Элемент — (салон, апдейт): салон определяется по URL webhook'а
+_queue: asyncio.Queue[tuple[int, Update]] | None = None
+_workers: list[asyncio.Task] = []
+
+
+async def _process_updates(queue: asyncio.Queue[tuple[int, Update]]) -> None:
+    while True:
+        salon_id, update = await queue.get()
+        try:
+            await dp.feed_update(get_bot(salon_id), update)
+        except Exception as e:
+            logger.error("Failed to process update %s: %s", update.update_id, e)
+        finally:
+            queue.task_done()
+
+
+def start_webhook_workers() -> None:
+    """Создаёт очередь апдейтов и N обработчиков (вызывается из lifespan)."""
+    global _queue
+    _queue = asyncio.Queue(maxsize=settings.webhook_queue_size)
+    _workers.extend(
+        asyncio.create_task(_process_updates(_queue))
+        for _ in range(settings.webhook_workers)
+    )
+    logger.info("Webhook workers started (%d)", settings.webhook_workers)
+
+
+async def stop_webhook_workers() -> None:
+    """Дожидается обработки уже принятых апдейтов и гасит обработчики."""
+    global _queue
+    if _queue is not None:
+        try:
+            await asyncio.wait_for(_queue.join(), timeout=10.0)
+        except asyncio.TimeoutError:
+            logger.warning("Webhook queue not drained, %d updates dropped", _queue.qsize())
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+    _queue = None
+
+
+def enqueue_update(update: Update, salon_id: int = DEFAULT_SALON_ID) -> bool:
+    """Кладёт апдейт в очередь. False — очередь переполнена или не запущена."""
+    if _queue is None:
+        return False
+    try:
+        _queue.put_nowait((salon_id, update))
+    except asyncio.QueueFull:
+        return False
+    return True
+
+
+def webhook_url_for(salon_id: int) -> str:
+    """WEBHOOK_URL для салона по умолчанию, WEBHOOK_URL/<id> — для остальных."""
+    if salon_id == DEFAULT_SALON_ID:
+        return settings.webhook_url
+    return f"{settings.webhook_url.rstrip('/')}/{salon_id}"
+
+
+async def register_webhook() -> None:
+    """Регистрирует webhook каждого бота в Telegram (идемпотентно)."""
+    if not settings.webhook_url or not settings.webhook_secret:
+        raise RuntimeError("BOT_MODE=webhook requires WEBHOOK_URL and WEBHOOK_SECRET")
+    registered: set[str] = set()
+    for tenant in all_tenants():
+        if tenant.bot_token in registered:
+            continue  # общий токен — апдейты приходят на webhook первого салона
+        registered.add(tenant.bot_token)
+        url = webhook_url_for(tenant.id)
+        await get_bot(tenant.id).set_webhook(
+            url=url,
+            secret_token=settings.webhook_secret,
+            allowed_updates=dp.resolve_used_update_types(),
+        )
+        logger.info("Telegram webhook registered: %s", url)
@@ -0,0 +1,194 @@
+"""Общий backend для счётчиков rate limit и кэша ответов.
+
+REDIS_URL задан — Redis (общий для всех воркеров и реплик, переживает рестарт).
+Не задан — MemoryCache в процессе (dev, тесты, демо).
+"""
+
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+
+from app.core.config import settings
+from app.core.single_flight import SingleFlight
+from app.core.tenant import current_salon_id
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(ABC):
+    def __init__(self) -> None:
+        self._flights: SingleFlight[bytes] = SingleFlight()
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None: ...
+
+    @abstractmethod
+    async def incr(self, key: str, ttl: float | None = None) -> int:
+        """Атомарный счётчик. ttl выставляется при создании ключа (fixed window)."""
+
+    async def close(self) -> None:
+        pass
+
+    async def single_flight(self, key: str, producer: Callable[[], Awaitable[bytes]]) -> bytes:
+        """Параллельные промахи по одному ключу ждут одного producer (в пределах процесса)."""
+        return await self._flights.do(key, producer)
+
+
+class MemoryCache(CacheBackend):
+    """In-process LRU с TTL. Stand-in для Redis в тестах и single-process режиме."""
+
+    def __init__(self, max_entries: int = 10_000) -> None:
+        super().__init__()
+        self._data: OrderedDict[str, tuple[float | None, bytes | int]] = OrderedDict()
+        self._max_entries = max_entries
+
+    def _alive(self, key: str) -> tuple[float | None, bytes | int] | None:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at = item[0]
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return item
+
+    def _put(self, key: str, expires_at: float | None, value: bytes | int) -> None:
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self._max_entries:
+            self._data.popitem(last=False)
+
+    async def get(self, key: str) -> bytes | None:
+        item = self._alive(key)
+        if item is None:
+            return None
+        value = item[1]
+        return str(value).encode() if isinstance(value, int) else value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._put(key, time.monotonic() + ttl, value)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._data.pop(key, None)
+
+    async def incr(self, key: str, ttl: float | None = None) -> int:
+        item = self._alive(key)
+        if item is None:
+            expires_at = time.monotonic() + ttl if ttl else None
+            value = 1
+        else:
+            expires_at, value = item[0], int(item[1]) + 1
+        self._put(key, expires_at, value)
+        return value
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+class RedisCache(CacheBackend):
+    """Redis (или любой сервер с Redis-протоколом: KeyDB, Dragonfly, Valkey)."""
+
+    def __init__(self, url: str) -> None:
+        # Опциональная зависимость: нужна только при заданном REDIS_URL
+        from redis.asyncio import Redis
+
+        super().__init__()
+        self._redis = Redis.from_url(url)
+
+    async def get(self, key: str) -> bytes | None:
+        return await self._redis.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._redis.set(key, value, px=int(ttl * 1000))
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self._redis.delete(*keys)
+
+    async def incr(self, key: str, ttl: float | None = None) -> int:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.incr(key)
+            if ttl:
+                # NX: TTL ставится только новому ключу, окно не сдвигается
+                pipe.pexpire(key, int(ttl * 1000), nx=True)
+            value, *_ = await pipe.execute()
+        return int(value)
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+def create_cache_backend(url: str) -> CacheBackend:
+    if url:
+        logger.info("Cache backend: Redis")
+        return RedisCache(url)
+    return MemoryCache()
+
+
+cache: CacheBackend = create_cache_backend(settings.redis_url)
+
+
+# ── Кэш ответов с инвалидацией по пространству имён ──
+# Ключ включает версию пространства; invalidate() поднимает версию —
+# все старые ключи разом становятся недостижимыми и вытекают по TTL.
+# Пространства раздельны по салонам: "slots@2" сбрасывается независимо от "slots@1".
+
+
+def _scoped(namespace: str) -> str:
+    return f"{namespace}@{current_salon_id()}"
+
+
+async def _namespace_version(namespace: str) -> int:
+    raw = await cache.get(f"ns:{namespace}")
+    return int(raw) if raw else 0
+
+
+async def invalidate(namespace: str) -> None:
+    """Сбрасывает кэш пространства текущего салона (например, "slots" после изменения слотов)."""
+    try:
+        await cache.incr(f"ns:{_scoped(namespace)}")
+    except Exception as e:
+        logger.warning("Cache invalidation for %s failed: %s", namespace, e)
+
+
+async def cached(
+    namespace: str,
+    key: str,
+    ttl: float,
+    producer: Callable[[], Awaitable[bytes]],
+) -> bytes:
+    """Возвращает закэшированные байты или строит их через producer.
+
+    Одновременные промахи по одному ключу склеиваются: producer выполняется один
+    раз, остальные запросы получают его результат (без своего соединения с БД).
+    Ошибки кэша не ломают запрос — просто идём в БД.
+    """
+    try:
+        namespace = _scoped(namespace)
+        full_key = f"c:{namespace}:{await _namespace_version(namespace)}:{key}"
+        hit = await cache.get(full_key)
+    except Exception as e:
+        logger.warning("Cache read failed for %s:%s: %s", namespace, key, e)
+        return await producer()
+    if hit is not None:
+        return hit
+
+    async def fill() -> bytes:
+        value = await producer()
+        try:
+            await cache.set(full_key, value, ttl)
+        except Exception as e:
+            logger.warning("Cache write failed for %s:%s: %s", namespace, key, e)
+        return value
+
+    return await cache.single_flight(full_key, fill)
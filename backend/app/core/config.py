@@ -10,10 +10,49 @@ class Settings(BaseSettings):
     bot_token: str
     admin_ids: str = ""  # "446746688,412062038"
     database_url: str  # обязательно из .env, без дефолта
+    database_read_url: str = ""  # read-реплика (опционально); пусто = всё читаем с primary
+    db_read_max_lag_seconds: float = 10.0  # отставание реплики, после которого читаем с primary
     mini_app_url: str = ""
     salon_name: str = "Салон"
     skip_telegram_validation: bool = False
 
+    # ── Общий backend для rate limit и кэша (пусто = in-memory, только один процесс) ──
+    redis_url: str = ""
+    rate_limit: str = "100/minute"
+
+    # ── Фоновые задачи внутри API-процесса ──
+    # Для нескольких API-воркеров выключите оба и запустите `python -m app.worker bot|scheduler`
+    run_bot: bool = True
+    run_scheduler: bool = True
+
+    # ── Фоновые задачи админа (app.core.jobs): воркеров в этом процессе, 0 = не выполнять ──
+    job_workers: int = 2
+
+    # ── Telegram updates: long polling или webhook через FastAPI ──
+    bot_mode: str = "polling"  # "polling" | "webhook"
+    webhook_url: str = ""  # https://<api-host>/api/telegram/webhook
+    webhook_secret: str = ""  # X-Telegram-Bot-Api-Secret-Token
+    webhook_queue_size: int = 100
+    webhook_workers: int = 4
+
+    # ── Пул соединений (API) ──
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0  # секунд ожидания свободного соединения
+    db_pool_recycle: int = 1800  # Neon рвёт idle-соединения — переоткрываем каждые 30 мин
+    db_pool_pre_ping: bool = True  # +1 round trip на checkout; можно выключить при pool_recycle < idle-таймаута
+    # ── Отдельный пул планировщика (не отнимает соединения у API) ──
+    db_scheduler_pool_size: int = 2
+    db_scheduler_max_overflow: int = 2
+    # ── Пул read-реплики ──
+    db_read_pool_size: int = 5
+    db_read_max_overflow: int = 10
+    # ── asyncpg / Postgres session ──
+    db_statement_cache_size: int = 100  # prepared statements на соединение (0 = выкл)
+    db_pgbouncer: bool = False  # transaction pooling (PgBouncer / Neon pooler): без именованных prepared statements
+    db_statement_timeout_ms: int = 0  # 0 = без лимита
+    db_application_name: str = "chocoo-skin"
+
     model_config = {"env_file": str(ENV_FILE), "env_file_encoding": "utf-8", "extra": "ignore"}
 
     @property
@@ -1,18 +1,184 @@
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+import logging
+import time
+from collections.abc import AsyncIterator, Callable
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from uuid import uuid4
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
 from app.core.config import settings
 
-engine = create_async_engine(
-    settings.database_url,
-    echo=False,
-    pool_size=5,
-    max_overflow=10,
-    pool_pre_ping=True,
-    pool_recycle=1800,  # Neon рвёт idle-соединения — переоткрываем каждые 30 мин
+logger = logging.getLogger(__name__)
+
+
+def _connect_args(url: str, role: str) -> dict:
+    """asyncpg-специфичные параметры соединения: кэш prepared statements и server_settings."""
+    if make_url(url).get_driver_name() != "asyncpg":
+        return {}
+
+    server_settings = {"application_name": f"{settings.db_application_name}-{role}"}
+    if settings.db_statement_timeout_ms:
+        server_settings["statement_timeout"] = str(settings.db_statement_timeout_ms)
+
+    args: dict = {"server_settings": server_settings}
+    if settings.db_pgbouncer:
+        # PgBouncer в transaction-режиме не держит prepared statements между транзакциями:
+        # отключаем оба кэша и даём уникальные имена, чтобы не ловить "already exists"
+        args["statement_cache_size"] = 0
+        args["prepared_statement_cache_size"] = 0
+        args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    else:
+        args["statement_cache_size"] = settings.db_statement_cache_size
+        args["prepared_statement_cache_size"] = settings.db_statement_cache_size
+    return args
+
+
+def create_engine_for_role(url: str, role: str, pool_size: int, max_overflow: int) -> AsyncEngine:
+    """Создаёт engine с собственным пулом для роли (api, scheduler)."""
+    if make_url(url).get_backend_name() == "sqlite":
+        # SQLite (тесты, демо) не поддерживает настройки QueuePool
+        return create_async_engine(url, echo=False)
+
+    return create_async_engine(
+        url,
+        echo=False,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        pool_recycle=settings.db_pool_recycle,
+        connect_args=_connect_args(url, role),
+    )
+
+
+engine = create_engine_for_role(
+    settings.database_url, "api", settings.db_pool_size, settings.db_max_overflow
 )
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+# Планировщик ходит в БД через свой пул — фоновые задачи не выедают соединения у API
+scheduler_engine = create_engine_for_role(
+    settings.database_url,
+    "scheduler",
+    settings.db_scheduler_pool_size,
+    settings.db_scheduler_max_overflow,
+)
+scheduler_session = async_sessionmaker(scheduler_engine, class_=AsyncSession, expire_on_commit=False)
+
+ENGINES: dict[str, AsyncEngine] = {"api": engine, "scheduler": scheduler_engine}
+
+# Read-реплика (опционально): некэшируемые GET-эндпоинты, выгрузки и отчёты планировщика
+read_engine: AsyncEngine | None = None
+async_session_read: async_sessionmaker | None = None
+if settings.database_read_url:
+    read_engine = create_engine_for_role(
+        settings.database_read_url,
+        "read",
+        settings.db_read_pool_size,
+        settings.db_read_max_overflow,
+    )
+    async_session_read = async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+    ENGINES["read"] = read_engine
+
+# Отставание реплики в секундах; 0 если реплика догнала primary или это не реплика
+_REPLICA_LAG_SQL = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+REPLICA_CHECK_INTERVAL = 5.0  # секунд между проверками лага (не на каждый запрос)
+
+_replica_ok = True
+_replica_checked_at = 0.0
+
+
+async def _replica_usable() -> bool:
+    """Можно ли читать с реплики: она настроена, доступна и отстаёт не больше лимита."""
+    global _replica_ok, _replica_checked_at
+
+    if read_engine is None:
+        return False
+
+    now = time.monotonic()
+    if now - _replica_checked_at < REPLICA_CHECK_INTERVAL:
+        return _replica_ok
+    _replica_checked_at = now
+
+    try:
+        async with read_engine.connect() as conn:
+            lag = (await conn.execute(_REPLICA_LAG_SQL)).scalar()
+        ok = lag is None or float(lag) <= settings.db_read_max_lag_seconds
+        if not ok:
+            logger.warning("Read replica lag %.1fs exceeds limit, reading from primary", float(lag))
+    except Exception as e:
+        logger.warning("Read replica unavailable, reading from primary: %s", e)
+        ok = False
+
+    _replica_ok = ok
+    return ok
+
+
+POOL_STAT_KEYS = ("pool", "size", "checked_in", "checked_out", "overflow")
+
+
+def pool_stats() -> dict[str, dict]:
+    """Снимок состояния пулов для мониторинга (размер, занятые, overflow).
+
+    Набор ключей одинаков для всех пулов; у пулов без счётчиков (StaticPool/NullPool
+    для SQLite) значения — None.
+    """
+    stats: dict[str, dict] = {}
+    for role, eng in ENGINES.items():
+        pool = eng.pool
+        if not hasattr(pool, "checkedout"):
+            stats[role] = dict.fromkeys(POOL_STAT_KEYS, None) | {"pool": type(pool).__name__}
+            continue
+        stats[role] = {
+            "pool": type(pool).__name__,
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+        }
+    return stats
+
+
+async def dispose_engines() -> None:
+    for eng in ENGINES.values():
+        await eng.dispose()
+
 
 async def get_db() -> AsyncSession:
     async with async_session() as session:
         yield session
+
+
+@asynccontextmanager
+async def read_session(fallback: async_sessionmaker | None = None) -> AsyncIterator[AsyncSession]:
+    """Сессия только для чтения: реплика, если она в строю, иначе primary (fallback)."""
+    maker = async_session_read if await _replica_usable() else (fallback or async_session)
+    async with maker() as session:
+        yield session
+
+
+async def get_read_db() -> AsyncSession:
+    """Dependency для read-only эндпоинтов — не конкурирует с записью на primary.
+
+    Не для ответов через cached(): после invalidate() первый же промах заполнил бы
+    кэш с отстающей реплики, и старое состояние жило бы весь TTL. Кэшируемые
+    эндпоинты читают primary через get_db — в БД идут только промахи кэша.
+    """
+    async with read_session() as session:
+        yield session
+
+
+def get_read_session_factory() -> Callable[[], AbstractAsyncContextManager[AsyncSession]]:
+    """Dependency для стриминговых ответов: фабрика read-сессий.
+
+    Сессия из get_db/get_read_db закрывается до отправки тела StreamingResponse,
+    поэтому генератор открывает свою.
+    """
+    return read_session
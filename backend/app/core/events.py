@@ -0,0 +1,127 @@
+"""Живые события: in-process pub/sub хаб + Server-Sent Events.
+
+Эндпоинты публикуют изменения слотов и записей после commit; GET /api/events
+раздаёт их подписчикам. События:
+
+    slot     — один слот сменил статус (date, slot_id, start_time, end_time, status)
+    days     — в диапазоне дат изменилось много слотов сразу (генерация, массовые
+               операции): клиент перечитывает свой день, если он попал в диапазон
+    booking  — жизненный цикл записи (created / cancelled / rescheduled + old_date),
+               только админам
+    resync   — подписчик не успевал читать и пропустил события: перечитать всё
+
+Подписчик слушает один салон — события других салонов до него не доходят.
+
+Хаб живёт в процессе: при нескольких воркерах каждый раздаёт только свои изменения,
+поэтому клиент по-прежнему перечитывает данные при открытии экрана и переподключении.
+"""
+
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import date
+
+from app.core.tenant import current_salon_id
+from app.models.models import Slot
+
+HEARTBEAT_SECONDS = 15.0  # комментарий-пинг: прокси не рвут простаивающее соединение
+SUBSCRIBER_QUEUE_SIZE = 100
+RETRY_MS = 3000  # через сколько браузер переподключается после обрыва
+
+# Типы событий, которые видят только админы (там id клиентов и записей)
+ADMIN_ONLY = frozenset({"booking"})
+
+
+@dataclass(eq=False)
+class Subscriber:
+    salon_id: int
+    admin: bool = False
+    queue: asyncio.Queue[dict] = field(default_factory=lambda: asyncio.Queue(SUBSCRIBER_QUEUE_SIZE))
+    lagged: bool = False
+
+
+class EventHub:
+    def __init__(self) -> None:
+        self._subscribers: set[Subscriber] = set()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event: dict, salon_id: int | None = None) -> None:
+        """Раздаёт событие подписчикам салона (по умолчанию — текущего).
+
+        Не блокирует: медленный подписчик получает resync.
+        """
+        salon_id = current_salon_id() if salon_id is None else salon_id
+        admin_only = event["type"] in ADMIN_ONLY
+        for sub in self._subscribers:
+            if sub.salon_id != salon_id or (admin_only and not sub.admin):
+                continue
+            try:
+                sub.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                sub.lagged = True
+
+    @asynccontextmanager
+    async def subscribe(self, salon_id: int | None = None, admin: bool = False) -> AsyncIterator[Subscriber]:
+        salon_id = current_salon_id() if salon_id is None else salon_id
+        sub = Subscriber(salon_id=salon_id, admin=admin)
+        self._subscribers.add(sub)
+        try:
+            yield sub
+        finally:
+            self._subscribers.discard(sub)
+
+
+hub = EventHub()
+
+
+def _format(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+async def sse_stream(sub: Subscriber, heartbeat: float = HEARTBEAT_SECONDS) -> AsyncIterator[str]:
+    """Поток text/event-stream для подписчика: события, пинги, resync при переполнении."""
+    yield f"retry: {RETRY_MS}\n\n"
+    while True:
+        if sub.lagged:
+            sub.lagged = False
+            while not sub.queue.empty():
+                sub.queue.get_nowait()
+            yield _format({"type": "resync"})
+            continue
+        try:
+            event = await asyncio.wait_for(sub.queue.get(), timeout=heartbeat)
+        except asyncio.TimeoutError:
+            yield ": ping\n\n"
+            continue
+        yield _format(event)
+
+
+# ── Публикация из эндпоинтов (после commit) ──
+
+
+def publish_slot(slot: Slot) -> None:
+    hub.publish({
+        "type": "slot",
+        "date": str(slot.date),
+        "slot_id": slot.id,
+        "start_time": slot.start_time.strftime("%H:%M"),
+        "end_time": slot.end_time.strftime("%H:%M"),
+        "status": slot.status.value,
+    })
+
+
+def publish_days(date_from: date, date_to: date) -> None:
+    hub.publish({"type": "days", "date_from": str(date_from), "date_to": str(date_to)})
+
+
+def publish_booking(action: str, booking_id: int, day: date, old_day: date | None = None) -> None:
+    """old_day — для переноса: день, с которого запись ушла."""
+    event = {"type": "booking", "action": action, "booking_id": booking_id, "date": str(day)}
+    if old_day is not None:
+        event["old_date"] = str(old_day)
+    hub.publish(event)
@@ -0,0 +1,88 @@
+"""Потоковая выгрузка строк в CSV / NDJSON.
+
+Строки читаются server-side курсором (stream_scalars + yield_per) и уходят
+клиенту пачками — память не зависит от размера выгрузки.
+"""
+
+import csv
+import io
+import json
+import re
+from collections.abc import AsyncIterator, Callable
+from contextlib import AbstractAsyncContextManager
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+EXPORT_BATCH_SIZE = 500
+EXPORT_FORMAT_PATTERN = "^(csv|ndjson)$"
+
+_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+SessionFactory = Callable[[], AbstractAsyncContextManager[AsyncSession]]
+
+# Excel/LibreOffice исполняют ячейку, начинающуюся с этих символов, как формулу
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+# Телефоны и числа ("+375 29 123-45-67", "-5") — без функций и ссылок, их не трогаем
+_PLAIN_NUMBER = re.compile(r"[+-]?[\d\s().-]+")
+
+
+def _csv_cell(value: object) -> object:
+    """Обезвреживает строку из пользовательских данных (имя, телефон) против CSV-инъекции."""
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES) and not _PLAIN_NUMBER.fullmatch(value):
+        return "'" + value
+    return value
+
+
+async def _iter_rows(
+    session_factory: SessionFactory,
+    stmt: Select,
+    columns: list[str],
+    to_row: Callable[[object], dict],
+    fmt: str,
+) -> AsyncIterator[str]:
+    # Сессия открывается внутри генератора: сессия из Depends(get_db)
+    # закрывается раньше, чем StreamingResponse начинает отдавать тело
+    async with session_factory() as session:
+        result = await session.stream_scalars(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+
+        if fmt == "csv":
+            # BOM — чтобы Excel открыл кириллицу без танцев с кодировкой
+            buf = io.StringIO()
+            csv.writer(buf).writerow(columns)
+            yield "\ufeff" + buf.getvalue()
+
+        async for batch in result.partitions():
+            buf = io.StringIO()
+            if fmt == "csv":
+                writer = csv.writer(buf)
+                for obj in batch:
+                    row = to_row(obj)
+                    writer.writerow(_csv_cell(row[c]) for c in columns)
+            else:
+                for obj in batch:
+                    buf.write(json.dumps(to_row(obj), ensure_ascii=False, default=str))
+                    buf.write("\n")
+            # Отданные объекты больше не нужны — не копим их в identity map
+            session.expunge_all()
+            yield buf.getvalue()
+
+
+def export_response(
+    session_factory: SessionFactory,
+    stmt: Select,
+    columns: list[str],
+    to_row: Callable[[object], dict],
+    fmt: str,
+    filename: str,
+) -> StreamingResponse:
+    """StreamingResponse с выгрузкой результата stmt в формате fmt (csv | ndjson)."""
+    return StreamingResponse(
+        _iter_rows(session_factory, stmt, columns, to_row, fmt),
+        media_type=_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
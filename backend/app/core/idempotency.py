@@ -0,0 +1,166 @@
+"""Идемпотентные мутации по заголовку Idempotency-Key.
+
+WebView в Telegram на плохой сети повторяет запрос, ответ на который потерялся.
+Без ключа повтор записи падает с "Слот уже занят" (слот занят самим клиентом),
+а повтор отмены/переноса проходит весь путь заново и снова рассылает уведомления.
+
+С ключом первый запрос выполняется как обычно, а его ответ сохраняется в таблицу
+idempotency_keys (и на несколько минут — в общий кэш, чтобы повтор не ходил в БД).
+Повтор с тем же ключом получает сохранённый ответ с заголовком Idempotent-Replayed,
+не трогая слоты и не отправляя сообщения.
+
+Строка ключа и сохранённый ответ пишутся в той же транзакции, что и сама мутация:
+producer до своего commit передаёт JSON ответа в stage(). Ошибка до commit
+(4xx-валидация) откатывает и ключ — повтор выполнится заново; ошибка после commit
+(уведомления, инвалидация кэша) ключ уже не портит — повтор получит сохранённый
+ответ. Параллельный дубль упирается в уникальный индекс и получает 409, пока
+первый не закончит.
+Ключи живут IDEMPOTENCY_TTL, старые чистит планировщик.
+"""
+
+import hashlib
+import json
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from fastapi import Header, HTTPException, Request, Response
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import cache
+from app.core.tenant import current_salon_id
+from app.models.models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_TTL = timedelta(hours=24)
+FRONT_CACHE_TTL = 600  # повторы приходят в первые минуты; дальше — из таблицы
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+StageResponse = Callable[[bytes], None]
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _json_response(body: bytes, status_code: int, replayed: bool = False) -> Response:
+    headers = {REPLAYED_HEADER: "true"} if replayed else None
+    return Response(body, status_code=status_code, media_type="application/json", headers=headers)
+
+
+@dataclass(frozen=True)
+class Idempotency:
+    key: str | None
+    request_hash: str
+
+    async def run(
+        self,
+        db: AsyncSession,
+        actor_id: int,
+        producer: Callable[[StageResponse], Awaitable[object]],
+        status_code: int = 200,
+    ) -> Response:
+        """Выполняет producer (мутация) не больше одного раза на ключ.
+
+        producer сам делает commit и прямо перед ним вызывает stage(JSON ответа):
+        строка ключа уже добавлена в сессию и сохраняется вместе с его изменениями
+        и ответом. Без заголовка — просто выполняет.
+        """
+        staged: list[bytes] = []
+        record: IdempotencyKey | None = None
+
+        def stage(body: bytes) -> None:
+            staged.append(body)
+            if record is not None:
+                record.status_code = status_code
+                record.response = body.decode()
+
+        if self.key is None:
+            await producer(stage)
+            return _json_response(staged[-1], status_code)
+
+        cache_key = f"idem:{current_salon_id()}:{actor_id}:{self.key}"
+        try:
+            hit = await cache.get(cache_key)
+        except Exception as e:
+            logger.warning("Idempotency cache read failed: %s", e)
+            hit = None
+        if hit is not None:
+            stored = json.loads(hit)
+            return self._replay(stored["request_hash"], stored["status_code"], stored["response"])
+
+        existing = await self._find(db, actor_id)
+        if existing is not None and existing.created_at < _utcnow() - IDEMPOTENCY_TTL:
+            # Истёкший, но ещё не вычищенный ключ — как будто его нет
+            await db.delete(existing)
+            await db.flush()
+            existing = None
+        if existing is not None:
+            return self._replay(existing.request_hash, existing.status_code, existing.response)
+
+        record = IdempotencyKey(
+            actor_id=actor_id, key=self.key, request_hash=self.request_hash, created_at=_utcnow()
+        )
+        db.add(record)
+        try:
+            await db.flush()
+        except IntegrityError:
+            # Параллельный запрос с тем же ключом успел первым
+            await db.rollback()
+            existing = await self._find(db, actor_id)
+            if existing is None:
+                raise HTTPException(status_code=409, detail="Запрос с этим ключом ещё выполняется")
+            return self._replay(existing.request_hash, existing.status_code, existing.response)
+
+        await producer(stage)
+        body = staged[-1]
+
+        try:
+            value = json.dumps({
+                "request_hash": self.request_hash,
+                "status_code": status_code,
+                "response": body.decode(),
+            })
+            await cache.set(cache_key, value.encode(), FRONT_CACHE_TTL)
+        except Exception as e:
+            logger.warning("Idempotency cache write failed: %s", e)
+        return _json_response(body, status_code)
+
+    async def _find(self, db: AsyncSession, actor_id: int) -> IdempotencyKey | None:
+        result = await db.execute(
+            select(IdempotencyKey).where(IdempotencyKey.actor_id == actor_id, IdempotencyKey.key == self.key)
+        )
+        return result.scalar_one_or_none()
+
+    def _replay(self, request_hash: str, status_code: int | None, response: str | None) -> Response:
+        if request_hash != self.request_hash:
+            raise HTTPException(status_code=422, detail="Ключ идемпотентности уже использован для другого запроса")
+        if response is None:
+            raise HTTPException(status_code=409, detail="Запрос с этим ключом ещё выполняется")
+        return _json_response(response.encode(), status_code or 200, replayed=True)
+
+
+async def idempotency(
+    request: Request,
+    idempotency_key: str | None = Header(None, min_length=1, max_length=64),
+) -> Idempotency:
+    """Dependency: ключ из заголовка и отпечаток запроса (метод, путь, тело)."""
+    digest = hashlib.sha256()
+    digest.update(f"{request.method} {request.url.path}\n".encode())
+    digest.update(await request.body())
+    return Idempotency(key=idempotency_key, request_hash=digest.hexdigest())
+
+
+async def prune_keys(db: AsyncSession, keep: timedelta = IDEMPOTENCY_TTL) -> int:
+    """Удаляет ключи старше keep во всех салонах."""
+    result = await db.execute(
+        delete(IdempotencyKey)
+        .where(IdempotencyKey.created_at < _utcnow() - keep)
+        .execution_options(all_salons=True)
+    )
+    await db.commit()
+    return result.rowcount
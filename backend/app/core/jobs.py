@@ -0,0 +1,234 @@
+"""Фоновые задачи админа: таблица jobs + пул asyncio-воркеров.
+
+enqueue() сохраняет задачу и будит воркер этого процесса. Воркер забирает её
+условным UPDATE (status queued -> running, выигрывает ровно один), выполняет
+обработчик по kind и пишет прогресс и результат в ту же строку — статус отдаёт
+GET /api/jobs/{id}. Задачи, поставленные другими репликами, подбираются опросом
+таблицы раз в POLL_INTERVAL. Завершённые задачи старше JOBS_RETENTION удаляет
+планировщик (prune_jobs).
+
+Пул общий для всех салонов: служебные запросы к jobs идут мимо фильтра салона
+(ALL_SALONS), а обработчик выполняется от имени салона, поставившего задачу.
+Задача из локальной очереди выполняется в копии контекста enqueue() — contextvars
+вызывающего (салон, песочница демо) доходят до обработчика.
+"""
+
+import asyncio
+import contextvars
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import async_session
+from app.core.tenant import use_salon
+from app.models.models import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 5.0  # секунд между опросами таблицы, если локальная очередь пуста
+STALE_JOB_AFTER = timedelta(minutes=30)  # "running" дольше — процесс упал, задача не доедет
+MAX_ERROR_LENGTH = 2000
+JOBS_RETENTION = timedelta(days=7)  # статус опрашивают минуты; дальше params/result/error не нужны
+ALL_SALONS = {"all_salons": True}
+
+
+@dataclass
+class JobContext:
+    """Передаётся обработчику: id задачи, фабрика сессий и отчёт о прогрессе."""
+
+    job_id: str
+    session_factory: async_sessionmaker
+
+    async def progress(self, done: int, total: int, message: str = "") -> None:
+        percent = min(100, done * 100 // total) if total else 100
+        async with self.session_factory() as db:
+            await db.execute(
+                update(Job).where(Job.id == self.job_id).values(progress=percent, message=message[:255])
+            )
+            await db.commit()
+
+
+JobHandler = Callable[..., Awaitable[dict | None]]
+HANDLERS: dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str) -> Callable[[JobHandler], JobHandler]:
+    """Регистрирует обработчик: async def handler(ctx: JobContext, **params) -> dict | None."""
+
+    def register(func: JobHandler) -> JobHandler:
+        HANDLERS[kind] = func
+        return func
+
+    return register
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+_queue: asyncio.Queue[tuple[str, contextvars.Context]] | None = None
+_workers: list[asyncio.Task] = []
+
+
+async def enqueue(db: AsyncSession, kind: str, params: dict, created_by: int | None = None) -> Job:
+    """Ставит задачу в очередь и возвращает её (status=queued)."""
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+
+    job = Job(
+        id=uuid4().hex,
+        kind=kind,
+        status=JobStatus.queued,
+        params=params,
+        created_by=created_by,
+        created_at=_utcnow(),
+    )
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+
+    if _queue is not None:
+        _queue.put_nowait((job.id, contextvars.copy_context()))
+    return job
+
+
+async def _claim(session_factory: async_sessionmaker, job_id: str) -> Job | None:
+    async with session_factory() as db:
+        result = await db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == JobStatus.queued)
+            .values(status=JobStatus.running, started_at=_utcnow())
+            .execution_options(**ALL_SALONS)
+        )
+        await db.commit()
+        if result.rowcount != 1:
+            return None  # уже забрал другой воркер
+        return await db.get(Job, job_id, execution_options=ALL_SALONS)
+
+
+async def _finish(session_factory: async_sessionmaker, job_id: str, **values) -> None:
+    async with session_factory() as db:
+        await db.execute(
+            update(Job)
+            .where(Job.id == job_id)
+            .values(finished_at=_utcnow(), **values)
+            .execution_options(**ALL_SALONS)
+        )
+        await db.commit()
+
+
+async def run_job(job_id: str, session_factory: async_sessionmaker = async_session) -> None:
+    """Забирает и выполняет одну задачу. Ошибка обработчика помечает задачу failed."""
+    job = await _claim(session_factory, job_id)
+    if job is None:
+        return
+
+    handler = HANDLERS.get(job.kind)
+    if handler is None:
+        await _finish(session_factory, job_id, status=JobStatus.failed, error=f"Unknown job kind: {job.kind}")
+        return
+
+    logger.info("Job %s (%s) started", job_id, job.kind)
+    try:
+        with use_salon(job.salon_id):
+            result = await handler(JobContext(job_id, session_factory), **(job.params or {}))
+    except Exception as e:
+        logger.exception("Job %s (%s) failed", job_id, job.kind)
+        await _finish(session_factory, job_id, status=JobStatus.failed, error=str(e)[:MAX_ERROR_LENGTH])
+        return
+
+    await _finish(session_factory, job_id, status=JobStatus.done, progress=100, result=result)
+    logger.info("Job %s (%s) done", job_id, job.kind)
+
+
+async def _next_queued(session_factory: async_sessionmaker) -> str | None:
+    async with session_factory() as db:
+        result = await db.execute(
+            select(Job.id)
+            .where(Job.status == JobStatus.queued)
+            .order_by(Job.created_at)
+            .limit(1)
+            .execution_options(**ALL_SALONS)
+        )
+        return result.scalar_one_or_none()
+
+
+async def _worker(
+    queue: asyncio.Queue[tuple[str, contextvars.Context]],
+    session_factory: async_sessionmaker,
+    poll_table: bool,
+) -> None:
+    while True:
+        try:
+            try:
+                job_id, context = await asyncio.wait_for(queue.get(), timeout=POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                if poll_table:
+                    job_id = await _next_queued(session_factory)
+                    if job_id is not None:
+                        await run_job(job_id, session_factory)
+                continue
+            await asyncio.create_task(run_job(job_id, session_factory), context=context)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Job worker error: %s", e)
+            await asyncio.sleep(POLL_INTERVAL)
+
+
+async def fail_stale_jobs(session_factory: async_sessionmaker = async_session) -> int:
+    """Помечает failed задачи, зависшие в running (процесс упал посреди выполнения)."""
+    async with session_factory() as db:
+        result = await db.execute(
+            update(Job)
+            .where(Job.status == JobStatus.running, Job.started_at < _utcnow() - STALE_JOB_AFTER)
+            .values(status=JobStatus.failed, error="Прервана перезапуском сервера", finished_at=_utcnow())
+            .execution_options(**ALL_SALONS)
+        )
+        await db.commit()
+        return result.rowcount
+
+
+async def prune_jobs(db: AsyncSession, keep: timedelta = JOBS_RETENTION) -> int:
+    """Удаляет завершённые (done/failed) задачи старше keep во всех салонах."""
+    result = await db.execute(
+        delete(Job)
+        .where(Job.status.in_((JobStatus.done, JobStatus.failed)), Job.finished_at < _utcnow() - keep)
+        .execution_options(**ALL_SALONS)
+    )
+    await db.commit()
+    return result.rowcount
+
+
+def start_job_workers(
+    count: int | None = None,
+    session_factory: async_sessionmaker = async_session,
+    poll_table: bool = True,
+) -> None:
+    """Запускает пул воркеров (JOB_WORKERS): одновременно выполняется не больше count задач.
+
+    poll_table=False — только задачи, поставленные этим процессом (без опроса таблицы).
+    """
+    global _queue
+    count = settings.job_workers if count is None else count
+    if count <= 0 or _workers:
+        return
+    _queue = asyncio.Queue()
+    for _ in range(count):
+        _workers.append(asyncio.create_task(_worker(_queue, session_factory, poll_table)))
+    logger.info("Job workers started: %d", count)
+
+
+async def stop_job_workers() -> None:
+    global _queue
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+    _queue = None
@@ -0,0 +1,38 @@
+import hashlib
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+
+def lock_key(name: str) -> int:
+    """Стабильный 64-битный ключ advisory lock по имени (одинаковый во всех процессах)."""
+    digest = hashlib.blake2b(name.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def supports_advisory_locks(conn: AsyncConnection | AsyncSession) -> bool:
+    # SQLite (тесты, демо) — один процесс, блокировки не нужны
+    dialect = conn.get_bind().dialect if isinstance(conn, AsyncSession) else conn.dialect
+    return dialect.name == "postgresql"
+
+
+async def try_advisory_lock(conn: AsyncConnection, name: str) -> bool:
+    """Session-level lock: держится, пока жив conn (или до advisory_unlock)."""
+    if not supports_advisory_locks(conn):
+        return True
+    result = await conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": lock_key(name)})
+    return bool(result.scalar())
+
+
+async def advisory_unlock(conn: AsyncConnection, name: str) -> None:
+    if not supports_advisory_locks(conn):
+        return
+    await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": lock_key(name)})
+
+
+async def try_advisory_xact_lock(db: AsyncSession, name: str) -> bool:
+    """Transaction-level lock: снимается автоматически при commit/rollback."""
+    if not supports_advisory_locks(db):
+        return True
+    result = await db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": lock_key(name)})
+    return bool(result.scalar())
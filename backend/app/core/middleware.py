@@ -0,0 +1,63 @@
+"""Заголовки безопасности и аудит мутаций — одним чистым ASGI-middleware.
+
+@app.middleware("http") (BaseHTTPMiddleware) на каждый запрос заводит отдельную
+задачу для call_next, оборачивает тело ответа в поток через memory object stream
+и собирает Request/Response; два таких слоя удваивали эту цену, а SSE
+(/api/events) шёл через них кусок за куском.
+
+SecurityMiddleware только подменяет send: в http.response.start дописывает
+заранее собранные байтовые пары заголовков и пишет строку AUDIT для
+POST/PATCH/PUT/DELETE. Тело ответа проходит без изменений.
+"""
+
+import logging
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+SECURITY_HEADERS: dict[str, str] = {
+    "X-Frame-Options": "DENY",
+    "X-Content-Type-Options": "nosniff",
+    "Referrer-Policy": "strict-origin-when-cross-origin",
+    "Strict-Transport-Security": "max-age=31536000; includeSubDomains",
+    "Permissions-Policy": "camera=(), microphone=(), geolocation=()",
+    "Content-Security-Policy": (
+        "default-src 'self'; "
+        "script-src 'self'; "
+        "style-src 'self' 'unsafe-inline'; "
+        "img-src 'self' data: https:; "
+        "connect-src 'self'; "
+        "frame-ancestors 'none'"
+    ),
+}
+
+AUDITED_METHODS = frozenset({"POST", "PATCH", "PUT", "DELETE"})
+
+_HEADER_PAIRS = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in SECURITY_HEADERS.items()]
+_HEADER_NAMES = frozenset(name for name, _ in _HEADER_PAIRS)
+
+
+class SecurityMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        audited = method in AUDITED_METHODS
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Значения эндпоинта перекрываются нашими, как раньше response.headers[...] = ...
+                headers = [pair for pair in message.get("headers", ()) if pair[0] not in _HEADER_NAMES]
+                headers.extend(_HEADER_PAIRS)
+                message["headers"] = headers
+                if audited:
+                    logger.info("AUDIT %s %s -> %d", method, scope["path"], message["status"])
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
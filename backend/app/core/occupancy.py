@@ -0,0 +1,176 @@
+"""Компактная занятость слотов по дням: битовые маски вместо строк Slot.
+
+День — сетка ячеек от начала первого слота с шагом grid минут, где grid — НОД
+всех границ слотов дня (обычно равен интервалу шаблона: 10–30 мин), поэтому
+сетка точная при любых временах слотов. Две маски по ячейкам:
+
+    starts — ячейки, с которых начинается свободный слот
+    free   — ячейки, покрытые свободными слотами
+
+Свободных слотов — счётчик в заголовке (O(1)), окна под услугу длительностью D —
+ячейки, с которых начинается серия из ceil(D / grid) единиц в free, пересечённая
+со starts; серия ищется за O(log k) сдвигов маски, без обхода слотов.
+
+Занятость месяца собирается одним запросом по колонкам (без ORM-объектов) и
+хранится в кэше ответов как байты в пространстве "slots": любая мутация слотов
+уже вызывает invalidate("slots"), так что маски перестраиваются при следующем
+чтении — одинаково во всех воркерах. День со слотами — 12 байт заголовка и две
+маски по ceil(cells / 8) байт: около байта на слот при шаге 20 минут.
+"""
+
+import struct
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import date, time, timedelta
+from math import gcd
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import queries
+from app.core.cache import cached
+from app.models.models import SlotStatus
+
+OCCUPANCY_CACHE_TTL = 300  # мутации слотов сбрасывают "slots" сразу; TTL — страховка
+
+# grid, origin (минуты от полуночи), cells, free_count, booked, blocked
+_DAY_HEADER = struct.Struct("<6H")
+_MONTH_HEADER = struct.Struct("<IB")  # ordinal первого дня, число дней
+
+
+def _minutes(t: time) -> int:
+    return t.hour * 60 + t.minute
+
+
+def _iter_bits(mask: int) -> Iterator[int]:
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+@dataclass(frozen=True, slots=True)
+class DayOccupancy:
+    grid: int = 1
+    origin: int = 0
+    cells: int = 0
+    starts: int = 0
+    free: int = 0
+    free_count: int = 0
+    booked: int = 0
+    blocked: int = 0
+
+    @classmethod
+    def from_slots(cls, rows: Iterable[tuple[time, time, SlotStatus]]) -> "DayOccupancy":
+        """rows — (start_time, end_time, status) слотов одного дня."""
+        spans = [(_minutes(start), _minutes(end), status) for start, end, status in rows]
+        if not spans:
+            return cls()
+
+        origin = min(start for start, _, _ in spans)
+        grid = 0
+        for start, end, _ in spans:
+            grid = gcd(grid, gcd(start - origin, end - origin))
+        grid = grid or 1  # единственный слот нулевой длины
+        cells = (max(end for _, end, _ in spans) - origin) // grid
+
+        starts = free = free_count = booked = blocked = 0
+        for start, end, status in spans:
+            if status == SlotStatus.available:
+                first, last = (start - origin) // grid, (end - origin) // grid
+                starts |= 1 << first
+                free |= ((1 << (last - first)) - 1) << first
+                free_count += 1
+            elif status == SlotStatus.booked:
+                booked += 1
+            else:
+                blocked += 1
+        return cls(grid, origin, cells, starts, free, free_count, booked, blocked)
+
+    def fitting_starts(self, duration_minutes: int) -> int:
+        """Маска ячеек-начал свободных слотов, от которых свободно не меньше duration_minutes подряд."""
+        need = -(-duration_minutes // self.grid)  # ceil
+        runs, span = self.free, 1
+        while span < need:
+            step = min(span, need - span)
+            runs &= runs >> step  # бит c: свободны ячейки c .. c + span + step - 1
+            span += step
+        return runs & self.starts
+
+    def count(self, duration_minutes: int | None = None) -> int:
+        if duration_minutes is None:
+            return self.free_count
+        return self.fitting_starts(duration_minutes).bit_count()
+
+    def start_times(self, duration_minutes: int | None = None) -> list[time]:
+        """Времена начала свободных слотов (где помещается услуга duration_minutes)."""
+        mask = self.starts if duration_minutes is None else self.fitting_starts(duration_minutes)
+        result = []
+        for cell in _iter_bits(mask):
+            minute = self.origin + cell * self.grid
+            result.append(time(minute // 60, minute % 60))
+        return result
+
+    def to_bytes(self) -> bytes:
+        width = (self.cells + 7) // 8
+        return (
+            _DAY_HEADER.pack(self.grid, self.origin, self.cells, self.free_count, self.booked, self.blocked)
+            + self.starts.to_bytes(width, "little")
+            + self.free.to_bytes(width, "little")
+        )
+
+    @classmethod
+    def from_buffer(cls, buf: bytes, offset: int) -> tuple["DayOccupancy", int]:
+        grid, origin, cells, free_count, booked, blocked = _DAY_HEADER.unpack_from(buf, offset)
+        offset += _DAY_HEADER.size
+        width = (cells + 7) // 8
+        starts = int.from_bytes(buf[offset:offset + width], "little")
+        free = int.from_bytes(buf[offset + width:offset + 2 * width], "little")
+        return cls(grid, origin, cells, starts, free, free_count, booked, blocked), offset + 2 * width
+
+
+def encode_days(first: date, days: list[DayOccupancy]) -> bytes:
+    return _MONTH_HEADER.pack(first.toordinal(), len(days)) + b"".join(day.to_bytes() for day in days)
+
+
+def decode_days(buf: bytes) -> dict[date, DayOccupancy]:
+    first, count = _MONTH_HEADER.unpack_from(buf)
+    offset = _MONTH_HEADER.size
+    result = {}
+    for i in range(count):
+        day, offset = DayOccupancy.from_buffer(buf, offset)
+        result[date.fromordinal(first + i)] = day
+    return result
+
+
+def _month_bounds(day: date) -> tuple[date, date]:
+    first = day.replace(day=1)
+    following = (first + timedelta(days=32)).replace(day=1)
+    return first, following - timedelta(days=1)
+
+
+async def _month(db: AsyncSession, first: date, last: date) -> dict[date, DayOccupancy]:
+    async def load() -> bytes:
+        result = await db.execute(queries.slot_spans_between(first, last))
+        by_day: dict[date, list[tuple[time, time, SlotStatus]]] = {}
+        for day, start, end, status in result.all():
+            by_day.setdefault(day, []).append((start, end, status))
+        days = [
+            DayOccupancy.from_slots(by_day.get(first + timedelta(days=i), ()))
+            for i in range((last - first).days + 1)
+        ]
+        return encode_days(first, days)
+
+    return decode_days(await cached("slots", f"occ:{first:%Y-%m}", OCCUPANCY_CACHE_TTL, load))
+
+
+async def occupancy_between(db: AsyncSession, date_from: date, date_to: date) -> dict[date, DayOccupancy]:
+    """Занятость по дням [date_from, date_to] — из масок по месяцам (кэш или один запрос на месяц)."""
+    result: dict[date, DayOccupancy] = {}
+    month = date_from.replace(day=1)
+    while month <= date_to:
+        first, last = _month_bounds(month)
+        for day, occupancy in (await _month(db, first, last)).items():
+            if date_from <= day <= date_to:
+                result[day] = occupancy
+        month = last + timedelta(days=1)
+    return result
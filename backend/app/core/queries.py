@@ -0,0 +1,210 @@
+"""Реестр горячих запросов.
+
+Каждый запрос собирается как lambda statement: SQLAlchemy кэширует построенную
+и скомпилированную конструкцию по месту определения лямбды, а значения из
+замыкания (даты, id) уходят bound-параметрами. Повторный вызов не строит
+select() заново и не проходит полный обход для ключа compile cache, а одинаковый
+SQL-текст переиспользует server-side prepared statement asyncpg
+(DB_STATEMENT_CACHE_SIZE).
+
+Автофильтр по салону (app.models._scope_to_current_salon) lambda statements не
+трогает, поэтому каждый запрос по моделям салона сам добавляет
+X.salon_id == current_salon_id() — значение берётся вне лямбды и уходит параметром.
+"""
+
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import ColumnElement, and_, lambda_stmt, select
+from sqlalchemy.orm import selectinload
+from sqlalchemy.sql.lambdas import StatementLambdaElement
+
+from app.core.tenant import current_salon_id
+from app.models.models import (
+    MINSK_TZ,
+    Booking,
+    BookingStatus,
+    SalonInfo,
+    Slot,
+    SlotStatus,
+    User,
+    UserRole,
+)
+from app.schemas.schemas import SlotRangeFilter
+
+
+def day_bounds(day: date) -> tuple[datetime, datetime]:
+    """[начало дня, начало следующего дня) по Минску — для диапазона по Slot.starts_at."""
+    start = datetime.combine(day, time.min, tzinfo=MINSK_TZ)
+    return start, start + timedelta(days=1)
+
+
+def available_slots_for_day(day: date, cutoff: datetime | None = None) -> StatementLambdaElement:
+    """Свободные слоты на дату; cutoff — начинающиеся не раньше этого момента (для сегодня).
+
+    Диапазон по starts_at идёт по индексу (status, starts_at).
+    """
+    day_start, day_end = day_bounds(day)
+    salon_id = current_salon_id()
+    stmt = lambda_stmt(
+        lambda: select(Slot).where(
+            Slot.salon_id == salon_id,
+            Slot.status == SlotStatus.available,
+            Slot.starts_at >= day_start,
+            Slot.starts_at < day_end,
+        )
+    )
+    if cutoff is not None:
+        stmt += lambda s: s.where(Slot.starts_at >= cutoff)
+    stmt += lambda s: s.order_by(Slot.starts_at)
+    return stmt
+
+
+def slot_spans_between(date_from: date, date_to: date) -> StatementLambdaElement:
+    """(date, start_time, end_time, status) всех слотов за даты — только колонки, для масок занятости."""
+    salon_id = current_salon_id()
+    return lambda_stmt(
+        lambda: select(Slot.date, Slot.start_time, Slot.end_time, Slot.status)
+        .where(Slot.salon_id == salon_id, Slot.date >= date_from, Slot.date <= date_to)
+        .order_by(Slot.date, Slot.start_time)
+    )
+
+
+def slot_for_update(slot_id: int) -> StatementLambdaElement:
+    salon_id = current_salon_id()
+    return lambda_stmt(
+        lambda: select(Slot).where(Slot.id == slot_id, Slot.salon_id == salon_id).with_for_update()
+    )
+
+
+def user_by_telegram_id(telegram_id: int) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(User).where(User.telegram_id == telegram_id))
+
+
+def salon_info() -> StatementLambdaElement:
+    salon_id = current_salon_id()
+    return lambda_stmt(lambda: select(SalonInfo).where(SalonInfo.id == salon_id))
+
+
+def bookings_for_client(telegram_id: int) -> StatementLambdaElement:
+    salon_id = current_salon_id()
+    return lambda_stmt(
+        lambda: select(Booking)
+        .join(User)
+        .where(User.telegram_id == telegram_id, Booking.salon_id == salon_id)
+        .options(
+            selectinload(Booking.client),
+            selectinload(Booking.service),
+            selectinload(Booking.slot),
+        )
+        .order_by(Booking.created_at.desc())
+    )
+
+
+# ── Планировщик ──
+
+
+def bookings_to_remind(now: datetime, horizon: datetime) -> StatementLambdaElement:
+    """Подтверждённые записи без напоминания, начинающиеся в (now, horizon].
+
+    horizon — now + максимальный remind_before_hours; точный порог записи проверяет вызывающий.
+    """
+    salon_id = current_salon_id()
+    return lambda_stmt(
+        lambda: select(Booking)
+        .join(Slot)
+        .where(
+            and_(
+                Booking.salon_id == salon_id,
+                Booking.status == BookingStatus.confirmed,
+                Booking.reminded == False,  # noqa: E712
+                Slot.starts_at > now,
+                Slot.starts_at <= horizon,
+            )
+        )
+        .options(
+            selectinload(Booking.client),
+            selectinload(Booking.service),
+            selectinload(Booking.slot),
+        )
+    )
+
+
+def client_bookings_on_day(day: date) -> StatementLambdaElement:
+    """Подтверждённые записи клиентов (не админов) на дату — для утренней сводки."""
+    salon_id = current_salon_id()
+    return lambda_stmt(
+        lambda: select(Booking)
+        .join(Slot)
+        .join(User, Booking.client_id == User.id)
+        .where(
+            and_(
+                Booking.salon_id == salon_id,
+                Slot.date == day,
+                Booking.status == BookingStatus.confirmed,
+                User.role != UserRole.admin,
+            )
+        )
+        .options(
+            selectinload(Booking.client),
+            selectinload(Booking.service),
+            selectinload(Booking.slot),
+        )
+        .order_by(Slot.start_time)
+    )
+
+
+def confirmed_bookings_started_between(since: datetime, until: datetime) -> StatementLambdaElement:
+    """Подтверждённые записи, начавшиеся в [since, until] — кандидаты на автозавершение."""
+    salon_id = current_salon_id()
+    return lambda_stmt(
+        lambda: select(Booking)
+        .join(Slot)
+        .where(
+            and_(
+                Booking.salon_id == salon_id,
+                Booking.status == BookingStatus.confirmed,
+                Slot.starts_at >= since,
+                Slot.starts_at <= until,
+            )
+        )
+        .options(
+            selectinload(Booking.slot),
+            selectinload(Booking.service),
+        )
+    )
+
+
+def completed_without_feedback_between(since: datetime, until: datetime) -> StatementLambdaElement:
+    """Завершённые записи без отзыва, начавшиеся в [since, until]."""
+    salon_id = current_salon_id()
+    return lambda_stmt(
+        lambda: select(Booking)
+        .join(Slot)
+        .where(
+            and_(
+                Booking.salon_id == salon_id,
+                Booking.status == BookingStatus.completed,
+                Booking.feedback_sent == False,  # noqa: E712
+                Slot.starts_at >= since,
+                Slot.starts_at <= until,
+            )
+        )
+        .options(
+            selectinload(Booking.client),
+            selectinload(Booking.service),
+            selectinload(Booking.slot),
+        )
+    )
+
+
+# ── Массовые операции админа ──
+
+
+def slot_range_conditions(data: SlotRangeFilter) -> list[ColumnElement[bool]]:
+    """Условия WHERE для слотов из диапазона дат и окна времени."""
+    conditions = [Slot.date >= data.date_from, Slot.date <= data.date_to]
+    if data.start_time is not None:
+        conditions.append(Slot.start_time >= data.start_time)
+    if data.end_time is not None:
+        conditions.append(Slot.end_time <= data.end_time)
+    return conditions
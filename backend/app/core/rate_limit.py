@@ -0,0 +1,62 @@
+import logging
+import time
+
+from fastapi import HTTPException, Request
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.telegram_auth import TelegramAuthError, validate_init_data
+from app.core.tenant import get_tenant
+
+logger = logging.getLogger(__name__)
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# Telegram webhook, health-чеки и долгоживущий SSE-поток (переподключения) не лимитируем
+EXEMPT_PREFIXES = ("/api/telegram/", "/api/events", "/health")
+
+
+def parse_limit(spec: str) -> tuple[int, int]:
+    """"100/minute" -> (100, 60)."""
+    count, _, period = spec.partition("/")
+    return int(count), _PERIODS[period.strip().rstrip("s")]
+
+
+def client_key(request: Request) -> str:
+    """Ключ лимита: telegram user id из initData, иначе IP.
+
+    Все пользователи Telegram WebView за carrier NAT приходят с одного IP —
+    по IP они делили бы один бакет. initData подписана ботом салона запроса
+    (resolve_salon выполняется раньше), поэтому проверяем его токеном.
+    """
+    authorization = request.headers.get("authorization", "")
+    if authorization.startswith("tma "):
+        tenant = get_tenant()
+        try:
+            return f"tg:{validate_init_data(authorization[4:], tenant.bot_token if tenant else None)['id']}"
+        except TelegramAuthError:
+            pass
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+async def rate_limit(request: Request) -> None:
+    """App-level dependency: fixed window в общем cache backend (Redis/память)."""
+    if request.url.path.startswith(EXEMPT_PREFIXES):
+        return
+
+    limit, period = parse_limit(settings.rate_limit)
+    window = int(time.time()) // period
+    try:
+        count = await cache.incr(f"rl:{client_key(request)}:{window}", ttl=period)
+    except Exception as e:
+        # Недоступный backend лимитов не должен ронять API
+        logger.warning("Rate limit backend error: %s", e)
+        return
+
+    if count > limit:
+        retry_after = period - int(time.time()) % period
+        raise HTTPException(
+            status_code=429,
+            detail="Слишком много запросов, попробуйте позже",
+            headers={"Retry-After": str(retry_after)},
+        )
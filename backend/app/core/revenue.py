@@ -0,0 +1,121 @@
+"""Свёртка выручки revenue_daily: инкрементальное обновление и полная пересборка.
+
+Каждая смена статуса записи превращается в дельты (день, услуга, статус) ->
+(+/-записи, +/-выручка) и применяется upsert'ом в той же транзакции, что и
+сама смена статуса. Статистика читает только свёртку — время запроса зависит
+от длины периода, а не от размера истории.
+"""
+
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.tenant import current_salon_id
+from app.models.models import Booking, BookingStatus, RevenueDaily, Service, Slot
+
+# Выручкой считаются подтверждённые и завершённые записи
+REVENUE_STATUSES = (BookingStatus.confirmed, BookingStatus.completed)
+
+
+@dataclass(frozen=True)
+class Transition:
+    """Смена статуса одной записи. old=None — запись появилась, new=None — ушла с этого дня."""
+
+    day: date
+    service_id: int
+    price: Decimal | float
+    old: BookingStatus | None
+    new: BookingStatus | None
+
+
+def transition(booking: Booking, old: BookingStatus | None, new: BookingStatus | None) -> Transition:
+    """Transition для загруженной записи (нужны booking.slot и booking.service)."""
+    return Transition(
+        day=booking.slot.date,
+        service_id=booking.service_id,
+        price=booking.service.price,
+        old=old,
+        new=new,
+    )
+
+
+def _insert_for(db: AsyncSession):
+    return pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+
+
+async def apply_transitions(db: AsyncSession, transitions: Iterable[Transition]) -> None:
+    """Применяет дельты к свёртке. Коммит — за вызывающим, вместе со сменой статуса."""
+    deltas: dict[tuple[date, int, BookingStatus], list] = defaultdict(lambda: [0, Decimal(0)])
+    for t in transitions:
+        if t.old == t.new:
+            continue
+        price = Decimal(str(t.price))
+        if t.old is not None:
+            d = deltas[(t.day, t.service_id, t.old)]
+            d[0] -= 1
+            d[1] -= price
+        if t.new is not None:
+            d = deltas[(t.day, t.service_id, t.new)]
+            d[0] += 1
+            d[1] += price
+
+    rows = [
+        {"day": day, "service_id": service_id, "status": status, "bookings": count, "revenue": revenue}
+        for (day, service_id, status), (count, revenue) in deltas.items()
+        if count or revenue
+    ]
+    if not rows:
+        return
+
+    stmt = _insert_for(db)(RevenueDaily)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["day", "service_id", "status"],
+        set_={
+            "bookings": RevenueDaily.bookings + stmt.excluded.bookings,
+            "revenue": RevenueDaily.revenue + stmt.excluded.revenue,
+        },
+    )
+    await db.execute(stmt, rows)
+
+
+async def rebuild(db: AsyncSession) -> int:
+    """Пересобирает свёртку текущего салона из bookings × services. Возвращает число строк свёртки."""
+    # DELETE и подсчёт фильтруются по салону автоматически; INSERT ... SELECT — нет,
+    # поэтому источник ограничиваем явно (salon_id новых строк — из контекста)
+    await db.execute(delete(RevenueDaily))
+    source = (
+        select(
+            Slot.date,
+            Booking.service_id,
+            Booking.status,
+            func.count(Booking.id),
+            func.sum(Service.price),
+        )
+        .join(Slot, Booking.slot_id == Slot.id)
+        .join(Service, Booking.service_id == Service.id)
+        .where(Booking.salon_id == current_salon_id())
+        .group_by(Slot.date, Booking.service_id, Booking.status)
+    )
+    await db.execute(
+        insert(RevenueDaily).from_select(
+            ["day", "service_id", "status", "bookings", "revenue"], source
+        )
+    )
+    await db.commit()
+    return (await db.execute(select(func.count()).select_from(RevenueDaily))).scalar_one()
+
+
+async def reprice_service(db: AsyncSession, service_id: int, price: Decimal | float) -> None:
+    """Смена цены услуги: выручка в свёртке считается по текущей цене (как в статистике)."""
+    await db.execute(
+        update(RevenueDaily)
+        .where(RevenueDaily.service_id == service_id)
+        .values(revenue=RevenueDaily.bookings * Decimal(str(price)))
+    )
@@ -0,0 +1,39 @@
+"""Генерация слотов по шаблонам расписания (планировщик и фоновые задачи админа)."""
+
+from datetime import date, time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import ScheduleTemplate, Slot, SlotStatus
+
+
+async def active_templates(db: AsyncSession) -> dict[int, ScheduleTemplate]:
+    """Активные шаблоны по дню недели (0=Mon..6=Sun)."""
+    result = await db.execute(select(ScheduleTemplate).where(ScheduleTemplate.is_active == True))  # noqa: E712
+    return {t.day_of_week: t for t in result.scalars().all()}
+
+
+async def day_has_slots(db: AsyncSession, day: date) -> bool:
+    result = await db.execute(select(Slot.id).where(Slot.date == day).limit(1))
+    return result.scalar_one_or_none() is not None
+
+
+def template_slots(template: ScheduleTemplate, day: date) -> list[Slot]:
+    """Слоты дня по шаблону: от start_time до end_time с шагом interval_minutes."""
+    slots = []
+    current_minutes = template.start_time.hour * 60 + template.start_time.minute
+    end_minutes = template.end_time.hour * 60 + template.end_time.minute
+
+    while current_minutes + template.interval_minutes <= end_minutes:
+        slot_end = current_minutes + template.interval_minutes
+        if slot_end > 23 * 60 + 59:
+            break
+        slots.append(Slot(
+            date=day,
+            start_time=time(current_minutes // 60, current_minutes % 60),
+            end_time=time(slot_end // 60, slot_end % 60),
+            status=SlotStatus.available,
+        ))
+        current_minutes = slot_end
+    return slots
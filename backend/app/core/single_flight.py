@@ -0,0 +1,59 @@
+"""Single-flight: одинаковые параллельные вызовы выполняются один раз.
+
+Когда открываются слоты, сотни клиентов в одну секунду запрашивают одно и то же
+(/api/slots/availability с одинаковым диапазоном). Без склейки каждый промах кэша
+берёт соединение из пула и выполняет тот же запрос. С SingleFlight первый вызов
+по ключу (лидер) выполняет функцию, остальные ждут его результат или исключение.
+
+Склейка — в пределах процесса и только на время выполнения: результат не
+запоминается (это делает кэш). Отмена лидера (клиент закрыл соединение) не
+роняет ожидающих — каждый из них выполнит функцию сам.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+def _consume(future: asyncio.Future) -> None:
+    # Исключение лидера без ожидающих не должно давать "exception was never retrieved"
+    if not future.cancelled():
+        future.exception()
+
+
+class SingleFlight(Generic[T]):
+    def __init__(self) -> None:
+        self._calls: dict[str, asyncio.Future[T]] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        future = self._calls.get(key)
+        if future is not None:
+            try:
+                # shield: отмена ожидающего не отменяет общий результат
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if future.cancelled():
+                    return await fn()  # отменили лидера, а не нас
+                raise
+
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consume)
+        self._calls[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
@@ -19,9 +19,11 @@ class TelegramAuthError(Exception):
     """Ошибка валидации Telegram initData."""
 
 
-def validate_init_data(init_data: str) -> dict:
+def validate_init_data(init_data: str, bot_token: str | None = None) -> dict:
     """Валидирует initData и возвращает данные пользователя.
 
+    bot_token — токен бота, чей Mini App подписал initData (по умолчанию BOT_TOKEN).
+
     Returns:
         dict с ключами: id, username, first_name (из Telegram user)
 
@@ -65,7 +67,7 @@ def validate_init_data(init_data: str) -> dict:
 
     # HMAC-SHA256: secret_key = HMAC("WebAppData", bot_token)
     secret_key = hmac.new(
-        b"WebAppData", settings.bot_token.encode(), hashlib.sha256
+        b"WebAppData", (bot_token or settings.bot_token).encode(), hashlib.sha256
     ).digest()
 
     # computed_hash = HMAC(data_check_string, secret_key)
@@ -0,0 +1,143 @@
+"""Мультитенантность: несколько салонов в одном деплое.
+
+Салон запроса лежит в contextvar: API ставит его по заголовку X-Salon-Id
+(app.api.deps.resolve_salon), планировщик и фоновые задачи — через use_salon().
+Модели салона (TenantScoped в app.models) получают salon_id из contextvar при
+вставке, а ORM-запросы автоматически фильтруются по нему.
+
+Реестр салонов (токен бота, админы, название) держится в памяти процесса и
+перечитывается из salon_info: load_tenants() при старте, раз в цикл планировщика
+и раз в TENANT_RELOAD_SECONDS в API и воркерах задач (reload_tenants_forever).
+Без рестарта подхватываются определение салона по X-Salon-Id, admin_ids и токен
+для исходящих сообщений. Входящие апдейты — нет: polling запускается, а webhook
+регистрируется для ботов, известных при старте, поэтому новый салон со своим
+ботом или смена bot_token требуют перезапуска процесса бота (app.main или
+app.worker bot).
+Салон по умолчанию (id=1) работает и без записи в реестре — на BOT_TOKEN/ADMIN_IDS
+из окружения, так что деплой с одним салоном настраивается как раньше.
+"""
+
+import asyncio
+import logging
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SALON_ID = 1
+TENANT_RELOAD_SECONDS = 60
+
+_current_salon: ContextVar[int] = ContextVar("salon_id", default=DEFAULT_SALON_ID)
+
+
+def current_salon_id() -> int:
+    return _current_salon.get()
+
+
+@contextmanager
+def use_salon(salon_id: int) -> Iterator[None]:
+    """Выполнить блок от имени салона (планировщик, фоновые задачи, бот)."""
+    token = _current_salon.set(salon_id)
+    try:
+        yield
+    finally:
+        _current_salon.reset(token)
+
+
+def set_current_salon(salon_id: int) -> None:
+    """Салон до конца текущей задачи asyncio (один HTTP-запрос)."""
+    _current_salon.set(salon_id)
+
+
+@dataclass(frozen=True)
+class Tenant:
+    id: int
+    name: str
+    bot_token: str
+    admin_ids: tuple[int, ...]
+
+
+def _parse_ids(raw: str) -> tuple[int, ...]:
+    return tuple(int(x.strip()) for x in raw.split(",") if x.strip())
+
+
+def _default_tenant() -> Tenant:
+    return Tenant(
+        id=DEFAULT_SALON_ID,
+        name=settings.salon_name,
+        bot_token=settings.bot_token,
+        admin_ids=tuple(settings.admin_id_list),
+    )
+
+
+_tenants: dict[int, Tenant] = {}
+
+
+def register_tenants(tenants: list[Tenant]) -> None:
+    global _tenants
+    _tenants = {t.id: t for t in tenants}
+
+
+async def load_tenants(session_factory) -> list[Tenant]:
+    """Перечитывает реестр из salon_info. Пустые bot_token/admin_ids — из окружения."""
+    from sqlalchemy import select
+
+    from app.models.models import SalonInfo
+
+    async with session_factory() as db:
+        rows = (await db.execute(select(SalonInfo).order_by(SalonInfo.id))).scalars().all()
+
+    default = _default_tenant()
+    tenants = [
+        Tenant(
+            id=row.id,
+            name=row.name,
+            bot_token=row.bot_token or default.bot_token,
+            admin_ids=_parse_ids(row.admin_ids) or default.admin_ids,
+        )
+        for row in rows
+    ]
+    register_tenants(tenants)
+    return all_tenants()
+
+
+async def reload_tenants_forever(session_factory, interval: float = TENANT_RELOAD_SECONDS) -> None:
+    """Фоновая задача: перечитывает реестр раз в interval. Ошибка — остаётся прежний реестр."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await load_tenants(session_factory)
+        except Exception as e:
+            logger.warning("Salon registry reload failed: %s", e)
+
+
+def get_tenant(salon_id: int | None = None) -> Tenant | None:
+    """Салон из реестра; None — такого салона нет."""
+    salon_id = current_salon_id() if salon_id is None else salon_id
+    tenant = _tenants.get(salon_id)
+    if tenant is None and salon_id == DEFAULT_SALON_ID:
+        return _default_tenant()
+    return tenant
+
+
+def all_tenants() -> list[Tenant]:
+    tenants = dict(_tenants)
+    tenants.setdefault(DEFAULT_SALON_ID, _default_tenant())
+    return [tenants[k] for k in sorted(tenants)]
+
+
+def salon_for_token(bot_token: str) -> int:
+    """Салон, чей бот получил апдейт. Общий токен — салон с меньшим id."""
+    for tenant in all_tenants():
+        if tenant.bot_token == bot_token:
+            return tenant.id
+    return DEFAULT_SALON_ID
+
+
+def tenant_admin_ids(salon_id: int | None = None) -> list[int]:
+    tenant = get_tenant(salon_id)
+    return list(tenant.admin_ids) if tenant else []
@@ -0,0 +1,106 @@
+"""Прогрев после старта: пул соединений, горячие запросы, кэш ответов.
+
+Сразу после деплоя первые запросы платят за TLS-подключение к Neon, интроспекцию
+типов asyncpg, компиляцию запросов SQLAlchemy и сборку сериализаторов pydantic.
+warmup() делает это до того, как инстанс объявит себя готовым (GET /health/ready):
+
+1. открывает pool_size соединений пулов API (и реплики) параллельно;
+2. в каждом салоне собирает ответы горячих эндпоинтов (салон, FAQ, услуги,
+   календарь доступности, слоты на дни календаря) в кэш функциями *_payload,
+   которые вызывают и сами эндпоинты; /api/bookings/my не кэшируется и только
+   прогревает запрос. Эндпоинты напрямую не вызываются: у их параметров
+   по умолчанию стоят Query(...), а не значения.
+
+warm_salon() вызывает и планировщик после автогенерации слотов: новые дни
+попадают в кэш до первого клиента (с REDIS_URL — для всех воркеров API).
+"""
+
+import asyncio
+import logging
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core import queries
+from app.core.tenant import all_tenants, use_salon
+
+logger = logging.getLogger(__name__)
+
+MINSK_TZ = timezone(timedelta(hours=3))
+
+WARMUP_TIMEOUT_SECONDS = 30.0  # зависшая БД не держит инстанс неготовым вечно
+CALENDAR_DAYS = 14  # столько дней показывает Calendar.tsx начиная с сегодня
+SALON_CONCURRENCY = 4
+
+_ready = False
+
+
+def is_ready() -> bool:
+    return _ready
+
+
+async def open_pool(engine: AsyncEngine) -> int:
+    """Открывает pool_size соединений одновременно и возвращает их в пул."""
+    pool = engine.pool
+    if not hasattr(pool, "size"):
+        return 0  # SQLite (тесты, демо): пула соединений нет
+
+    # Держим все соединения разом — иначе пул раз за разом отдавал бы одно и то же
+    conns = [engine.connect() for _ in range(pool.size())]
+    try:
+        await asyncio.gather(*(conn.start() for conn in conns))
+    finally:
+        await asyncio.gather(*(conn.close() for conn in conns), return_exceptions=True)
+    return len(conns)
+
+
+async def warm_salon(session_factory: Callable[[], AbstractAsyncContextManager[AsyncSession]]) -> None:
+    """Горячие запросы текущего салона; кэшируемые ответы остаются в кэше."""
+    from app.api import salon, services, slots
+
+    today = datetime.now(MINSK_TZ).date()
+    async with session_factory() as db:
+        await salon.salon_payload(db)
+        await salon.faq_payload(db)
+        await services.services_payload(db)
+        await slots.availability_payload(db, today, today + timedelta(days=CALENDAR_DAYS - 1))
+        for offset in range(CALENDAR_DAYS):
+            await slots.slots_payload(db, today + timedelta(days=offset))
+        await db.execute(queries.bookings_for_client(0))
+
+
+async def _warm_tenant(
+    salon_id: int,
+    session_factory: Callable[[], AbstractAsyncContextManager[AsyncSession]],
+    semaphore: asyncio.Semaphore,
+) -> None:
+    async with semaphore:
+        with use_salon(salon_id):
+            try:
+                await warm_salon(session_factory)
+            except Exception as e:
+                logger.warning("Warmup of salon %d failed: %s", salon_id, e)
+
+
+async def warmup(
+    engines: list[AsyncEngine],
+    session_factory: Callable[[], AbstractAsyncContextManager[AsyncSession]],
+) -> None:
+    """Прогрев при старте. Инстанс становится готовым и при неудаче — прогрев не обязателен."""
+    global _ready
+
+    started = asyncio.get_running_loop().time()
+    try:
+        async with asyncio.timeout(WARMUP_TIMEOUT_SECONDS):
+            opened = sum(await asyncio.gather(*(open_pool(engine) for engine in engines)))
+            semaphore = asyncio.Semaphore(SALON_CONCURRENCY)
+            tenants = all_tenants()
+            await asyncio.gather(*(_warm_tenant(t.id, session_factory, semaphore) for t in tenants))
+        elapsed = asyncio.get_running_loop().time() - started
+        logger.info("Warmup done in %.2fs: %d connections, %d salons", elapsed, opened, len(tenants))
+    except Exception as e:
+        logger.warning("Warmup incomplete: %s", e)
+    finally:
+        _ready = True
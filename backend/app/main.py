@@ -1,7 +1,6 @@
 import asyncio
 import logging
 
-from aiogram import Dispatcher
 from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.gzip import GZipMiddleware
@@ -9,58 +8,100 @@ from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
 
 from app.api.bookings import router as bookings_router
+from app.api.deps import require_admin, resolve_salon
+from app.api.events import router as events_router
 from app.api.expenses import router as expenses_router
+from app.api.jobs import router as jobs_router
 from app.api.salon import router as salon_router
 from app.api.schedule_templates import router as schedule_templates_router
 from app.api.services import router as services_router
 from app.api.slots import router as slots_router
+from app.api.stats import router as stats_router
+from app.api.telegram import router as telegram_router
 from app.api.users import router as users_router
-from app.bot.bot_instance import bot
-from app.bot.handlers import router as bot_router
-from app.bot.scheduler import run_scheduler
+from app.bot.bot_instance import all_bots, close_bot
+from app.bot.scheduler import run_scheduler_leader
+from app.core.cache import cache
 from app.core.config import settings
-from app.core.database import engine, get_db
+from app.core.database import ENGINES, async_session, dispose_engines, get_db, pool_stats
+from app.core.jobs import fail_stale_jobs, start_job_workers, stop_job_workers
+from app.core.middleware import SecurityMiddleware
+from app.core.rate_limit import rate_limit
+from app.core.tenant import load_tenants, reload_tenants_forever
+from app.core.warmup import is_ready, warmup
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-dp = Dispatcher()
-dp.include_router(bot_router)
-
-
 async def start_bot() -> None:
-    logger.info("Starting Telegram bot...")
-    await dp.start_polling(bot)
+    # aiogram-диспетчер с хендлерами грузим только там, где бот реально запускается
+    from app.bot.dispatcher import dp
+
+    # Набор ботов фиксируется здесь: бот нового салона начнёт получать апдейты после рестарта
+    bots = all_bots()
+    logger.info("Starting Telegram bots: %d", len(bots))
+    await dp.start_polling(*bots)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: start bot polling + scheduler
+    # Startup: bot polling + scheduler (если не вынесены в отдельные процессы app.worker)
     # DB schema managed by Alembic (alembic upgrade head)
-    bot_task = asyncio.create_task(start_bot())
-    scheduler_task = asyncio.create_task(run_scheduler())
+    try:
+        tenants = await load_tenants(async_session)
+        logger.info("Salons: %s", ", ".join(str(t.id) for t in tenants))
+    except Exception as e:
+        # Нет таблицы/БД — работаем одним салоном из окружения
+        logger.warning("Salon registry not loaded: %s", e)
+    # Прогрев в фоне: процесс уже отвечает на /health, а /health/ready — после прогрева.
+    # Пул планировщика не греем — он работает в фоне и не влияет на первые ответы
+    api_engines = [eng for role, eng in ENGINES.items() if role != "scheduler"]
+    tasks: list[asyncio.Task] = [
+        asyncio.create_task(warmup(api_engines, async_session)),
+        # Без планировщика в процессе (RUN_SCHEDULER=false) реестр иначе не обновлялся бы
+        asyncio.create_task(reload_tenants_forever(async_session)),
+    ]
+    if settings.bot_mode == "webhook":
+        from app.bot.webhook import register_webhook, start_webhook_workers
+
+        # Апдейты принимает каждый API-воркер; регистрирует webhook тот, кто отвечает за бота
+        start_webhook_workers()
+        if settings.run_bot:
+            await register_webhook()
+    elif settings.run_bot:
+        tasks.append(asyncio.create_task(start_bot()))
+    if settings.run_scheduler:
+        tasks.append(asyncio.create_task(run_scheduler_leader()))
+    if settings.job_workers:
+        await fail_stale_jobs()
+        start_job_workers()
     yield
 
     # Graceful shutdown: ждём завершения задач
-    scheduler_task.cancel()
-    bot_task.cancel()
-    await asyncio.gather(scheduler_task, bot_task, return_exceptions=True)
-    await bot.session.close()
-    await engine.dispose()
+    await stop_job_workers()
+    if settings.bot_mode == "webhook":
+        from app.bot.webhook import stop_webhook_workers
+
+        await stop_webhook_workers()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await close_bot()
+    await cache.close()
+    await dispose_engines()
     logger.info("Shutdown complete")
 
 
-app = FastAPI(title=f"{settings.salon_name} API", lifespan=lifespan)
-
-# Rate limiting: 100 requests per minute per IP
-limiter = Limiter(key_func=get_remote_address, default_limits=["100/minute"])
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+# Салон запроса (X-Salon-Id) выставляется до всех остальных зависимостей.
+# Rate limiting: RATE_LIMIT (100/minute) на telegram user id (или IP без initData),
+# счётчики в общем cache backend — одинаковые для всех воркеров
+app = FastAPI(
+    title=f"{settings.salon_name} API",
+    lifespan=lifespan,
+    dependencies=[Depends(resolve_salon), Depends(rate_limit)],
+)
 
 # CORS: разрешаем только фронтенд из MINI_APP_URL + localhost для разработки
 _cors_origins: list[str] = []
@@ -73,47 +114,21 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=_cors_origins,
     allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE"],
-    allow_headers=["Authorization", "Content-Type"],
+    allow_headers=["Authorization", "Content-Type", "X-Salon-Id", "Idempotency-Key"],
 )
 app.add_middleware(GZipMiddleware, minimum_size=500)
+app.add_middleware(SecurityMiddleware)  # последним — внешний слой: заголовки и на ответах CORS
 app.include_router(salon_router)
 app.include_router(users_router)
 app.include_router(services_router)
 app.include_router(slots_router)
 app.include_router(bookings_router)
 app.include_router(expenses_router)
+app.include_router(stats_router)
+app.include_router(jobs_router)
+app.include_router(events_router)
 app.include_router(schedule_templates_router)
-
-
-@app.middleware("http")
-async def audit_log(request: Request, call_next):
-    """Логирует мутирующие запросы (POST/PATCH/PUT/DELETE) для аудита."""
-    response = await call_next(request)
-    if request.method in ("POST", "PATCH", "PUT", "DELETE"):
-        logger.info(
-            "AUDIT %s %s -> %d",
-            request.method, request.url.path, response.status_code,
-        )
-    return response
-
-
-@app.middleware("http")
-async def security_headers(request: Request, call_next):
-    response = await call_next(request)
-    response.headers["X-Frame-Options"] = "DENY"
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-    response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-    response.headers["Permissions-Policy"] = "camera=(), microphone=(), geolocation=()"
-    response.headers["Content-Security-Policy"] = (
-        "default-src 'self'; "
-        "script-src 'self'; "
-        "style-src 'self' 'unsafe-inline'; "
-        "img-src 'self' data: https:; "
-        "connect-src 'self'; "
-        "frame-ancestors 'none'"
-    )
-    return response
+app.include_router(telegram_router)
 
 
 @app.exception_handler(Exception)
@@ -136,6 +151,20 @@ async def health_check(db: AsyncSession = Depends(get_db)):
         return JSONResponse(status_code=503, content={"status": "error", "db": "disconnected"})
 
 
+@app.get("/health/ready")
+async def health_ready():
+    """Readiness: 503, пока идёт прогрев (пул, горячие запросы, кэш ответов), затем 200."""
+    if not is_ready():
+        return JSONResponse(status_code=503, content={"status": "warming_up"})
+    return {"status": "ready"}
+
+
+@app.get("/health/pool")
+async def health_pool(_admin: int = Depends(require_admin)):
+    """Статистика пулов соединений по ролям (api, scheduler) для мониторинга; только админам."""
+    return pool_stats()
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -1,5 +1,5 @@
 import enum
-from datetime import date, datetime, time
+from datetime import date, datetime, time, timedelta, timezone
 
 from sqlalchemy import (
     BigInteger,
@@ -11,21 +11,70 @@ from sqlalchemy import (
     ForeignKey,
     Index,
     Integer,
+    JSON,
     Numeric,
     SmallInteger,
     String,
     Text,
     Time,
     UniqueConstraint,
+    event,
     func,
 )
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+from sqlalchemy.orm import (
+    DeclarativeBase,
+    Mapped,
+    ORMExecuteState,
+    Session,
+    mapped_column,
+    relationship,
+    with_loader_criteria,
+)
+from sqlalchemy.sql.lambdas import StatementLambdaElement
+
+from app.core.tenant import current_salon_id
+
+
+MINSK_TZ = timezone(timedelta(hours=3))
 
 
 class Base(DeclarativeBase):
     pass
 
 
+class TenantScoped:
+    """Данные одного салона: salon_id берётся из текущего контекста (app.core.tenant)."""
+
+    salon_id: Mapped[int] = mapped_column(ForeignKey("salon_info.id"), index=True, default=current_salon_id)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _scope_to_current_salon(state: ORMExecuteState) -> None:
+    """Каждый ORM SELECT/UPDATE/DELETE по моделям салона получает WHERE salon_id = текущий.
+
+    Обход для служебных запросов по всем салонам: execution_options(all_salons=True).
+    """
+    if not (state.is_select or state.is_update or state.is_delete):
+        return
+    if state.is_column_load or state.is_relationship_load or state.execution_options.get("all_salons"):
+        return
+    if isinstance(state.statement, StatementLambdaElement):
+        # .options() на lambda statement запёк бы bound-параметры первого вызова:
+        # запросы из app.core.queries фильтруют по salon_id сами
+        return
+    salon_id = current_salon_id()
+    state.statement = state.statement.options(
+        # Связанные объекты принадлежат тому же салону: на relationship-загрузки критерий
+        # не распространяем (иначе selectinload теряет оптимизацию по первичному ключу)
+        with_loader_criteria(
+            TenantScoped,
+            lambda cls: cls.salon_id == salon_id,
+            include_aliases=True,
+            propagate_to_loaders=False,
+        )
+    )
+
+
 class UserRole(str, enum.Enum):
     client = "client"
     admin = "admin"
@@ -44,6 +93,19 @@ class BookingStatus(str, enum.Enum):
     cancelled = "cancelled"
 
 
+class JobRunStatus(str, enum.Enum):
+    running = "running"
+    done = "done"
+    failed = "failed"
+
+
+class JobStatus(str, enum.Enum):
+    queued = "queued"
+    running = "running"
+    done = "done"
+    failed = "failed"
+
+
 # ── 1. Пользователи ──
 
 
@@ -78,12 +140,15 @@ class SalonInfo(Base):
     working_hours_text: Mapped[str] = mapped_column(String(500), default="")
     instagram: Mapped[str] = mapped_column(String(500), default="")
     preparation_text: Mapped[str] = mapped_column(Text, default="")
+    # Мультитенантность: пусто — BOT_TOKEN / ADMIN_IDS из окружения
+    bot_token: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    admin_ids: Mapped[str] = mapped_column(String(500), default="")  # "446746688,412062038"
 
 
 # ── 3. FAQ ──
 
 
-class FaqItem(Base):
+class FaqItem(TenantScoped, Base):
     __tablename__ = "faq_items"
 
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -95,7 +160,7 @@ class FaqItem(Base):
 # ── 4. Услуги ──
 
 
-class Service(Base):
+class Service(TenantScoped, Base):
     __tablename__ = "services"
 
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -112,17 +177,34 @@ class Service(Base):
 # ── 5. Слоты записи ──
 
 
-class Slot(Base):
+def _slot_moment(time_column: str):
+    """Default для starts_at/ends_at: date + время слота по Минску (и для ORM, и для Core insert)."""
+
+    def default(context) -> datetime:
+        params = context.get_current_parameters()
+        return datetime.combine(params["date"], params[time_column], tzinfo=MINSK_TZ)
+
+    return default
+
+
+class Slot(TenantScoped, Base):
     __tablename__ = "slots"
     __table_args__ = (
         Index("ix_slot_date_status", "date", "status"),
-        UniqueConstraint("date", "start_time", "end_time", name="uq_slot_datetime"),
+        Index("ix_slot_status_starts_at", "status", "starts_at"),
+        UniqueConstraint("salon_id", "date", "start_time", "end_time", name="uq_slot_datetime"),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     date: Mapped[date] = mapped_column(Date, index=True)
     start_time: Mapped[time] = mapped_column(Time)
     end_time: Mapped[time] = mapped_column(Time)
+    # Денормализация date + start_time/end_time: фильтры "начинается до/после X" идут по индексу.
+    # Дата и время слота после создания не меняются, поэтому onupdate не нужен.
+    starts_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=_slot_moment("start_time"), index=True
+    )
+    ends_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_slot_moment("end_time"))
     status: Mapped[SlotStatus] = mapped_column(
         Enum(SlotStatus), default=SlotStatus.available
     )
@@ -133,7 +215,7 @@ class Slot(Base):
 # ── 6. Записи ──
 
 
-class Booking(Base):
+class Booking(TenantScoped, Base):
     __tablename__ = "bookings"
     __table_args__ = (
         Index("ix_booking_status_reminded", "status", "reminded"),
@@ -159,24 +241,26 @@ class Booking(Base):
 # ── 7. Расходы ──
 
 
-class Expense(Base):
+class Expense(TenantScoped, Base):
     __tablename__ = "expenses"
 
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(255))
     amount: Mapped[float] = mapped_column(Numeric(10, 2))
     month: Mapped[str] = mapped_column(String(7), index=True)  # "2026-02"
+    # Первое число месяца: диапазоны и GROUP BY по дате, а не по строке
+    month_start: Mapped[date] = mapped_column(Date, index=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
 
 
 # ── 8. Шаблоны расписания ──
 
 
-class ScheduleTemplate(Base):
+class ScheduleTemplate(TenantScoped, Base):
     __tablename__ = "schedule_templates"
     __table_args__ = (
         CheckConstraint("day_of_week >= 0 AND day_of_week <= 6", name="ck_day_range"),
-        UniqueConstraint("day_of_week", name="uq_day_of_week"),
+        UniqueConstraint("salon_id", "day_of_week", name="uq_day_of_week"),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -185,3 +269,89 @@ class ScheduleTemplate(Base):
     end_time: Mapped[time] = mapped_column(Time)
     interval_minutes: Mapped[int] = mapped_column(Integer, default=20)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+
+
+# ── 9. Журнал запусков задач планировщика ──
+
+
+class JobRun(Base):
+    """Один запуск задачи планировщика: (job_name, run_key) выполняется ровно один раз."""
+
+    __tablename__ = "job_runs"
+    __table_args__ = (
+        UniqueConstraint("job_name", "run_key", name="uq_job_run"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    job_name: Mapped[str] = mapped_column(String(64))
+    run_key: Mapped[str] = mapped_column(String(64))  # "2026-02-10" / "2026-02-10T14:05"
+    status: Mapped[JobRunStatus] = mapped_column(
+        Enum(JobRunStatus), default=JobRunStatus.running
+    )
+    attempts: Mapped[int] = mapped_column(Integer, default=1)
+    started_at: Mapped[datetime] = mapped_column(DateTime)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+
+# ── 10. Свёртка выручки по дням ──
+
+
+class RevenueDaily(TenantScoped, Base):
+    """Материализованная свёртка: записи и выручка за день по услуге и статусу.
+
+    Обновляется инкрементально при смене статуса записи (app.core.revenue),
+    пересобирается целиком командой rebuild_revenue.py.
+    """
+
+    __tablename__ = "revenue_daily"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    service_id: Mapped[int] = mapped_column(ForeignKey("services.id"), primary_key=True)
+    status: Mapped[BookingStatus] = mapped_column(Enum(BookingStatus), primary_key=True)
+    bookings: Mapped[int] = mapped_column(Integer, default=0)
+    revenue: Mapped[float] = mapped_column(Numeric(12, 2), default=0)
+
+
+# ── 11. Фоновые задачи админа ──
+
+
+class Job(TenantScoped, Base):
+    """Долгая операция админа, выполняемая пулом воркеров (app.core.jobs)."""
+
+    __tablename__ = "jobs"
+
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)  # uuid4 hex
+    kind: Mapped[str] = mapped_column(String(64))
+    status: Mapped[JobStatus] = mapped_column(Enum(JobStatus), default=JobStatus.queued, index=True)
+    params: Mapped[dict] = mapped_column(JSON, default=dict)
+    progress: Mapped[int] = mapped_column(Integer, default=0)  # 0..100
+    message: Mapped[str] = mapped_column(String(255), default="")
+    result: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_by: Mapped[int | None] = mapped_column(BigInteger, nullable=True)  # telegram_id админа
+    created_at: Mapped[datetime] = mapped_column(DateTime)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+
+# ── 12. Ключи идемпотентности ──
+
+
+class IdempotencyKey(TenantScoped, Base):
+    """Сохранённый ответ мутации по заголовку Idempotency-Key (app.core.idempotency).
+
+    response = NULL — запрос с этим ключом ещё выполняется.
+    """
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        UniqueConstraint("salon_id", "actor_id", "key", name="uq_idempotency_key"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    actor_id: Mapped[int] = mapped_column(BigInteger)  # telegram_id автора запроса
+    key: Mapped[str] = mapped_column(String(64))
+    request_hash: Mapped[str] = mapped_column(String(64))  # sha256 метода, пути и тела
+    status_code: Mapped[int | None] = mapped_column(SmallInteger, nullable=True)
+    response: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, index=True)
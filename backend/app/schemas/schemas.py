@@ -113,12 +113,59 @@ class SlotCreate(BaseModel):
         return self
 
 
+class SlotGenerateRange(BaseModel):
+    """Админ генерирует слоты по шаблонам расписания на диапазон дат (фоновая задача)."""
+
+    date_from: date
+    date_to: date
+
+    @model_validator(mode="after")
+    def validate_range(self):
+        if self.date_from > self.date_to:
+            raise ValueError("date_from must not be after date_to")
+        if (self.date_to - self.date_from).days > 92:
+            raise ValueError("date range must not exceed 92 days")
+        return self
+
+
 class SlotUpdate(BaseModel):
     """Админ блокирует/разблокирует слот."""
 
     status: str = Field(..., pattern=r"^(available|blocked)$")
 
 
+class SlotRangeFilter(BaseModel):
+    """Диапазон дат и (опционально) окно времени для массовых операций админа."""
+
+    date_from: date
+    date_to: date
+    start_time: time | None = None  # слоты, начинающиеся не раньше
+    end_time: time | None = None  # слоты, заканчивающиеся не позже
+
+    @model_validator(mode="after")
+    def validate_ranges(self):
+        if self.date_from > self.date_to:
+            raise ValueError("date_from must not be after date_to")
+        if (self.date_to - self.date_from).days > 366:
+            raise ValueError("date range must not exceed one year")
+        if self.start_time and self.end_time and self.start_time >= self.end_time:
+            raise ValueError("start_time must be before end_time")
+        return self
+
+
+class SlotBulkUpdate(SlotRangeFilter):
+    """Админ блокирует/разблокирует все слоты в диапазоне дат (и окне времени)."""
+
+    status: str = Field(..., pattern=r"^(available|blocked)$")
+
+
+class SlotBulkUpdateResult(BaseModel):
+    matched: int  # слотов в диапазоне
+    updated: int  # статус изменён
+    skipped_booked: int  # заняты записью — не трогаем
+    skipped_past: int  # прошедшие — не открываем
+
+
 # ── Bookings ──
 
 
@@ -136,6 +183,24 @@ class BookingReschedule(BaseModel):
     new_slot_id: int = Field(..., gt=0)
 
 
+class BookingBulkCancel(SlotRangeFilter):
+    """Админ отменяет все подтверждённые записи в диапазоне (закрытие салона на день)."""
+
+    block_slots: bool = True  # освободившиеся слоты блокируются, а не открываются
+
+
+class BookingBulkReschedule(SlotRangeFilter):
+    """Админ сдвигает записи диапазона на shift_days дней (на слот с тем же временем)."""
+
+    shift_days: int = Field(..., ge=1, le=90)
+    block_slots: bool = True
+
+
+class BookingBulkResult(BaseModel):
+    processed: int
+    skipped: list[int] = []  # id записей, которые не удалось перенести
+
+
 class BookingResponse(BaseModel):
     id: int
     status: str
@@ -204,6 +269,42 @@ class ExpenseResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class ExpenseMonthTotal(BaseModel):
+    month: str  # "2026-02"
+    total: float
+    count: int
+
+
+# ── Jobs ──
+
+
+class JobResponse(BaseModel):
+    id: str
+    kind: str
+    status: str
+    progress: int
+    message: str
+    result: dict | None
+    error: str | None
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
+
+    model_config = {"from_attributes": True}
+
+
+# ── Stats ──
+
+
+class RevenuePoint(BaseModel):
+    """Выручка за день или месяц (из свёртки revenue_daily)."""
+
+    period: str  # "2026-02-10" или "2026-02"
+    bookings: int  # подтверждённые + завершённые
+    revenue: float
+    cancelled: int
+
+
 # ── Schedule Templates ──
 
 DAY_NAMES = ["Понедельник", "Вторник", "Среда", "Четверг", "Пятница", "Суббота", "Воскресенье"]
@@ -0,0 +1,88 @@
+"""Фоновые процессы отдельно от HTTP API.
+
+Запуск (из backend/):
+    python -m app.worker bot        — Telegram-бот (long polling; при BOT_MODE=webhook —
+                                      регистрирует webhook, апдейты принимает API)
+    python -m app.worker scheduler  — планировщик (leader lock: работает один экземпляр)
+    python -m app.worker jobs       — фоновые задачи админа (JOB_WORKERS воркеров)
+
+API без фоновых задач, масштабируется воркерами/репликами:
+    RUN_BOT=false RUN_SCHEDULER=false JOB_WORKERS=0 uvicorn app.main:app --workers 4
+"""
+
+import argparse
+import asyncio
+import logging
+
+from app.bot.bot_instance import all_bots, close_bot
+from app.bot.scheduler import run_scheduler_leader
+from app.core.config import settings
+from app.core.database import async_session, dispose_engines
+from app.core.jobs import fail_stale_jobs, start_job_workers, stop_job_workers
+from app.core.tenant import load_tenants, reload_tenants_forever
+
+logger = logging.getLogger(__name__)
+
+
+async def run_bot() -> None:
+    from app.bot.dispatcher import dp
+    from app.bot.webhook import register_webhook
+
+    # Боты и webhook — по реестру на момент старта; новый салон со своим ботом
+    # или смена bot_token требуют перезапуска этого процесса
+    await load_tenants(async_session)
+    if settings.bot_mode == "webhook":
+        try:
+            await register_webhook()
+        finally:
+            await close_bot()
+        return
+
+    bots = all_bots()
+    logger.info("Starting Telegram bots (polling): %d", len(bots))
+    # start_polling сам закрывает bot.session при остановке
+    await dp.start_polling(*bots)
+
+
+async def run_scheduler_process() -> None:
+    try:
+        await run_scheduler_leader()
+    finally:
+        await close_bot()
+        await dispose_engines()
+
+
+async def run_jobs_process() -> None:
+    # Обработчики регистрируются при импорте модулей API
+    import app.api.slots  # noqa: F401
+
+    await load_tenants(async_session)
+    reload_task = asyncio.create_task(reload_tenants_forever(async_session))
+    await fail_stale_jobs()
+    start_job_workers(max(settings.job_workers, 1))
+    try:
+        await asyncio.Event().wait()
+    finally:
+        reload_task.cancel()
+        await stop_job_workers()
+        await dispose_engines()
+
+
+ROLES = {
+    "bot": run_bot,
+    "scheduler": run_scheduler_process,
+    "jobs": run_jobs_process,
+}
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Chocoo Skin background worker")
+    parser.add_argument("role", choices=sorted(ROLES))
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(ROLES[args.role]())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Микробенчмарк накладных расходов middleware на запрос.
+
+Сравнивает прежнюю пару @app.middleware("http") (audit_log + security_headers на
+BaseHTTPMiddleware) с SecurityMiddleware из app.core.middleware. Оба варианта
+оборачивают один и тот же пустой ASGI-эндпоинт и вызываются напрямую, без HTTP
+и без приложения — в цифрах только сами слои.
+
+Запуск:
+    cd backend
+    python bench_middleware.py [--requests 20000] [--method POST]
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+from app.core.middleware import AUDITED_METHODS, SECURITY_HEADERS, SecurityMiddleware
+
+BODY = b'{"status":"ok"}'
+
+
+async def endpoint(scope, receive, send) -> None:
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(BODY)).encode())],
+    })
+    await send({"type": "http.response.body", "body": BODY})
+
+
+async def audit_log(request: Request, call_next):
+    response = await call_next(request)
+    if request.method in AUDITED_METHODS:
+        logging.getLogger(__name__).info("AUDIT %s %s -> %d", request.method, request.url.path, response.status_code)
+    return response
+
+
+async def security_headers(request: Request, call_next):
+    response = await call_next(request)
+    for name, value in SECURITY_HEADERS.items():
+        response.headers[name] = value
+    return response
+
+
+def legacy_stack():
+    # Порядок как у декораторов: последний добавленный — внешний
+    return BaseHTTPMiddleware(BaseHTTPMiddleware(endpoint, dispatch=audit_log), dispatch=security_headers)
+
+
+async def run(app, requests: int, method: str) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": "/api/bookings/",
+        "raw_path": b"/api/bookings/",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(min(requests, 500)):  # прогрев
+        await app(dict(scope), receive, send)
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--method", default="GET")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)  # меряем слои, а не вывод логов
+
+    bare = await run(endpoint, args.requests, args.method)
+    legacy = await run(legacy_stack(), args.requests, args.method)
+    pure = await run(SecurityMiddleware(endpoint), args.requests, args.method)
+
+    print(f"{args.requests} запросов {args.method}, мкс на запрос:")
+    print(f"  без middleware              {bare:8.1f}")
+    print(f"  2 × BaseHTTPMiddleware      {legacy:8.1f}  (+{legacy - bare:.1f})")
+    print(f"  SecurityMiddleware (ASGI)   {pure:8.1f}  (+{pure - bare:.1f})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
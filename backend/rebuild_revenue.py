@@ -0,0 +1,31 @@
+"""
+Пересборка свёртки выручки revenue_daily из bookings × services.
+
+Обычно свёртка обновляется инкрементально при каждой смене статуса записи.
+Пересборка нужна после ручных правок в БД, восстановления из бэкапа
+или если свёртка разошлась с записями.
+
+Пересобираются все салоны из salon_info.
+
+Запуск:
+    cd backend
+    python rebuild_revenue.py
+"""
+
+import asyncio
+
+from app.core.database import async_session
+from app.core.revenue import rebuild
+from app.core.tenant import load_tenants, use_salon
+
+
+async def main() -> None:
+    for tenant in await load_tenants(async_session):
+        with use_salon(tenant.id):
+            async with async_session() as db:
+                rows = await rebuild(db)
+        print(f"Свёртка revenue_daily салона {tenant.id} пересобрана: {rows} строк")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -13,8 +13,8 @@ Seed-скрипт для загрузки услуг и информации о
 
 Скрипт:
 1. Выполняет ALTER TABLE (добавляет новые колонки если их нет)
-2. Удаляет все существующие услуги и данные салона
-3. Вставляет услуги + информацию о салоне
+2. Удаляет все существующие услуги салона
+3. Вставляет услуги + обновляет информацию о салоне (салон по умолчанию, id=1)
 """
 
 import asyncio
@@ -22,6 +22,7 @@ import asyncio
 from sqlalchemy import delete, text
 
 from app.core.database import async_session
+from app.core.tenant import current_salon_id
 from app.models.models import SalonInfo, Service
 
 # ============================================================
@@ -76,7 +77,6 @@ async def seed():
     async with async_session() as session:
         # Удаляем старые данные
         await session.execute(delete(Service))
-        await session.execute(delete(SalonInfo))
         await session.flush()
 
         # Вставляем услуги
@@ -85,8 +85,13 @@ async def seed():
             session.add(service)
 
         # Вставляем информацию о салоне
-        salon = SalonInfo(**SALON_DATA)
-        session.add(salon)
+        # Строку салона не удаляем: на неё ссылаются данные (salon_id)
+        salon = await session.get(SalonInfo, current_salon_id())
+        if salon is None:
+            salon = SalonInfo(id=current_salon_id())
+            session.add(salon)
+        for key, value in SALON_DATA.items():
+            setattr(salon, key, value)
 
         await session.commit()
         print(f"Загружено: {len(SERVICES_DATA)} услуг + информация о салоне")
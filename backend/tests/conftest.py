@@ -1,15 +1,24 @@
-"""Test fixtures: SQLite in-memory DB, auth overrides, seed data."""
+"""Test fixtures: SQLite in-memory DB, auth overrides, seed data.
 
+Schema is created once per process, every test is rolled back (see setup_db).
+Parallel run: `pytest -n auto` (pytest-xdist, one in-memory DB per worker); the
+import-time budget in test_startup.py only runs serially.
+The slowest tests are listed after every run (--durations in pytest.ini).
+"""
+
+import asyncio
 from datetime import date, time
 from unittest.mock import AsyncMock, patch
 
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.pool import StaticPool
 
 from app.api.deps import get_telegram_user, require_admin
-from app.core.database import get_db
+from app.core.cache import cache
+from app.core.database import get_db, get_read_db, get_read_session_factory
 from app.models.models import (
     Base,
     Expense,
@@ -29,6 +38,11 @@ from sqlalchemy.dialects.sqlite.base import SQLiteCompiler
 SQLiteCompiler._generate_for_update_clause = lambda self, arg: ""
 
 # --- Test DB (SQLite in-memory, single connection via StaticPool) ---
+# The schema is created once per process; under pytest-xdist every worker is a
+# separate process and so gets its own in-memory database. Each test runs inside
+# an outer transaction that is rolled back at teardown: TestSession is bound to
+# that connection with join_transaction_mode="create_savepoint", so commit() and
+# rollback() in tests and in app code only release/roll back a SAVEPOINT.
 engine_test = create_async_engine(
     "sqlite+aiosqlite:///:memory:",
     echo=False,
@@ -37,6 +51,18 @@ engine_test = create_async_engine(
 )
 TestSession = async_sessionmaker(engine_test, class_=AsyncSession, expire_on_commit=False)
 
+
+# pysqlite's own transaction handling breaks SAVEPOINT: let SQLAlchemy emit BEGIN itself
+# https://docs.sqlalchemy.org/en/20/dialects/sqlite.html#serializable-isolation-savepoints-transactional-ddl
+@event.listens_for(engine_test.sync_engine, "connect")
+def _disable_pysqlite_begin(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(engine_test.sync_engine, "begin")
+def _emit_begin(conn):
+    conn.exec_driver_sql("BEGIN")
+
 # --- Test identities ---
 TEST_USER = {"id": 12345, "username": "testuser", "first_name": "Test"}
 TEST_ADMIN_ID = 446746688
@@ -44,13 +70,26 @@ TEST_ADMIN = {"id": TEST_ADMIN_ID, "username": "admin", "first_name": "Admin"}
 
 
 # --- DB setup / teardown (autouse) ---
+_schema_created = False
+
+
 @pytest_asyncio.fixture(autouse=True)
 async def setup_db():
-    async with engine_test.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    yield
-    async with engine_test.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
+    global _schema_created
+    if not _schema_created:
+        async with engine_test.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        _schema_created = True
+    cache.clear()  # MemoryCache: кэш ответов и счётчики rate limit не текут между тестами
+
+    async with engine_test.connect() as conn:
+        outer = await conn.begin()
+        TestSession.configure(bind=conn, join_transaction_mode="create_savepoint")
+        try:
+            yield
+        finally:
+            TestSession.configure(bind=engine_test, join_transaction_mode="conservative_savepoint")
+            await outer.rollback()
 
 
 async def _override_get_db():
@@ -59,14 +98,28 @@ async def _override_get_db():
 
 
 # --- HTTP clients ---
+def _task_per_request(app):
+    """Serve every request in its own task, as uvicorn does.
+
+    resolve_salon sets the salon contextvar for the rest of the current task; bare
+    ASGITransport would run the app in the test's task and leak it into the test.
+    """
+    async def asgi(scope, receive, send):
+        await asyncio.create_task(app(scope, receive, send))
+
+    return asgi
+
+
 @pytest_asyncio.fixture
 async def client():
     """Regular user client (telegram_id=12345)."""
     from app.main import app
 
     app.dependency_overrides[get_db] = _override_get_db
+    app.dependency_overrides[get_read_db] = _override_get_db
+    app.dependency_overrides[get_read_session_factory] = lambda: TestSession
     app.dependency_overrides[get_telegram_user] = lambda: TEST_USER
-    transport = ASGITransport(app=app)
+    transport = ASGITransport(app=_task_per_request(app))
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         yield ac
     app.dependency_overrides.clear()
@@ -78,9 +131,11 @@ async def admin_client():
     from app.main import app
 
     app.dependency_overrides[get_db] = _override_get_db
+    app.dependency_overrides[get_read_db] = _override_get_db
+    app.dependency_overrides[get_read_session_factory] = lambda: TestSession
     app.dependency_overrides[get_telegram_user] = lambda: TEST_ADMIN
     app.dependency_overrides[require_admin] = lambda: TEST_ADMIN_ID
-    transport = ASGITransport(app=app)
+    transport = ASGITransport(app=_task_per_request(app))
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         yield ac
     app.dependency_overrides.clear()
@@ -192,6 +247,8 @@ def mock_notifications():
         patch("app.api.bookings.notify_client_booking_cancelled_by_admin", new_callable=AsyncMock) as m4,
         patch("app.api.bookings.notify_client_booking_rescheduled", new_callable=AsyncMock) as m5,
         patch("app.api.bookings.notify_admins_rescheduled_booking", new_callable=AsyncMock) as m6,
+        patch("app.api.bookings.notify_bulk_cancelled", new_callable=AsyncMock) as m7,
+        patch("app.api.bookings.notify_bulk_rescheduled", new_callable=AsyncMock) as m8,
     ):
         yield {
             "new": m1,
@@ -200,4 +257,6 @@ def mock_notifications():
             "admin_cancelled": m4,
             "client_rescheduled": m5,
             "admins_rescheduled": m6,
+            "bulk_cancelled": m7,
+            "bulk_rescheduled": m8,
         }
@@ -1,5 +1,9 @@
 """Tests for booking flow: create, list, cancel."""
 
+import csv
+import io
+import json
+
 import pytest
 from app.models.models import Booking, BookingStatus, SlotStatus
 
@@ -407,3 +411,250 @@ async def test_admin_reschedule_slot_not_found(
     )
     assert r.status_code == 404
     assert "слот" in r.json()["detail"].lower()
+
+
+# --- Export ---
+
+
+async def _seed_export_bookings(db, seed_user, seed_service, seed_slot, seed_slot_2):
+    db.add_all([
+        Booking(
+            client_id=seed_user.id,
+            service_id=seed_service.id,
+            slot_id=seed_slot.id,
+            status=BookingStatus.confirmed,
+        ),
+        Booking(
+            client_id=seed_user.id,
+            service_id=seed_service.id,
+            slot_id=seed_slot_2.id,
+            status=BookingStatus.cancelled,
+        ),
+    ])
+    await db.commit()
+
+
+async def test_export_bookings_csv(admin_client, db, seed_user, seed_service, seed_slot, seed_slot_2):
+    await _seed_export_bookings(db, seed_user, seed_service, seed_slot, seed_slot_2)
+
+    r = await admin_client.get("/api/bookings/export")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/csv")
+    assert "bookings.csv" in r.headers["content-disposition"]
+    lines = r.text.lstrip("\ufeff").strip().splitlines()
+    assert lines[0].startswith("id,date,start_time")
+    assert len(lines) == 3
+
+
+async def test_export_csv_neutralizes_formulas(admin_client, db, seed_user, seed_service, seed_slot, seed_slot_2):
+    seed_user.first_name = '=HYPERLINK("http://evil.example","x")'
+    await _seed_export_bookings(db, seed_user, seed_service, seed_slot, seed_slot_2)
+
+    r = await admin_client.get("/api/bookings/export")
+    rows = list(csv.DictReader(io.StringIO(r.text.lstrip("\ufeff"))))
+    assert rows[0]["client_name"] == '\'=HYPERLINK("http://evil.example","x")'
+    assert rows[0]["client_phone"] == "+375291234567"
+
+    r = await admin_client.get("/api/bookings/export", params={"format": "ndjson"})
+    first = json.loads(r.text.splitlines()[0])
+    assert first["client_name"] == '=HYPERLINK("http://evil.example","x")'
+
+
+async def test_export_csv_keeps_phone_numbers(admin_client, db, seed_user, seed_service, seed_slot, seed_slot_2):
+    seed_user.phone = "+375 (29) 123-45-67"
+    await _seed_export_bookings(db, seed_user, seed_service, seed_slot, seed_slot_2)
+
+    r = await admin_client.get("/api/bookings/export")
+    rows = list(csv.DictReader(io.StringIO(r.text.lstrip("\ufeff"))))
+    assert [row["client_phone"] for row in rows] == ["+375 (29) 123-45-67"] * 2
+
+
+async def test_export_bookings_ndjson_status_filter(
+    admin_client, db, seed_user, seed_service, seed_slot, seed_slot_2
+):
+    await _seed_export_bookings(db, seed_user, seed_service, seed_slot, seed_slot_2)
+
+    r = await admin_client.get("/api/bookings/export", params={"format": "ndjson", "status": "cancelled"})
+    assert r.status_code == 200
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert len(rows) == 1
+    assert rows[0]["status"] == "cancelled"
+    assert rows[0]["service"] == seed_service.name
+
+
+async def test_export_bookings_date_range(
+    admin_client, db, seed_user, seed_service, seed_slot, seed_slot_2
+):
+    await _seed_export_bookings(db, seed_user, seed_service, seed_slot, seed_slot_2)
+
+    r = await admin_client.get(
+        "/api/bookings/export",
+        params={"format": "ndjson", "date_from": "2027-01-01"},
+    )
+    assert r.status_code == 200
+    assert r.text == ""
+
+    r = await admin_client.get(
+        "/api/bookings/export",
+        params={"date_from": "2026-12-31", "date_to": "2026-12-01"},
+    )
+    assert r.status_code == 400
+
+
+async def test_export_bookings_non_admin(client):
+    r = await client.get("/api/bookings/export")
+    assert r.status_code == 403
+
+
+# --- Bulk admin cancel / reschedule ---
+
+
+async def _confirmed_booking(db, user, service, slot):
+    booking = Booking(client_id=user.id, service_id=service.id, slot_id=slot.id, status=BookingStatus.confirmed)
+    slot.status = SlotStatus.booked
+    db.add(booking)
+    await db.commit()
+    await db.refresh(booking)
+    return booking
+
+
+async def test_admin_bulk_cancel(
+    admin_client, db, seed_user, seed_service, seed_slot, seed_slot_2, mock_notifications
+):
+    b1 = await _confirmed_booking(db, seed_user, seed_service, seed_slot)
+    b2 = await _confirmed_booking(db, seed_user, seed_service, seed_slot_2)
+
+    r = await admin_client.patch(
+        "/api/bookings/admin-bulk-cancel",
+        json={"date_from": "2026-12-25", "date_to": "2026-12-25"},
+    )
+    assert r.status_code == 200
+    assert r.json() == {"processed": 1, "skipped": []}
+
+    await db.refresh(b1)
+    await db.refresh(b2)
+    await db.refresh(seed_slot)
+    assert b1.status == BookingStatus.cancelled
+    assert b2.status == BookingStatus.confirmed
+    assert seed_slot.status == SlotStatus.blocked
+
+    mock_notifications["bulk_cancelled"].assert_called_once()
+    notices = mock_notifications["bulk_cancelled"].call_args.args[0]
+    assert [n.telegram_id for n in notices] == [seed_user.telegram_id]
+    mock_notifications["cancelled"].assert_not_called()
+
+
+async def test_admin_bulk_cancel_release_slots(
+    admin_client, db, seed_user, seed_service, seed_slot, mock_notifications
+):
+    await _confirmed_booking(db, seed_user, seed_service, seed_slot)
+
+    r = await admin_client.patch(
+        "/api/bookings/admin-bulk-cancel",
+        json={"date_from": "2026-12-25", "date_to": "2026-12-25", "block_slots": False},
+    )
+    assert r.json()["processed"] == 1
+    await db.refresh(seed_slot)
+    assert seed_slot.status == SlotStatus.available
+
+
+async def test_admin_bulk_cancel_empty_range(admin_client, mock_notifications):
+    r = await admin_client.patch(
+        "/api/bookings/admin-bulk-cancel",
+        json={"date_from": "2026-12-01", "date_to": "2026-12-02"},
+    )
+    assert r.json() == {"processed": 0, "skipped": []}
+    mock_notifications["bulk_cancelled"].assert_not_called()
+
+
+async def test_admin_bulk_reschedule(
+    admin_client, db, seed_user, seed_service, seed_slot, mock_notifications
+):
+    from datetime import date, time
+
+    from app.models.models import Slot
+
+    # Вторая запись: на 11:00, для неё нет свободного слота через день
+    slot_11 = Slot(date=date(2026, 12, 25), start_time=time(11, 0), end_time=time(11, 20))
+    target = Slot(date=date(2026, 12, 27), start_time=time(10, 0), end_time=time(10, 20))
+    db.add_all([slot_11, target])
+    await db.commit()
+    moved = await _confirmed_booking(db, seed_user, seed_service, seed_slot)
+    stuck = await _confirmed_booking(db, seed_user, seed_service, slot_11)
+
+    r = await admin_client.patch(
+        "/api/bookings/admin-bulk-reschedule",
+        json={"date_from": "2026-12-25", "date_to": "2026-12-25", "shift_days": 2},
+    )
+    assert r.status_code == 200
+    assert r.json() == {"processed": 1, "skipped": [stuck.id]}
+
+    await db.refresh(moved)
+    await db.refresh(seed_slot)
+    await db.refresh(target)
+    assert moved.slot_id == target.id
+    assert target.status == SlotStatus.booked
+    assert seed_slot.status == SlotStatus.blocked
+
+    notices = mock_notifications["bulk_rescheduled"].call_args.args[0]
+    assert [(n.slot_date, n.new_date) for n in notices] == [("2026-12-25", "2026-12-27")]
+
+
+async def test_admin_bulk_reschedule_skips_slots_within_cutoff(
+    admin_client, db, seed_user, seed_service, mock_notifications
+):
+    from datetime import datetime, time, timedelta
+
+    from app.api.bookings import MINSK_TZ
+    from app.models.models import Slot
+
+    today = datetime.now(MINSK_TZ).date()
+    yesterday = today - timedelta(days=1)
+    # Целевой слот сегодня в 00:00 — уже прошёл, переносить на него нельзя
+    source = Slot(date=yesterday, start_time=time(0, 0), end_time=time(0, 20))
+    target = Slot(date=today, start_time=time(0, 0), end_time=time(0, 20))
+    db.add_all([source, target])
+    await db.commit()
+    booking = await _confirmed_booking(db, seed_user, seed_service, source)
+
+    r = await admin_client.patch(
+        "/api/bookings/admin-bulk-reschedule",
+        json={"date_from": str(yesterday), "date_to": str(yesterday), "shift_days": 1},
+    )
+    assert r.json() == {"processed": 0, "skipped": [booking.id]}
+
+    await db.refresh(target)
+    assert target.status == SlotStatus.available
+    mock_notifications["bulk_rescheduled"].assert_not_called()
+
+
+async def test_admin_bulk_requires_admin(client):
+    r = await client.patch(
+        "/api/bookings/admin-bulk-cancel",
+        json={"date_from": "2026-12-25", "date_to": "2026-12-25"},
+    )
+    assert r.status_code == 403
+
+
+async def test_notify_bulk_cancelled_sends_single_admin_digest():
+    from unittest.mock import AsyncMock, patch
+
+    from app.bot.notifications import BookingNotice, notify_bulk_cancelled
+
+    notices = [
+        BookingNotice(telegram_id=100 + i, first_name=f"C{i}", username=None,
+                      service_name="Загар", slot_date="2026-12-25", slot_time=f"1{i}:00")
+        for i in range(3)
+    ]
+    with (
+        patch("app.bot.notifications.bot") as bot,
+        patch("app.bot.notifications.tenant_admin_ids", lambda: [1, 2]),
+    ):
+        bot.send_message = AsyncMock()
+        await notify_bulk_cancelled(notices)
+
+    chat_ids = [c.kwargs["chat_id"] for c in bot.send_message.call_args_list]
+    assert sorted(chat_ids) == [1, 2, 100, 101, 102]
+    digest = bot.send_message.call_args_list[-1].kwargs["text"]
+    assert "Отменено записей: 3" in digest
+    assert "C2" in digest
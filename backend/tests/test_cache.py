@@ -0,0 +1,178 @@
+"""Tests for the shared cache backend and rate limiting."""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import time
+from unittest.mock import patch
+from urllib.parse import urlencode
+
+import pytest
+
+from app.core.cache import MemoryCache, cached, invalidate
+from app.core.config import settings
+from app.core.single_flight import SingleFlight
+
+
+def _init_data(user_id: int, bot_token: str | None = None) -> str:
+    """Telegram initData for a given user id, signed by bot_token (default BOT_TOKEN)."""
+    fields = {
+        "auth_date": str(int(time.time())),
+        "user": json.dumps({"id": user_id, "first_name": "U"}),
+    }
+    check = "\n".join(f"{k}={v}" for k, v in sorted(fields.items()))
+    secret = hmac.new(b"WebAppData", (bot_token or settings.bot_token).encode(), hashlib.sha256).digest()
+    fields["hash"] = hmac.new(secret, check.encode(), hashlib.sha256).hexdigest()
+    return urlencode(fields)
+
+
+# --- MemoryCache ---
+
+
+async def test_memory_cache_ttl():
+    c = MemoryCache()
+    await c.set("k", b"v", ttl=60)
+    assert await c.get("k") == b"v"
+    await c.set("k", b"v", ttl=-1)
+    assert await c.get("k") is None
+
+
+async def test_memory_cache_incr():
+    c = MemoryCache()
+    assert await c.incr("n", ttl=60) == 1
+    assert await c.incr("n", ttl=60) == 2
+    assert await c.get("n") == b"2"
+
+
+async def test_memory_cache_lru_bound():
+    c = MemoryCache(max_entries=2)
+    await c.set("a", b"1", ttl=60)
+    await c.set("b", b"2", ttl=60)
+    await c.get("a")
+    await c.set("c", b"3", ttl=60)
+    assert await c.get("b") is None
+    assert await c.get("a") == b"1"
+
+
+async def test_cached_and_invalidate():
+    calls = 0
+
+    async def producer() -> bytes:
+        nonlocal calls
+        calls += 1
+        return f"v{calls}".encode()
+
+    assert await cached("ns", "k", 60, producer) == b"v1"
+    assert await cached("ns", "k", 60, producer) == b"v1"
+    await invalidate("ns")
+    assert await cached("ns", "k", 60, producer) == b"v2"
+
+
+# --- Single-flight ---
+
+
+async def test_concurrent_misses_share_one_producer():
+    calls = 0
+    release = asyncio.Event()
+
+    async def producer() -> bytes:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return b"slots"
+
+    waiters = [asyncio.create_task(cached("herd", "day", 60, producer)) for _ in range(50)]
+    await asyncio.sleep(0)
+    release.set()
+    assert await asyncio.gather(*waiters) == [b"slots"] * 50
+    assert calls == 1
+
+
+async def test_single_flight_shares_exception_then_forgets_it():
+    flights: SingleFlight[int] = SingleFlight()
+    calls = 0
+
+    async def boom() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError("db down")
+
+    results = await asyncio.gather(*(flights.do("k", boom) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert calls == 1
+    assert len(flights) == 0
+
+    async def ok() -> int:
+        return 42
+
+    assert await flights.do("k", ok) == 42
+
+
+async def test_single_flight_leader_cancel_does_not_fail_followers():
+    flights: SingleFlight[str] = SingleFlight()
+    started = asyncio.Event()
+
+    async def slow() -> str:
+        started.set()
+        await asyncio.sleep(10)
+        return "leader"
+
+    async def fast() -> str:
+        return "own"
+
+    leader = asyncio.create_task(flights.do("k", slow))
+    await started.wait()
+    follower = asyncio.create_task(flights.do("k", fast))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == "own"
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+
+
+# --- Response cache through the API ---
+
+
+async def test_services_cache_invalidated_on_create(admin_client, seed_service):
+    r = await admin_client.get("/api/services/")
+    assert len(r.json()) == 1
+
+    r = await admin_client.post("/api/services/", json={"name": "Новая", "price": 10})
+    assert r.status_code == 201
+
+    r = await admin_client.get("/api/services/")
+    assert len(r.json()) == 2
+
+
+# --- Rate limiting ---
+
+
+async def test_rate_limit_exceeded(client):
+    with patch("app.core.rate_limit.settings.rate_limit", "3/minute"):
+        statuses = [(await client.get("/")).status_code for _ in range(4)]
+    assert statuses == [200, 200, 200, 429]
+
+
+async def test_rate_limit_keyed_by_telegram_user(client):
+    """Users behind one NAT IP get separate buckets."""
+    with patch("app.core.rate_limit.settings.rate_limit", "2/minute"):
+        for user_id in (111, 222):
+            headers = {"Authorization": f"tma {_init_data(user_id)}"}
+            statuses = [(await client.get("/", headers=headers)).status_code for _ in range(3)]
+            assert statuses == [200, 200, 429]
+
+
+async def test_rate_limit_exempts_health(client):
+    with patch("app.core.rate_limit.settings.rate_limit", "1/minute"):
+        statuses = [(await client.get("/health")).status_code for _ in range(3)]
+    assert statuses == [200, 200, 200]
+
+
+@pytest.mark.parametrize("spec,expected", [("100/minute", (100, 60)), ("5/seconds", (5, 1))])
+def test_parse_limit(spec, expected):
+    from app.core.rate_limit import parse_limit
+
+    assert parse_limit(spec) == expected
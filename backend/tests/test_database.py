@@ -0,0 +1,88 @@
+"""Tests for engine/pool configuration (app.core.database)."""
+
+from unittest.mock import patch
+
+import pytest
+
+from app.core.database import _connect_args, create_engine_for_role, get_read_db
+
+PG_URL = "postgresql+asyncpg://u:p@localhost/db"
+
+
+def test_connect_args_statement_cache():
+    args = _connect_args(PG_URL, "api")
+    assert args["statement_cache_size"] == 100
+    assert args["prepared_statement_cache_size"] == 100
+    assert args["server_settings"]["application_name"].endswith("-api")
+
+
+def test_connect_args_pgbouncer_disables_prepared_cache():
+    with patch("app.core.database.settings.db_pgbouncer", True):
+        args = _connect_args(PG_URL, "scheduler")
+    assert args["statement_cache_size"] == 0
+    assert args["prepared_statement_cache_size"] == 0
+    name_func = args["prepared_statement_name_func"]
+    assert name_func() != name_func()
+
+
+def test_connect_args_statement_timeout():
+    with patch("app.core.database.settings.db_statement_timeout_ms", 5000):
+        args = _connect_args(PG_URL, "api")
+    assert args["server_settings"]["statement_timeout"] == "5000"
+
+
+def test_connect_args_non_asyncpg():
+    assert _connect_args("sqlite+aiosqlite:///:memory:", "api") == {}
+
+
+def test_engine_for_role_pool_size():
+    eng = create_engine_for_role(PG_URL, "scheduler", pool_size=3, max_overflow=1)
+    assert eng.pool.size() == 3
+    assert eng.pool._max_overflow == 1
+
+
+def test_engine_for_role_sqlite_ignores_pool_args():
+    eng = create_engine_for_role("sqlite+aiosqlite:///:memory:", "api", pool_size=3, max_overflow=1)
+    assert eng.dialect.name == "sqlite"
+
+
+async def test_read_session_without_replica_uses_primary():
+    import app.core.database as database
+
+    assert database.read_engine is None
+    async with database.read_session() as session:
+        assert session.bind is database.engine
+
+
+async def test_read_session_falls_back_when_replica_lags():
+    import app.core.database as database
+
+    with (
+        patch.object(database, "read_engine", object()),
+        patch.object(database, "async_session_read", lambda: None),
+        patch.object(database, "_replica_ok", False),
+        patch.object(database, "_replica_checked_at", float("inf")),
+    ):
+        async with database.read_session(fallback=database.scheduler_session) as session:
+            assert session.bind is database.scheduler_engine
+
+
+async def _lagging_replica():
+    raise AssertionError("cached endpoint read from the replica")
+    yield
+
+
+@pytest.mark.parametrize("path,params", [
+    ("/api/salon", {}),
+    ("/api/faq", {}),
+    ("/api/services/", {}),
+    ("/api/slots/", {"date": "2026-12-25"}),
+    ("/api/slots/availability", {"from": "2026-12-25", "to": "2026-12-31"}),
+])
+async def test_cached_endpoints_fill_from_primary(client, path, params):
+    """A miss right after invalidate() must not re-cache stale replica data for the whole TTL."""
+    from app.main import app
+
+    app.dependency_overrides[get_read_db] = _lagging_replica
+    r = await client.get(path, params=params)
+    assert r.status_code == 200
@@ -0,0 +1,124 @@
+"""Tests for the live event hub (app.core.events) and GET /api/events."""
+
+import asyncio
+import json
+
+from app.api.events import stream_events
+from app.core import events
+from app.core.events import EventHub, hub, sse_stream
+from app.models.models import Booking, SlotStatus
+from tests.conftest import TEST_ADMIN, TEST_USER
+
+
+def _drain(sub) -> list[dict]:
+    items = []
+    while not sub.queue.empty():
+        items.append(sub.queue.get_nowait())
+    return items
+
+
+async def test_booking_events_only_for_admins():
+    local = EventHub()
+    async with local.subscribe() as client_sub, local.subscribe(admin=True) as admin_sub:
+        local.publish({"type": "slot", "slot_id": 1})
+        local.publish({"type": "booking", "booking_id": 1})
+        assert [e["type"] for e in _drain(client_sub)] == ["slot"]
+        assert [e["type"] for e in _drain(admin_sub)] == ["slot", "booking"]
+    assert local.subscriber_count == 0
+
+
+async def test_stream_heartbeat_and_resync(monkeypatch):
+    monkeypatch.setattr(events, "SUBSCRIBER_QUEUE_SIZE", 2)
+    local = EventHub()
+    async with local.subscribe() as sub:
+        stream = sse_stream(sub, heartbeat=0.01)
+        assert (await anext(stream)).startswith("retry:")
+        assert await anext(stream) == ": ping\n\n"
+
+        for i in range(3):  # третье не влезает — подписчик отстал
+            local.publish({"type": "slot", "slot_id": i})
+        chunk = await anext(stream)
+        assert chunk.startswith("event: resync\n")
+        assert sub.queue.empty()
+
+        local.publish({"type": "slot", "slot_id": 7})
+        chunk = await anext(stream)
+        assert chunk.startswith("event: slot\n")
+        assert json.loads(chunk.split("data: ", 1)[1])["slot_id"] == 7
+        await stream.aclose()
+
+
+async def test_create_booking_publishes_slot_and_booking(
+    client, seed_user, seed_service, seed_slot, mock_notifications
+):
+    async with hub.subscribe(admin=True) as sub:
+        r = await client.post("/api/bookings/", json={"service_id": seed_service.id, "slot_id": seed_slot.id})
+        assert r.status_code == 200
+        published = _drain(sub)
+
+    assert published[0] == {
+        "type": "slot",
+        "date": str(seed_slot.date),
+        "slot_id": seed_slot.id,
+        "start_time": "10:00",
+        "end_time": "10:20",
+        "status": "booked",
+    }
+    assert published[1] == {
+        "type": "booking",
+        "action": "created",
+        "booking_id": r.json()["id"],
+        "date": str(seed_slot.date),
+    }
+
+
+async def test_admin_cancel_publishes_released_slot(
+    admin_client, db, seed_user, seed_service, seed_slot, mock_notifications
+):
+    booking = Booking(client_id=seed_user.id, service_id=seed_service.id, slot_id=seed_slot.id)
+    seed_slot.status = SlotStatus.booked
+    db.add(booking)
+    await db.commit()
+
+    async with hub.subscribe() as sub:
+        r = await admin_client.patch(f"/api/bookings/{booking.id}/admin-cancel")
+        assert r.status_code == 200
+        published = _drain(sub)
+
+    # Клиент видит освободившийся слот, но не событие записи
+    assert [(e["type"], e.get("status")) for e in published] == [("slot", "available")]
+
+
+async def test_bulk_slot_update_publishes_day_range(admin_client, seed_slot):
+    async with hub.subscribe() as sub:
+        r = await admin_client.patch(
+            "/api/slots/bulk",
+            json={"status": "blocked", "date_from": str(seed_slot.date), "date_to": str(seed_slot.date)},
+        )
+        assert r.status_code == 200
+        published = _drain(sub)
+
+    assert published == [
+        {"type": "days", "date_from": str(seed_slot.date), "date_to": str(seed_slot.date)}
+    ]
+
+
+async def test_stream_endpoint_subscribes_by_role():
+    response = await stream_events(TEST_ADMIN)
+    assert response.media_type == "text/event-stream"
+    assert response.headers["content-encoding"] == "identity"
+
+    body = response.body_iterator
+    assert (await anext(body)).startswith("retry:")
+    hub.publish({"type": "booking", "booking_id": 1})
+    assert (await anext(body)).startswith("event: booking\n")
+    await body.aclose()
+    assert hub.subscriber_count == 0
+
+    response = await stream_events(TEST_USER)
+    body = response.body_iterator
+    await anext(body)
+    hub.publish({"type": "booking", "booking_id": 1})
+    hub.publish({"type": "slot", "slot_id": 1})
+    assert (await asyncio.wait_for(anext(body), 1)).startswith("event: slot\n")
+    await body.aclose()
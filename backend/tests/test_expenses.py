@@ -1,5 +1,7 @@
 """Tests for admin expense endpoints."""
 
+import json
+
 import pytest
 
 
@@ -70,3 +72,63 @@ async def test_invalid_expense_amount(admin_client):
         json={"name": "Test", "amount": -5.0, "month": "2026-02"},
     )
     assert r.status_code == 422
+
+
+async def test_export_expenses(admin_client):
+    for month in ("2026-01", "2026-02", "2026-03"):
+        await admin_client.post(
+            "/api/expenses/",
+            json={"name": "Крем", "amount": 10, "month": month},
+        )
+
+    r = await admin_client.get(
+        "/api/expenses/export",
+        params={"format": "ndjson", "month_from": "2026-02", "month_to": "2026-03"},
+    )
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert [row["month"] for row in rows] == ["2026-02", "2026-03"]
+    assert rows[0]["amount"] == 10.0
+
+    r = await admin_client.get("/api/expenses/export")
+    assert r.status_code == 200
+    assert "Крем" in r.text
+    assert len(r.text.strip().splitlines()) == 4
+
+
+async def test_export_expenses_bad_range(admin_client):
+    r = await admin_client.get(
+        "/api/expenses/export",
+        params={"month_from": "2026-05", "month_to": "2026-01"},
+    )
+    assert r.status_code == 400
+
+
+async def test_expense_totals(admin_client):
+    for month, amount in (("2026-01", 10), ("2026-01", 15.5), ("2026-03", 40)):
+        await admin_client.post("/api/expenses/", json={"name": "Крем", "amount": amount, "month": month})
+
+    r = await admin_client.get("/api/expenses/totals", params={"month_from": "2025-12", "month_to": "2026-03"})
+    assert r.status_code == 200
+    assert r.json() == [
+        {"month": "2025-12", "total": 0.0, "count": 0},
+        {"month": "2026-01", "total": 25.5, "count": 2},
+        {"month": "2026-02", "total": 0.0, "count": 0},
+        {"month": "2026-03", "total": 40.0, "count": 1},
+    ]
+
+
+async def test_expense_totals_bad_range(admin_client):
+    r = await admin_client.get("/api/expenses/totals", params={"month_from": "2026-05", "month_to": "2026-01"})
+    assert r.status_code == 400
+    r = await admin_client.get("/api/expenses/totals", params={"month_from": "2020-01", "month_to": "2026-01"})
+    assert r.status_code == 400
+    r = await admin_client.get("/api/expenses/totals", params={"month_from": "0001-01", "month_to": "9999-12"})
+    assert r.status_code == 400
+
+
+async def test_expense_totals_up_to_last_representable_month(admin_client):
+    r = await admin_client.get("/api/expenses/totals", params={"month_from": "9999-11", "month_to": "9999-12"})
+    assert r.status_code == 200
+    assert [m["month"] for m in r.json()] == ["9999-11", "9999-12"]
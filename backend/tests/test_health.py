@@ -1,8 +1,14 @@
 """Tests for root and health endpoints."""
 
 import pytest
+from sqlalchemy import update
 
+from app.core import warmup
+from app.core.cache import cache
 from app.core.config import settings
+from app.core.database import POOL_STAT_KEYS
+from app.models.models import Service
+from tests.conftest import TestSession, engine_test
 
 
 async def test_root(client):
@@ -19,3 +25,45 @@ async def test_health(client):
     data = r.json()
     assert data["status"] == "ok"
     assert data["db"] == "connected"
+
+
+async def test_health_pool(admin_client):
+    r = await admin_client.get("/health/pool")
+    assert r.status_code == 200
+    data = r.json()
+    assert set(data) == {"api", "scheduler"}
+    assert tuple(data["api"]) == POOL_STAT_KEYS
+    # SQLite (DATABASE_URL в CI) — StaticPool без счётчиков
+    if data["api"]["size"] is not None:
+        assert data["api"]["checked_out"] == 0
+
+
+async def test_health_pool_requires_admin(client):
+    r = await client.get("/health/pool")
+    assert r.status_code == 403
+
+
+async def test_ready_after_warmup(client, monkeypatch):
+    monkeypatch.setattr(warmup, "_ready", False)
+    r = await client.get("/health/ready")
+    assert r.status_code == 503
+    assert r.json()["status"] == "warming_up"
+
+    await warmup.warmup([engine_test], TestSession)
+    r = await client.get("/health/ready")
+    assert r.status_code == 200
+
+
+async def test_warmup_prerenders_cached_payloads(client, db, seed_service, monkeypatch):
+    monkeypatch.setattr(warmup, "_ready", False)
+    await warmup.warmup([engine_test], TestSession)
+
+    # Меняем услугу в обход API (без invalidate): ответ уже лежит в кэше с прогрева
+    await db.execute(update(Service).values(name="Переименована"))
+    await db.commit()
+    r = await client.get("/api/services/")
+    assert [s["name"] for s in r.json()] == ["Автозагар"]
+
+    keys = list(cache._data)
+    assert any(":avail:" in k for k in keys)
+    assert sum(":day:" in k for k in keys) == warmup.CALENDAR_DAYS
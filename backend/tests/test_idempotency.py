@@ -0,0 +1,126 @@
+"""Tests for Idempotency-Key on booking mutations (app.core.idempotency)."""
+
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from sqlalchemy import func, select
+
+from app.core.cache import cache
+from app.core.idempotency import REPLAYED_HEADER, prune_keys
+from app.models.models import Booking, IdempotencyKey, User
+
+KEY = {"Idempotency-Key": "5b0f6a0e-2c1d-4d7e-9a51-1f0c2e7d9b44"}
+
+
+async def _create(client, service, slot, headers=KEY):
+    return await client.post(
+        "/api/bookings/",
+        json={"service_id": service.id, "slot_id": slot.id, "remind_before_hours": 2},
+        headers=headers,
+    )
+
+
+async def _booking_count(db) -> int:
+    return (await db.execute(select(func.count(Booking.id)))).scalar_one()
+
+
+async def test_retry_returns_stored_booking(client, db, seed_user, seed_service, seed_slot, mock_notifications):
+    first = await _create(client, seed_service, seed_slot)
+    retry = await _create(client, seed_service, seed_slot)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers[REPLAYED_HEADER] == "true"
+    assert REPLAYED_HEADER not in first.headers
+    assert await _booking_count(db) == 1
+    mock_notifications["new"].assert_called_once()
+    mock_notifications["confirmed"].assert_called_once()
+
+
+async def test_retry_replays_from_table_without_front_cache(
+    client, seed_user, seed_service, seed_slot, mock_notifications
+):
+    first = await _create(client, seed_service, seed_slot)
+    cache.clear()  # другой воркер без Redis / кэш вытеснен
+
+    retry = await _create(client, seed_service, seed_slot)
+    assert retry.status_code == 200
+    assert retry.json()["id"] == first.json()["id"]
+    assert retry.headers[REPLAYED_HEADER] == "true"
+
+
+async def test_without_key_second_request_is_not_replayed(
+    client, seed_user, seed_service, seed_slot, mock_notifications
+):
+    assert (await _create(client, seed_service, seed_slot, headers=None)).status_code == 200
+    r = await _create(client, seed_service, seed_slot, headers=None)
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Слот уже занят или заблокирован"
+
+
+async def test_key_reused_for_other_request_is_422(
+    client, seed_user, seed_service, seed_slot, seed_slot_2, mock_notifications
+):
+    assert (await _create(client, seed_service, seed_slot)).status_code == 200
+
+    r = await _create(client, seed_service, seed_slot_2)
+    assert r.status_code == 422
+    assert r.json()["detail"] == "Ключ идемпотентности уже использован для другого запроса"
+
+
+async def test_failed_request_is_not_stored(client, db, seed_service, seed_slot, mock_notifications):
+    """4xx до commit откатывает и ключ: повтор после исправления выполняется заново."""
+    r = await _create(client, seed_service, seed_slot)
+    assert r.status_code == 404
+
+    db.add(User(telegram_id=12345, username="testuser", first_name="Test", consent_given=True, phone="+375291234567"))
+    await db.commit()
+
+    r = await _create(client, seed_service, seed_slot)
+    assert r.status_code == 200
+    assert REPLAYED_HEADER not in r.headers
+
+
+async def test_failure_after_commit_still_replays(client, db, seed_user, seed_service, seed_slot, mock_notifications):
+    """The stored response is committed with the booking, so an error after commit does not wedge the key."""
+    with patch("app.api.bookings._send_new_booking_notifications", side_effect=RuntimeError("telegram down")):
+        with pytest.raises(RuntimeError):
+            await _create(client, seed_service, seed_slot)
+    cache.clear()
+
+    retry = await _create(client, seed_service, seed_slot)
+    assert retry.status_code == 200
+    assert retry.headers[REPLAYED_HEADER] == "true"
+    assert retry.json()["slot"]["id"] == seed_slot.id
+    assert await _booking_count(db) == 1
+
+
+async def test_admin_reschedule_retry_does_not_notify_twice(
+    admin_client, client, seed_user, seed_service, seed_slot, seed_slot_2, mock_notifications
+):
+    booking_id = (await _create(client, seed_service, seed_slot, headers=None)).json()["id"]
+    url = f"/api/bookings/{booking_id}/admin-reschedule"
+    body = {"new_slot_id": seed_slot_2.id}
+
+    first = await admin_client.patch(url, json=body, headers=KEY)
+    retry = await admin_client.patch(url, json=body, headers=KEY)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json()["slot"]["id"] == seed_slot_2.id
+    mock_notifications["client_rescheduled"].assert_called_once()
+    mock_notifications["admins_rescheduled"].assert_called_once()
+
+
+async def test_prune_keys_removes_expired(db):
+    now = datetime.utcnow()
+    db.add_all([
+        IdempotencyKey(actor_id=1, key="old", request_hash="h", created_at=now - timedelta(days=2)),
+        IdempotencyKey(actor_id=1, key="fresh", request_hash="h", created_at=now),
+    ])
+    await db.commit()
+
+    assert await prune_keys(db) == 1
+    keys = (await db.execute(select(IdempotencyKey.key))).scalars().all()
+    assert keys == ["fresh"]
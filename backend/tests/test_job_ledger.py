@@ -0,0 +1,65 @@
+"""Tests for the scheduler job-run ledger (app.bot.job_ledger)."""
+
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.bot.job_ledger import STALE_RUN_AFTER, claim_run, finish_run, job_run, prune_runs
+from app.models.models import JobRun, JobRunStatus
+from tests.conftest import TestSession
+
+
+async def test_claim_once(db):
+    assert await claim_run(db, "summary", "2026-12-25") is True
+    assert await claim_run(db, "summary", "2026-12-25") is False
+    # Другой ключ — другой запуск
+    assert await claim_run(db, "summary", "2026-12-26") is True
+
+
+async def test_done_run_not_repeated(db):
+    async with job_run(TestSession, "autogen", "2026-12-25") as claimed:
+        assert claimed
+    async with job_run(TestSession, "autogen", "2026-12-25") as claimed:
+        assert not claimed
+
+    run = (await db.execute(select(JobRun))).scalar_one()
+    assert run.status == JobRunStatus.done
+    assert run.finished_at is not None
+
+
+async def test_failed_run_is_retried(db):
+    with pytest.raises(RuntimeError):
+        async with job_run(TestSession, "autogen", "2026-12-25") as claimed:
+            assert claimed
+            raise RuntimeError("boom")
+
+    async with job_run(TestSession, "autogen", "2026-12-25") as claimed:
+        assert claimed
+
+    run = (await db.execute(select(JobRun))).scalar_one()
+    await db.refresh(run)
+    assert run.status == JobRunStatus.done
+    assert run.attempts == 2
+
+
+async def test_stale_running_is_reclaimed(db):
+    assert await claim_run(db, "reminders", "2026-12-25T10:00")
+    run = (await db.execute(select(JobRun))).scalar_one()
+    run.started_at -= STALE_RUN_AFTER + timedelta(minutes=1)
+    await db.commit()
+
+    assert await claim_run(db, "reminders", "2026-12-25T10:00") is True
+
+
+async def test_prune_runs(db):
+    await claim_run(db, "reminders", "old")
+    await finish_run(db, "reminders", "old", ok=True)
+    run = (await db.execute(select(JobRun))).scalar_one()
+    run.started_at -= timedelta(days=60)
+    await db.commit()
+    await claim_run(db, "reminders", "new")
+
+    assert await prune_runs(db, timedelta(days=30)) == 1
+    keys = (await db.execute(select(JobRun.run_key))).scalars().all()
+    assert keys == ["new"]
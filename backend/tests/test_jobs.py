@@ -0,0 +1,103 @@
+"""Tests for background admin jobs (app.core.jobs) and /api/jobs."""
+
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import func, select
+
+from app.api.slots import MINSK_TZ
+from app.core import jobs
+from app.models.models import Job, JobStatus, ScheduleTemplate, Slot
+from tests.conftest import TestSession
+
+
+def _next_monday() -> date:
+    today = datetime.now(MINSK_TZ).date()
+    return today + timedelta(days=7 - today.weekday())
+
+
+async def test_generate_range_job_creates_slots(admin_client, db):
+    monday = _next_monday()
+    db.add(ScheduleTemplate(day_of_week=0, start_time=time(10, 0), end_time=time(11, 0), interval_minutes=20))
+    await db.commit()
+
+    r = await admin_client.post(
+        "/api/slots/generate-range", json={"date_from": str(monday), "date_to": str(monday + timedelta(days=6))}
+    )
+    assert r.status_code == 202
+    job = r.json()
+    assert job["status"] == "queued"
+
+    await jobs.run_job(job["id"], TestSession)
+
+    r = await admin_client.get(f"/api/jobs/{job['id']}")
+    assert r.status_code == 200
+    body = r.json()
+    assert body["status"] == "done"
+    assert body["progress"] == 100
+    assert body["result"] == {"created": 3, "days": 1}
+
+    count = await db.scalar(select(func.count()).select_from(Slot).where(Slot.date == monday))
+    assert count == 3
+
+
+async def test_job_runs_once(admin_client, db):
+    r = await admin_client.post(
+        "/api/slots/generate-range", json={"date_from": str(_next_monday()), "date_to": str(_next_monday())}
+    )
+    job_id = r.json()["id"]
+
+    await jobs.run_job(job_id, TestSession)
+    # Повторный запуск той же задачи (другой воркер) — ничего не делает
+    await jobs.run_job(job_id, TestSession)
+
+    job = await db.get(Job, job_id)
+    assert job.status == JobStatus.done
+
+
+async def test_failing_handler_marks_job_failed(db, monkeypatch):
+    async def broken(ctx, **params):
+        raise RuntimeError("boom")
+
+    monkeypatch.setitem(jobs.HANDLERS, "broken", broken)
+    job = await jobs.enqueue(db, "broken", {})
+
+    await jobs.run_job(job.id, TestSession)
+
+    job = (
+        await db.execute(select(Job).where(Job.id == job.id).execution_options(populate_existing=True))
+    ).scalar_one()
+    assert job.status == JobStatus.failed
+    assert job.error == "boom"
+
+
+async def test_generate_range_rejects_past(admin_client):
+    r = await admin_client.post(
+        "/api/slots/generate-range", json={"date_from": "2020-01-01", "date_to": "2020-01-02"}
+    )
+    assert r.status_code == 400
+
+
+async def test_get_job_not_found(admin_client):
+    r = await admin_client.get("/api/jobs/missing")
+    assert r.status_code == 404
+
+
+async def test_get_job_requires_admin(client):
+    r = await client.get("/api/jobs/missing")
+    assert r.status_code == 403
+
+
+async def test_prune_jobs_removes_old_finished(db):
+    now = datetime.utcnow()
+    old = now - jobs.JOBS_RETENTION - timedelta(days=1)
+    db.add_all([
+        Job(id="olddone", kind="k", status=JobStatus.done, created_at=old, finished_at=old),
+        Job(id="oldfailed", kind="k", status=JobStatus.failed, created_at=old, finished_at=old),
+        Job(id="freshdone", kind="k", status=JobStatus.done, created_at=now, finished_at=now),
+        Job(id="oldqueued", kind="k", status=JobStatus.queued, created_at=old),
+    ])
+    await db.commit()
+
+    assert await jobs.prune_jobs(db) == 2
+    ids = sorted((await db.execute(select(Job.id))).scalars())
+    assert ids == ["freshdone", "oldqueued"]
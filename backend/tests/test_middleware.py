@@ -0,0 +1,48 @@
+"""Tests for the security-headers / audit ASGI middleware (app.core.middleware)."""
+
+import logging
+
+from app.core.middleware import SECURITY_HEADERS, SecurityMiddleware
+
+
+async def test_security_headers_on_every_response(client):
+    for path in ("/", "/api/slots/nonexistent-route"):
+        r = await client.get(path)
+        for name, value in SECURITY_HEADERS.items():
+            assert r.headers[name] == value
+
+
+async def test_headers_on_cors_preflight(client):
+    r = await client.options(
+        "/api/slots/",
+        headers={"Origin": "http://localhost:5173", "Access-Control-Request-Method": "GET"},
+    )
+    assert r.headers["X-Frame-Options"] == "DENY"
+
+
+async def test_overrides_endpoint_header_and_keeps_body():
+    async def endpoint(scope, receive, send):
+        await send({"type": "http.response.start", "status": 201, "headers": [(b"x-frame-options", b"SAMEORIGIN")]})
+        await send({"type": "http.response.body", "body": b"chunk", "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/"}
+    await SecurityMiddleware(endpoint)(scope, None, send)
+
+    headers = sent[0]["headers"]
+    assert [v for k, v in headers if k == b"x-frame-options"] == [b"DENY"]
+    assert [m.get("body") for m in sent[1:]] == [b"chunk", b""]
+
+
+async def test_audit_logs_mutations_only(client, caplog):
+    with caplog.at_level(logging.INFO, logger="app.core.middleware"):
+        await client.get("/api/slots/", params={"date": "2026-01-01"})
+        await client.post("/api/bookings/", json={})
+
+    audit = [r.getMessage() for r in caplog.records if r.getMessage().startswith("AUDIT")]
+    assert audit == ["AUDIT POST /api/bookings/ -> 422"]
@@ -0,0 +1,113 @@
+"""Tests for bitset slot occupancy (app.core.occupancy) and duration-aware slot endpoints."""
+
+from datetime import date, time
+
+from app.core.occupancy import DayOccupancy, decode_days, encode_days
+from app.models.models import Slot, SlotStatus
+
+A, B, X = SlotStatus.available, SlotStatus.booked, SlotStatus.blocked
+DAY = date(2027, 3, 10)
+
+
+def _day(*spans):
+    """spans: (HH:MM start, HH:MM end, status)."""
+    return DayOccupancy.from_slots(
+        (time.fromisoformat(start), time.fromisoformat(end), status) for start, end, status in spans
+    )
+
+
+def test_counts_without_duration():
+    occ = _day(("09:00", "09:20", A), ("09:20", "09:40", B), ("09:40", "10:00", A), ("10:00", "10:20", X))
+    assert occ.count() == 2
+    assert (occ.booked, occ.blocked) == (1, 1)
+    assert occ.start_times() == [time(9, 0), time(9, 40)]
+
+
+def test_duration_needs_consecutive_free_slots():
+    occ = _day(
+        ("09:00", "09:20", A), ("09:20", "09:40", A), ("09:40", "10:00", B),
+        ("10:00", "10:20", A), ("10:20", "10:40", A), ("10:40", "11:00", A),
+    )
+    assert occ.start_times(20) == [time(9, 0), time(9, 20), time(10, 0), time(10, 20), time(10, 40)]
+    assert occ.start_times(40) == [time(9, 0), time(10, 0), time(10, 20)]
+    assert occ.start_times(60) == [time(10, 0)]
+    assert occ.count(30) == 3  # 30 мин — два слота по 20
+    assert occ.count(61) == 0
+
+
+def test_gap_between_slots_breaks_window():
+    occ = _day(("09:00", "09:30", A), ("10:00", "10:30", A))
+    assert occ.count(30) == 2
+    assert occ.count(60) == 0
+
+
+def test_off_grid_minutes_are_exact():
+    occ = _day(("09:05", "09:50", A), ("09:50", "10:17", A), ("10:17", "10:30", A))
+    assert occ.grid == 1
+    assert occ.start_times(70) == [time(9, 5)]
+    assert occ.start_times(40) == [time(9, 5), time(9, 50)]
+
+
+def test_encode_roundtrip_and_size():
+    busy = _day(*[
+        (f"{9 + i // 3:02d}:{i % 3 * 20:02d}", f"{9 + (i + 1) // 3:02d}:{(i + 1) % 3 * 20:02d}", A if i % 4 else B)
+        for i in range(36)
+    ])
+    days = [busy, DayOccupancy(), _day(("12:00", "12:45", A))]
+    buf = encode_days(DAY, days)
+
+    assert decode_days(buf) == {date(2027, 3, 10): days[0], date(2027, 3, 11): days[1], date(2027, 3, 12): days[2]}
+    assert len(busy.to_bytes()) <= 36  # не больше байта на слот (9:00–21:00 по 20 мин)
+
+
+# --- API ---
+
+
+async def _seed_day(db, spans, day=DAY):
+    db.add_all([
+        Slot(date=day, start_time=time.fromisoformat(s), end_time=time.fromisoformat(e), status=status)
+        for s, e, status in spans
+    ])
+    await db.commit()
+
+
+async def test_availability_with_duration(client, db):
+    await _seed_day(db, [("09:00", "09:20", A), ("09:20", "09:40", A), ("09:40", "10:00", B)])
+    await _seed_day(db, [("12:00", "12:20", A)], day=date(2027, 3, 11))
+    params = {"from": "2027-03-10", "to": "2027-03-12"}
+
+    r = await client.get("/api/slots/availability", params=params)
+    assert r.json() == {"2027-03-10": 2, "2027-03-11": 1}
+
+    r = await client.get("/api/slots/availability", params={**params, "duration": 40})
+    assert r.json() == {"2027-03-10": 1}
+
+    r = await client.get("/api/slots/availability", params={**params, "duration": 5})
+    assert r.status_code == 422
+
+
+async def test_slots_filtered_by_duration(client, db):
+    await _seed_day(db, [("09:00", "09:20", A), ("09:20", "09:40", A), ("09:40", "10:00", B)])
+
+    r = await client.get("/api/slots/", params={"date": "2027-03-10", "duration": 40})
+    assert [s["start_time"] for s in r.json()] == ["09:00:00"]
+
+    r = await client.get("/api/slots/", params={"date": "2027-03-10"})
+    assert len(r.json()) == 2
+
+
+async def test_availability_updates_after_booking(client, db, seed_user, seed_service, mock_notifications):
+    await _seed_day(db, [("09:00", "09:20", A), ("09:20", "09:40", A)])
+    params = {"from": "2027-03-10", "to": "2027-03-10", "duration": 40}
+    assert (await client.get("/api/slots/availability", params=params)).json() == {"2027-03-10": 1}
+
+    slots = (await client.get("/api/slots/", params={"date": "2027-03-10"})).json()
+    r = await client.post(
+        "/api/bookings/",
+        json={"service_id": seed_service.id, "slot_id": slots[1]["id"], "remind_before_hours": 2},
+    )
+    assert r.status_code == 200
+
+    assert (await client.get("/api/slots/availability", params=params)).json() == {}
+    params.pop("duration")
+    assert (await client.get("/api/slots/availability", params=params)).json() == {"2027-03-10": 1}
@@ -0,0 +1,74 @@
+"""Tests for the hot query registry (app.core.queries)."""
+
+from datetime import date, datetime, time
+
+from sqlalchemy import insert, select
+
+from app.core import queries
+from app.models.models import MINSK_TZ, Slot, SlotStatus
+
+
+def test_lambda_statement_cache_key_ignores_parameter_values():
+    """Разные значения — один ключ кэша: SQL компилируется один раз."""
+    key_a = queries.available_slots_for_day(date(2030, 1, 1))._generate_cache_key()
+    key_b = queries.available_slots_for_day(date(2030, 6, 15))._generate_cache_key()
+    assert key_a.key == key_b.key
+    values_a = {b.effective_value for b in key_a.bindparams}
+    assert datetime(2030, 1, 1, tzinfo=MINSK_TZ) in values_a
+    assert datetime(2030, 6, 15, tzinfo=MINSK_TZ) not in values_a
+
+
+def test_cutoff_variant_has_own_cache_key():
+    plain = queries.available_slots_for_day(date(2030, 1, 1))._generate_cache_key()
+    with_cutoff = queries.available_slots_for_day(
+        date(2030, 1, 1), datetime(2030, 1, 1, 12, 0, tzinfo=MINSK_TZ)
+    )._generate_cache_key()
+    assert plain.key != with_cutoff.key
+
+
+async def test_available_slots_for_day(db, seed_slot):
+    extra = Slot(date=seed_slot.date, start_time=time(9, 0), end_time=time(10, 0))
+    booked = Slot(
+        date=seed_slot.date,
+        start_time=time(11, 0),
+        end_time=time(12, 0),
+        status=SlotStatus.booked,
+    )
+    db.add_all([extra, booked])
+    await db.commit()
+
+    result = await db.execute(queries.available_slots_for_day(seed_slot.date))
+    assert [s.start_time for s in result.scalars()] == [time(9, 0), seed_slot.start_time]
+
+    cutoff = datetime.combine(seed_slot.date, time(9, 30), tzinfo=MINSK_TZ)
+    result = await db.execute(queries.available_slots_for_day(seed_slot.date, cutoff))
+    assert [s.id for s in result.scalars()] == [seed_slot.id]
+
+
+async def test_user_by_telegram_id(db, seed_user):
+    result = await db.execute(queries.user_by_telegram_id(seed_user.telegram_id))
+    assert result.scalar_one().id == seed_user.id
+
+    result = await db.execute(queries.user_by_telegram_id(-1))
+    assert result.scalar_one_or_none() is None
+
+
+async def test_slot_starts_at_filled_on_insert(db):
+    orm_slot = Slot(date=date(2030, 1, 1), start_time=time(9, 0), end_time=time(9, 20))
+    db.add(orm_slot)
+    await db.commit()
+    assert orm_slot.starts_at == datetime(2030, 1, 1, 9, 0, tzinfo=MINSK_TZ)
+    assert orm_slot.ends_at == datetime(2030, 1, 1, 9, 20, tzinfo=MINSK_TZ)
+
+    # Core insert пачкой — default считается для каждой строки
+    await db.execute(
+        insert(Slot),
+        [
+            {"date": date(2030, 1, 2), "start_time": time(10, 0), "end_time": time(10, 20)},
+            {"date": date(2030, 1, 2), "start_time": time(10, 20), "end_time": time(10, 40)},
+        ],
+    )
+    await db.commit()
+    cutoff = datetime(2030, 1, 2, 10, 10, tzinfo=MINSK_TZ)
+    result = await db.execute(select(Slot.start_time).where(Slot.starts_at > cutoff))
+    assert result.scalars().all() == [time(10, 20)]
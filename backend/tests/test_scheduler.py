@@ -8,6 +8,7 @@ Covers all 5 scheduler tasks:
 - _check_post_session_feedback
 """
 
+import asyncio
 from datetime import date, datetime, time, timedelta, timezone
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -18,6 +19,7 @@ from sqlalchemy import select
 from app.models.models import (
     Booking,
     BookingStatus,
+    RevenueDaily,
     SalonInfo,
     ScheduleTemplate,
     Service,
@@ -25,7 +27,7 @@ from app.models.models import (
     SlotStatus,
     User,
 )
-from tests.conftest import TestSession
+from tests.conftest import TestSession, engine_test
 
 MINSK_TZ = timezone(timedelta(hours=3))
 
@@ -49,15 +51,8 @@ class FakeDatetime(datetime):
 
 
 @pytest.fixture(autouse=True)
-def reset_scheduler_globals():
-    """Reset module-level guards between tests."""
-    import app.bot.scheduler as sched
-
-    sched._last_summary_date = None
-    sched._last_autogen_date = None
+def reset_fake_now():
     yield
-    sched._last_summary_date = None
-    sched._last_autogen_date = None
     FakeDatetime._fake_now = None
 
 
@@ -142,10 +137,8 @@ def _mock_bot():
     return mock
 
 
-def _mock_settings(admin_ids=None):
-    mock = MagicMock()
-    mock.admin_id_list = admin_ids or [446746688]
-    return mock
+def _mock_admin_ids(admin_ids=None):
+    return lambda salon_id=None: admin_ids or [446746688]
 
 
 def _set_fake_now(dt: datetime):
@@ -268,13 +261,14 @@ class TestCheckMorningSummary:
         _set_fake_now(summary_time)
 
         mock_bot = _mock_bot()
-        mock_settings = _mock_settings([446746688])
+        mock_admin_ids = _mock_admin_ids([446746688])
 
         with (
             patch("app.bot.scheduler.async_session", TestSession),
+            patch("app.bot.scheduler.read_session", lambda fallback=None: TestSession()),
             patch("app.bot.scheduler.bot", mock_bot),
             patch("app.bot.scheduler.datetime", FakeDatetime),
-            patch("app.bot.scheduler.settings", mock_settings),
+            patch("app.bot.scheduler.tenant_admin_ids", mock_admin_ids),
         ):
             from app.bot.scheduler import _check_morning_summary
             await _check_morning_summary()
@@ -284,12 +278,12 @@ class TestCheckMorningSummary:
         assert "Доброе утро" in text
 
     async def test_no_summary_outside_window(self, db, seed_reminder_data):
-        """No summary sent outside 8:00-8:01 window."""
+        """No summary sent before 8:00."""
         data = seed_reminder_data
         slot = data["slot"]
 
-        # Set to 10:00 → outside window
-        wrong_time = datetime.combine(slot.date, time(10, 0), tzinfo=MINSK_TZ)
+        # Set to 7:30 → before window
+        wrong_time = datetime.combine(slot.date, time(7, 30), tzinfo=MINSK_TZ)
         _set_fake_now(wrong_time)
 
         mock_bot = _mock_bot()
@@ -304,6 +298,42 @@ class TestCheckMorningSummary:
 
         mock_bot.send_message.assert_not_called()
 
+    async def test_summary_catches_up_missed_window(self, db, seed_reminder_data):
+        """Restarted at 10:00 without a run today → summary still sent."""
+        slot = seed_reminder_data["slot"]
+        _set_fake_now(datetime.combine(slot.date, time(10, 0), tzinfo=MINSK_TZ))
+
+        mock_bot = _mock_bot()
+
+        with (
+            patch("app.bot.scheduler.async_session", TestSession),
+            patch("app.bot.scheduler.read_session", lambda fallback=None: TestSession()),
+            patch("app.bot.scheduler.bot", mock_bot),
+            patch("app.bot.scheduler.datetime", FakeDatetime),
+            patch("app.bot.scheduler.tenant_admin_ids", _mock_admin_ids([446746688])),
+        ):
+            from app.bot.scheduler import _check_morning_summary
+            await _check_morning_summary()
+
+        mock_bot.send_message.assert_called_once()
+
+    async def test_no_summary_after_deadline(self, db, seed_reminder_data):
+        """Missed summary is not sent in the evening."""
+        slot = seed_reminder_data["slot"]
+        _set_fake_now(datetime.combine(slot.date, time(18, 0), tzinfo=MINSK_TZ))
+
+        mock_bot = _mock_bot()
+
+        with (
+            patch("app.bot.scheduler.async_session", TestSession),
+            patch("app.bot.scheduler.bot", mock_bot),
+            patch("app.bot.scheduler.datetime", FakeDatetime),
+        ):
+            from app.bot.scheduler import _check_morning_summary
+            await _check_morning_summary()
+
+        mock_bot.send_message.assert_not_called()
+
     async def test_no_duplicate_summary(self, db, seed_reminder_data):
         """Second call on the same day does not re-send."""
         data = seed_reminder_data
@@ -313,13 +343,14 @@ class TestCheckMorningSummary:
         _set_fake_now(summary_time)
 
         mock_bot = _mock_bot()
-        mock_settings = _mock_settings([446746688])
+        mock_admin_ids = _mock_admin_ids([446746688])
 
         with (
             patch("app.bot.scheduler.async_session", TestSession),
+            patch("app.bot.scheduler.read_session", lambda fallback=None: TestSession()),
             patch("app.bot.scheduler.bot", mock_bot),
             patch("app.bot.scheduler.datetime", FakeDatetime),
-            patch("app.bot.scheduler.settings", mock_settings),
+            patch("app.bot.scheduler.tenant_admin_ids", mock_admin_ids),
         ):
             from app.bot.scheduler import _check_morning_summary
             await _check_morning_summary()
@@ -337,13 +368,14 @@ class TestCheckMorningSummary:
         _set_fake_now(summary_time)
 
         mock_bot = _mock_bot()
-        mock_settings = _mock_settings([446746688])
+        mock_admin_ids = _mock_admin_ids([446746688])
 
         with (
             patch("app.bot.scheduler.async_session", TestSession),
+            patch("app.bot.scheduler.read_session", lambda fallback=None: TestSession()),
             patch("app.bot.scheduler.bot", mock_bot),
             patch("app.bot.scheduler.datetime", FakeDatetime),
-            patch("app.bot.scheduler.settings", mock_settings),
+            patch("app.bot.scheduler.tenant_admin_ids", mock_admin_ids),
         ):
             from app.bot.scheduler import _check_morning_summary
             await _check_morning_summary()
@@ -383,6 +415,14 @@ class TestAutoCompleteBookings:
             booking = result.scalar_one()
             assert booking.status == BookingStatus.completed
 
+            # Свёртка выручки обновлена в той же транзакции
+            rollup = await session.execute(
+                select(RevenueDaily.bookings).where(
+                    RevenueDaily.day == slot.date, RevenueDaily.status == BookingStatus.completed
+                )
+            )
+            assert rollup.scalar_one() == 1
+
     async def test_no_complete_future_booking(self, db, seed_reminder_data):
         """Booking stays confirmed when still in the future."""
         data = seed_reminder_data
@@ -495,6 +535,27 @@ class TestAutoGenerateSlots:
             slots = result.scalars().all()
             assert len(slots) == 3  # 10:00-10:20, 10:20-10:40, 10:40-11:00
 
+    async def test_rewarms_cache_after_generation(self, db):
+        """New days go into the response cache right after generation."""
+        tomorrow = date.today() + timedelta(days=1)
+        db.add(ScheduleTemplate(
+            day_of_week=tomorrow.weekday(),
+            start_time=time(10, 0), end_time=time(11, 0),
+            interval_minutes=20, is_active=True,
+        ))
+        await db.commit()
+        _set_fake_now(datetime.combine(date.today(), time(7, 0), tzinfo=MINSK_TZ))
+
+        with (
+            patch("app.bot.scheduler.async_session", TestSession),
+            patch("app.bot.scheduler.datetime", FakeDatetime),
+            patch("app.bot.scheduler.warm_salon", new_callable=AsyncMock) as warm,
+        ):
+            from app.bot.scheduler import _auto_generate_slots
+            await _auto_generate_slots()
+
+        warm.assert_awaited_once_with(TestSession)
+
     async def test_skips_dates_with_existing_slots(self, db):
         """No slots generated for dates that already have slots."""
         today = date.today()
@@ -551,8 +612,8 @@ class TestAutoGenerateSlots:
             slots = result.scalars().all()
             assert len(slots) == 0
 
-    async def test_only_runs_at_7am(self, db):
-        """Auto-generate returns immediately outside 7:00-7:01."""
+    async def test_only_runs_after_7am(self, db):
+        """Auto-generate returns immediately before 7:00."""
         today = date.today()
         template = ScheduleTemplate(
             day_of_week=today.weekday(),
@@ -562,8 +623,8 @@ class TestAutoGenerateSlots:
         db.add(template)
         await db.commit()
 
-        # Set time to 12:00 → outside window
-        wrong_time = datetime.combine(today, time(12, 0), tzinfo=MINSK_TZ)
+        # Set time to 6:00 → before window
+        wrong_time = datetime.combine(today, time(6, 0), tzinfo=MINSK_TZ)
         _set_fake_now(wrong_time)
 
         with (
@@ -705,3 +766,50 @@ class TestCheckPostSessionFeedback:
             await _check_post_session_feedback()
 
         mock_notify.assert_not_called()
+
+
+# ══════════════════════════════════════════════════════════════════
+#  run_scheduler_leader
+# ══════════════════════════════════════════════════════════════════
+
+
+class TestSchedulerLeaderLock:
+
+    async def test_leader_runs_scheduler(self, db):
+        """Lock acquired → scheduler loop runs on the lock connection."""
+        mock_run = AsyncMock(side_effect=asyncio.CancelledError)
+
+        with (
+            patch("app.bot.scheduler.scheduler_engine", engine_test),
+            patch("app.bot.scheduler.run_scheduler", mock_run),
+        ):
+            from app.bot.scheduler import run_scheduler_leader
+            with pytest.raises(asyncio.CancelledError):
+                await run_scheduler_leader()
+
+        mock_run.assert_called_once()
+        assert mock_run.call_args.kwargs["lock_conn"] is not None
+
+    async def test_standby_does_not_run_scheduler(self, db):
+        """Lock held elsewhere → scheduler loop is not started."""
+        mock_run = AsyncMock()
+
+        with (
+            patch("app.bot.scheduler.scheduler_engine", engine_test),
+            patch("app.bot.scheduler.run_scheduler", mock_run),
+            patch("app.bot.scheduler.try_advisory_lock", AsyncMock(return_value=False)),
+            patch("app.bot.scheduler.asyncio.sleep", AsyncMock(side_effect=asyncio.CancelledError)),
+        ):
+            from app.bot.scheduler import run_scheduler_leader
+            with pytest.raises(asyncio.CancelledError):
+                await run_scheduler_leader()
+
+        mock_run.assert_not_called()
+
+
+def test_lock_key_is_stable():
+    from app.core.locks import lock_key
+
+    assert lock_key("scheduler-leader") == lock_key("scheduler-leader")
+    assert lock_key("scheduler-leader") != lock_key("other")
+    assert -(2 ** 63) <= lock_key("scheduler-leader") < 2 ** 63
@@ -106,3 +106,96 @@ async def test_invalid_slot_status(admin_client, seed_slot):
         json={"status": "booked"},
     )
     assert r.status_code == 422
+
+
+# --- Bulk block/unblock ---
+
+
+async def test_bulk_block_skips_booked(admin_client, db, seed_slot, seed_slot_2):
+    seed_slot_2.status = SlotStatus.booked
+    await db.commit()
+
+    r = await admin_client.patch(
+        "/api/slots/bulk",
+        json={"status": "blocked", "date_from": "2026-12-25", "date_to": "2026-12-31"},
+    )
+    assert r.status_code == 200
+    assert r.json() == {"matched": 2, "updated": 1, "skipped_booked": 1, "skipped_past": 0}
+
+    await db.refresh(seed_slot)
+    await db.refresh(seed_slot_2)
+    assert seed_slot.status == SlotStatus.blocked
+    assert seed_slot_2.status == SlotStatus.booked
+
+
+async def test_bulk_time_window(admin_client, db, seed_slot, seed_slot_2):
+    """Окно времени: блокируются только слоты целиком внутри него."""
+    r = await admin_client.patch(
+        "/api/slots/bulk",
+        json={
+            "status": "blocked",
+            "date_from": "2026-12-25",
+            "date_to": "2026-12-26",
+            "start_time": "11:00",
+            "end_time": "12:00",
+        },
+    )
+    assert r.status_code == 200
+    assert r.json()["updated"] == 1
+
+    await db.refresh(seed_slot)
+    await db.refresh(seed_slot_2)
+    assert seed_slot.status == SlotStatus.available
+    assert seed_slot_2.status == SlotStatus.blocked
+
+
+async def test_bulk_unblock_skips_past(admin_client, db, seed_slot):
+    from datetime import date, time
+
+    from app.models.models import Slot
+
+    past = Slot(date=date(2026, 1, 10), start_time=time(10, 0), end_time=time(10, 20), status=SlotStatus.blocked)
+    seed_slot.status = SlotStatus.blocked
+    db.add(past)
+    await db.commit()
+
+    r = await admin_client.patch(
+        "/api/slots/bulk",
+        json={"status": "available", "date_from": "2026-01-01", "date_to": "2026-12-31"},
+    )
+    assert r.status_code == 200
+    assert r.json() == {"matched": 2, "updated": 1, "skipped_booked": 0, "skipped_past": 1}
+
+    await db.refresh(past)
+    assert past.status == SlotStatus.blocked
+
+
+async def test_bulk_invalidates_slots_cache(admin_client, client, seed_slot):
+    r = await client.get("/api/slots/", params={"date": "2026-12-25"})
+    assert len(r.json()) == 1
+
+    await admin_client.patch(
+        "/api/slots/bulk",
+        json={"status": "blocked", "date_from": "2026-12-25", "date_to": "2026-12-25"},
+    )
+    r = await client.get("/api/slots/", params={"date": "2026-12-25"})
+    assert r.json() == []
+
+
+@pytest.mark.parametrize("payload", [
+    {"status": "blocked", "date_from": "2026-12-31", "date_to": "2026-12-01"},
+    {"status": "booked", "date_from": "2026-12-01", "date_to": "2026-12-31"},
+    {"status": "blocked", "date_from": "2026-12-01", "date_to": "2026-12-31",
+     "start_time": "12:00", "end_time": "10:00"},
+])
+async def test_bulk_invalid_payload(admin_client, payload):
+    r = await admin_client.patch("/api/slots/bulk", json=payload)
+    assert r.status_code == 422
+
+
+async def test_bulk_requires_admin(client):
+    r = await client.patch(
+        "/api/slots/bulk",
+        json={"status": "blocked", "date_from": "2026-12-25", "date_to": "2026-12-25"},
+    )
+    assert r.status_code == 403
@@ -0,0 +1,56 @@
+"""Cold start budget: `python -X importtime -c "import app.main"` in a fresh process."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Бюджет холодного импорта app.main; с aiogram на пути импорта было ~6 с, без — ~1 с.
+# На медленном CI можно поднять через IMPORT_TIME_BUDGET_MS.
+IMPORT_TIME_BUDGET_MS = int(os.getenv("IMPORT_TIME_BUDGET_MS", "2500"))
+
+# Тяжёлые модули, которые нужны только боту — API не должен грузить их при импорте
+LAZY_MODULES = ("aiogram", "aiohttp")
+
+
+def _import_times(module: str) -> dict[str, int]:
+    """{модуль: cumulative микросекунды} из вывода -X importtime."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env=os.environ.copy(),
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+
+    times: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_app_main_does_not_import_bot_stack():
+    times = _import_times("app.main")
+    loaded = sorted(name for name in times if name.split(".")[0] in LAZY_MODULES)
+    assert loaded == [], f"imported eagerly: {loaded[:10]}"
+
+
+@pytest.mark.skipif(
+    "PYTEST_XDIST_WORKER" in os.environ,
+    reason="wall-clock budget is meaningless while other xdist workers load the CPU; run serially",
+)
+def test_app_main_import_time_budget():
+    times = _import_times("app.main")
+    elapsed_ms = times["app.main"] / 1000
+    assert elapsed_ms < IMPORT_TIME_BUDGET_MS, (
+        f"import app.main took {elapsed_ms:.0f} ms (budget {IMPORT_TIME_BUDGET_MS} ms)"
+    )
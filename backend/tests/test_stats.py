@@ -0,0 +1,112 @@
+"""Tests for the revenue rollup (app.core.revenue) and /api/stats."""
+
+from datetime import date, time
+
+from sqlalchemy import select
+
+from app.core import revenue
+from app.models.models import Booking, BookingStatus, RevenueDaily, Slot, SlotStatus
+
+
+async def _rollup(db) -> dict:
+    rows = (
+        await db.execute(select(RevenueDaily).execution_options(populate_existing=True))
+    ).scalars().all()
+    return {(r.day, r.status): (r.bookings, float(r.revenue)) for r in rows if r.bookings}
+
+
+async def test_create_and_cancel_update_rollup(
+    client, db, seed_user, seed_service, seed_slot, mock_notifications
+):
+    r = await client.post("/api/bookings/", json={"service_id": seed_service.id, "slot_id": seed_slot.id})
+    assert r.status_code == 200
+    assert await _rollup(db) == {(seed_slot.date, BookingStatus.confirmed): (1, 50.0)}
+
+    r = await client.patch(f"/api/bookings/{r.json()['id']}/cancel")
+    assert r.status_code == 200
+    assert await _rollup(db) == {(seed_slot.date, BookingStatus.cancelled): (1, 50.0)}
+
+
+async def test_admin_reschedule_moves_rollup_day(
+    admin_client, db, seed_user, seed_service, seed_slot, seed_slot_2, mock_notifications
+):
+    booking = Booking(client_id=seed_user.id, service_id=seed_service.id, slot_id=seed_slot.id)
+    seed_slot.status = SlotStatus.booked
+    db.add(booking)
+    await db.commit()
+    await revenue.rebuild(db)
+
+    r = await admin_client.patch(
+        f"/api/bookings/{booking.id}/admin-reschedule", json={"new_slot_id": seed_slot_2.id}
+    )
+    assert r.status_code == 200
+    assert await _rollup(db) == {(seed_slot_2.date, BookingStatus.confirmed): (1, 50.0)}
+
+
+async def test_incremental_matches_rebuild(db, seed_user, seed_service):
+    slots = [Slot(date=date(2026, 12, 20), start_time=time(10 + i, 0), end_time=time(10 + i, 20)) for i in range(3)]
+    db.add_all(slots)
+    await db.commit()
+    bookings = [Booking(client_id=seed_user.id, service_id=seed_service.id, slot_id=s.id) for s in slots]
+    db.add_all(bookings)
+    transitions = [
+        revenue.Transition(s.date, seed_service.id, seed_service.price, None, BookingStatus.confirmed)
+        for s in slots
+    ]
+    bookings[0].status = BookingStatus.completed
+    bookings[1].status = BookingStatus.cancelled
+    transitions += [
+        revenue.Transition(slots[0].date, seed_service.id, seed_service.price, BookingStatus.confirmed, BookingStatus.completed),
+        revenue.Transition(slots[1].date, seed_service.id, seed_service.price, BookingStatus.confirmed, BookingStatus.cancelled),
+    ]
+    await revenue.apply_transitions(db, transitions)
+    await db.commit()
+    incremental = await _rollup(db)
+
+    await revenue.rebuild(db)
+    assert await _rollup(db) == incremental
+    assert incremental[(date(2026, 12, 20), BookingStatus.confirmed)] == (1, 50.0)
+
+
+async def test_service_price_change_reprices_rollup(admin_client, db, seed_user, seed_service, seed_slot):
+    db.add(Booking(client_id=seed_user.id, service_id=seed_service.id, slot_id=seed_slot.id))
+    await db.commit()
+    await revenue.rebuild(db)
+
+    r = await admin_client.patch(f"/api/services/{seed_service.id}", json={"price": 70})
+    assert r.status_code == 200
+    assert await _rollup(db) == {(seed_slot.date, BookingStatus.confirmed): (1, 70.0)}
+
+
+async def test_stats_revenue_endpoint(admin_client, db, seed_service):
+    db.add_all([
+        RevenueDaily(day=date(2026, 11, 30), service_id=seed_service.id, status=BookingStatus.completed, bookings=2, revenue=100),
+        RevenueDaily(day=date(2026, 12, 1), service_id=seed_service.id, status=BookingStatus.confirmed, bookings=1, revenue=50),
+        RevenueDaily(day=date(2026, 12, 1), service_id=seed_service.id, status=BookingStatus.cancelled, bookings=3, revenue=150),
+    ])
+    await db.commit()
+
+    r = await admin_client.get(
+        "/api/stats/revenue", params={"date_from": "2026-11-01", "date_to": "2026-12-31"}
+    )
+    assert r.status_code == 200
+    assert r.json() == [
+        {"period": "2026-11-30", "bookings": 2, "revenue": 100.0, "cancelled": 0},
+        {"period": "2026-12-01", "bookings": 1, "revenue": 50.0, "cancelled": 3},
+    ]
+
+    r = await admin_client.get(
+        "/api/stats/revenue",
+        params={"date_from": "2026-01-01", "date_to": "2026-12-31", "group": "month"},
+    )
+    assert [p["period"] for p in r.json()] == ["2026-11", "2026-12"]
+
+
+async def test_stats_revenue_bad_range(admin_client):
+    r = await admin_client.get("/api/stats/revenue", params={"date_from": "2026-12-31", "date_to": "2026-01-01"})
+    assert r.status_code == 400
+
+
+async def test_stats_revenue_requires_admin(client):
+    r = await client.get("/api/stats/revenue", params={"date_from": "2026-01-01", "date_to": "2026-01-31"})
+    assert r.status_code == 403
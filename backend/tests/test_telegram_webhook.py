@@ -0,0 +1,99 @@
+"""Tests for Telegram webhook mode (POST /api/telegram/webhook)."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest_asyncio
+
+import app.bot.webhook as webhook
+
+SECRET = "test-webhook-secret"
+
+
+def _update(update_id: int = 1, text: str = "/start") -> dict:
+    """Local stand-in for a Telegram update payload."""
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 1767225600,
+            "chat": {"id": 12345, "type": "private"},
+            "from": {"id": 12345, "is_bot": False, "first_name": "Test"},
+            "text": text,
+        },
+    }
+
+
+@pytest_asyncio.fixture
+async def webhook_mode():
+    """Enable webhook mode with a mocked dispatcher."""
+    feed = AsyncMock()
+    with (
+        patch("app.core.config.settings.bot_mode", "webhook"),
+        patch("app.core.config.settings.webhook_secret", SECRET),
+        patch("app.core.config.settings.webhook_queue_size", 2),
+        patch("app.core.config.settings.webhook_workers", 1),
+        patch.object(webhook.dp, "feed_update", feed),
+    ):
+        webhook.start_webhook_workers()
+        yield feed
+        await webhook.stop_webhook_workers()
+
+
+async def test_webhook_feeds_update(client, webhook_mode):
+    r = await client.post(
+        "/api/telegram/webhook",
+        json=_update(),
+        headers={"X-Telegram-Bot-Api-Secret-Token": SECRET},
+    )
+    assert r.status_code == 200
+    await asyncio.wait_for(webhook._queue.join(), timeout=1.0)
+
+    webhook_mode.assert_called_once()
+    update = webhook_mode.call_args.args[1]
+    assert update.update_id == 1
+    assert update.message.text == "/start"
+
+
+async def test_webhook_rejects_bad_secret(client, webhook_mode):
+    r = await client.post(
+        "/api/telegram/webhook",
+        json=_update(),
+        headers={"X-Telegram-Bot-Api-Secret-Token": "wrong"},
+    )
+    assert r.status_code == 401
+    webhook_mode.assert_not_called()
+
+
+async def test_webhook_invalid_payload(client, webhook_mode):
+    r = await client.post(
+        "/api/telegram/webhook",
+        json={"message": "nope"},
+        headers={"X-Telegram-Bot-Api-Secret-Token": SECRET},
+    )
+    assert r.status_code == 400
+
+
+async def test_webhook_queue_full(client, webhook_mode):
+    """Bounded queue: overflow → 503 so Telegram retries later."""
+    blocker = asyncio.Event()
+
+    async def _slow_feed(*args, **kwargs):
+        await blocker.wait()
+
+    webhook_mode.side_effect = _slow_feed
+    headers = {"X-Telegram-Bot-Api-Secret-Token": SECRET}
+
+    statuses = []
+    for i in range(1, 5):
+        r = await client.post("/api/telegram/webhook", json=_update(i), headers=headers)
+        statuses.append(r.status_code)
+        await asyncio.sleep(0)
+
+    assert 503 in statuses
+    blocker.set()
+
+
+async def test_webhook_disabled_in_polling_mode(client):
+    r = await client.post("/api/telegram/webhook", json=_update())
+    assert r.status_code == 404
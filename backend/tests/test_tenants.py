@@ -0,0 +1,188 @@
+"""Tests for multi-tenancy: salon scoping (app.core.tenant + TenantScoped)."""
+
+import asyncio
+from datetime import date, time
+from unittest.mock import patch
+
+import pytest_asyncio
+from sqlalchemy import select
+
+from app.bot import scheduler
+from app.core import jobs
+from app.core.events import EventHub
+from app.core.tenant import (
+    Tenant,
+    current_salon_id,
+    get_tenant,
+    register_tenants,
+    reload_tenants_forever,
+    salon_for_token,
+    tenant_admin_ids,
+    use_salon,
+)
+from app.models.models import SalonInfo, Slot, SlotStatus
+from tests.conftest import TestSession
+from tests.test_cache import _init_data
+
+SALON_2 = {"X-Salon-Id": "2"}
+
+
+@pytest_asyncio.fixture
+async def two_salons(db):
+    db.add_all([SalonInfo(id=1, name="Первый"), SalonInfo(id=2, name="Второй", admin_ids="777")])
+    await db.commit()
+    tenants = [
+        Tenant(id=1, name="Первый", bot_token="1:first", admin_ids=(446746688,)),
+        Tenant(id=2, name="Второй", bot_token="2:second", admin_ids=(777,)),
+    ]
+    register_tenants(tenants)
+    yield tenants
+    register_tenants([])
+
+
+def _slot(day: date, hour: int) -> Slot:
+    return Slot(date=day, start_time=time(hour, 0), end_time=time(hour, 20), status=SlotStatus.available)
+
+
+async def test_insert_and_select_scoped_to_current_salon(db, two_salons):
+    day = date(2026, 12, 25)
+    db.add(_slot(day, 10))
+    await db.flush()  # salon_id подставляется при flush — из контекста на тот момент
+    with use_salon(2):
+        db.add(_slot(day, 10))  # то же время в другом салоне — без конфликта уникальности
+        await db.commit()
+        rows = (await db.execute(select(Slot))).scalars().all()
+    assert [s.salon_id for s in rows] == [2]
+
+    rows = (await db.execute(select(Slot))).scalars().all()
+    assert [s.salon_id for s in rows] == [1]
+
+    everything = await db.execute(select(Slot).execution_options(all_salons=True))
+    assert sorted(s.salon_id for s in everything.scalars()) == [1, 2]
+
+
+async def test_api_reads_salon_from_header(client, db, two_salons):
+    with use_salon(2):
+        db.add(_slot(date(2026, 12, 25), 12))
+        await db.commit()
+
+    r = await client.get("/api/slots/", params={"date": "2026-12-25"})
+    assert r.json() == []
+
+    r = await client.get("/api/slots/", params={"date": "2026-12-25"}, headers=SALON_2)
+    assert [s["start_time"] for s in r.json()] == ["12:00:00"]
+    assert current_salon_id() == 1  # салон запроса не протекает наружу
+
+
+async def test_unknown_salon_is_404(client, two_salons):
+    r = await client.get("/api/salon", headers={"X-Salon-Id": "99"})
+    assert r.status_code == 404
+    assert r.json()["detail"] == "Салон не найден"
+
+
+async def test_cache_is_per_salon(client, two_salons):
+    assert (await client.get("/api/salon")).json()["name"] == "Первый"
+    assert (await client.get("/api/salon", headers=SALON_2)).json()["name"] == "Второй"
+    # Повторно — уже из кэша, но каждый салон из своего
+    assert (await client.get("/api/salon")).json()["name"] == "Первый"
+
+
+async def test_admin_update_touches_only_own_salon(admin_client, db, two_salons):
+    r = await admin_client.patch("/api/salon", json={"name": "Новое имя"}, headers=SALON_2)
+    assert r.status_code == 200
+
+    names = {s.id: s.name for s in (await db.execute(select(SalonInfo))).scalars()}
+    assert names == {1: "Первый", 2: "Новое имя"}
+
+
+async def test_rate_limit_keys_by_user_with_salon_bot_token(client, two_salons):
+    """initData from salon 2's own bot is validated with its token, not BOT_TOKEN."""
+    with patch("app.core.rate_limit.settings.rate_limit", "2/minute"):
+        for user_id in (111, 222):
+            headers = {**SALON_2, "Authorization": f"tma {_init_data(user_id, '2:second')}"}
+            statuses = [(await client.get("/", headers=headers)).status_code for _ in range(3)]
+            assert statuses == [200, 200, 429]
+
+
+async def test_registry_reloads_new_salon(client, db, two_salons):
+    db.add(SalonInfo(id=3, name="Третий", admin_ids="333"))
+    await db.commit()
+    assert (await client.get("/api/salon", headers={"X-Salon-Id": "3"})).status_code == 404
+
+    # Реестр обновляется в конце load_tenants — дальше задача сразу уходит в sleep,
+    # так что отменяем её между перечитываниями, а не посреди запроса к БД
+    task = asyncio.create_task(reload_tenants_forever(TestSession, interval=0.05))
+    try:
+        for _ in range(200):
+            if get_tenant(3) is not None:
+                break
+            await asyncio.sleep(0.005)
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    assert tenant_admin_ids(3) == [333]
+    assert (await client.get("/api/salon", headers={"X-Salon-Id": "3"})).json()["name"] == "Третий"
+
+
+async def test_registry_lookups(two_salons):
+    assert tenant_admin_ids(2) == [777]
+    with use_salon(2):
+        assert tenant_admin_ids() == [777]
+    assert salon_for_token("2:second") == 2
+    assert get_tenant(99) is None
+
+
+async def test_events_do_not_cross_salons(two_salons):
+    local = EventHub()
+    async with local.subscribe(salon_id=1) as first, local.subscribe(salon_id=2) as second:
+        with use_salon(2):
+            local.publish({"type": "slot", "slot_id": 1})
+        assert first.queue.empty()
+        assert second.queue.get_nowait()["slot_id"] == 1
+
+
+async def test_scheduler_runs_tasks_per_salon(two_salons):
+    seen: list[int] = []
+
+    async def record() -> None:
+        seen.append(current_salon_id())
+
+    async def noop() -> None:
+        pass
+
+    async def registry(session_factory):
+        return two_salons
+
+    with (
+        patch("app.bot.scheduler.load_tenants", registry),
+        patch("app.bot.scheduler._check_reminders", record),
+        patch("app.bot.scheduler._check_morning_summary", noop),
+        patch("app.bot.scheduler._auto_complete_bookings", noop),
+        patch("app.bot.scheduler._auto_generate_slots", noop),
+        patch("app.bot.scheduler._check_post_session_feedback", noop),
+        patch("app.bot.scheduler._prune_job_runs", noop),
+        patch("app.bot.scheduler._prune_idempotency_keys", noop),
+        patch("app.bot.scheduler._prune_jobs", noop),
+    ):
+        await scheduler.run_scheduler_cycle()
+
+    assert sorted(seen) == [1, 2]
+    with use_salon(2):
+        assert scheduler._job_name("reminders") == "reminders@2"
+    assert scheduler._job_name("reminders") == "reminders"
+
+
+async def test_job_runs_in_its_salon(db, two_salons, monkeypatch):
+    seen: list[int] = []
+
+    async def handler(ctx):
+        seen.append(current_salon_id())
+
+    monkeypatch.setitem(jobs.HANDLERS, "tenant_test", handler)
+    with use_salon(2):
+        job = await jobs.enqueue(db, "tenant_test", {})
+
+    # Воркер общий: забирает задачу из контекста салона по умолчанию
+    await jobs.run_job(job.id, TestSession)
+    assert seen == [2]
@@ -1,22 +1,35 @@
-"""POST /api/demo/reset — полный сброс демо-данных и пересоздание с выбранным пресетом."""
+"""POST /api/demo/reset — полный сброс демо-данных и пересоздание с выбранным пресетом.
 
+Данные пресета собираются один раз в шаблон (in-memory SQLite); сброс копирует
+шаблон поверх БД песочницы посетителя через online backup API и сдвигает даты
+на сегодня.
+"""
+
+import asyncio
+import hashlib
 import logging
+import sqlite3
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import date, datetime, time, timedelta, timezone
+from time import perf_counter
 from typing import Any, Optional
 
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-from sqlalchemy import delete
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
 
+from app.core import revenue
+from app.core.cache import invalidate
 from app.core.database import get_db
+from app.core.tenant import DEFAULT_SALON_ID
 from app.models.models import (
+    Base,
     Booking,
     BookingStatus,
-    Expense,
     FaqItem,
     SalonInfo,
-    ScheduleTemplate,
     Service,
     Slot,
     SlotStatus,
@@ -99,6 +112,7 @@ def _generate_slots_for_day(
 
 def _build_salon(data: dict[str, Any]) -> SalonInfo:
     return SalonInfo(
+        id=DEFAULT_SALON_ID,
         name=data["name"],
         description=data.get("description", ""),
         address=data.get("address", ""),
@@ -137,57 +151,17 @@ def _build_faq(items: list[dict[str, Any]]) -> list[FaqItem]:
 
 
 # ---------------------------------------------------------------------------
-# Endpoint
+# Populate: пресет -> пустая БД (используется для сборки шаблонов)
 # ---------------------------------------------------------------------------
-@router.post("/reset")
-async def reset_demo(
-    body: ResetRequest,
-    db: AsyncSession = Depends(get_db),
-) -> dict[str, str]:
-    """Полный сброс демо-данных и пересоздание с выбранным пресетом.
+async def _populate(db: AsyncSession, body: ResetRequest, today: date) -> dict[str, int]:
+    """Заполняет пустую БД данными пресета, слоты — на 14 дней от today.
 
-    Удаляет ВСЕ данные из БД, затем заполняет заново:
     - 2 пользователя (клиент + админ)
     - salon_info, services, faq
     - слоты на 14 дней вперёд
     - 3 демо-записи на завтра
     """
-    # ── Validate input ────────────────────────────────────────────────
-    preset_name: str = "custom"
-
-    if body.preset and body.custom:
-        raise HTTPException(
-            status_code=400,
-            detail="Укажите либо preset, либо custom, но не оба.",
-        )
-
-    if body.preset:
-        if body.preset not in PRESETS:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Неизвестный пресет: {body.preset}. Доступные: {', '.join(PRESETS.keys())}",
-            )
-        preset_name = body.preset
-    elif not body.custom:
-        raise HTTPException(
-            status_code=400,
-            detail="Укажите preset (название пресета) или custom (свои данные).",
-        )
-
-    # ── 1. Delete ALL data (correct FK order) ─────────────────────────
-    await db.execute(delete(Booking))
-    await db.execute(delete(Slot))
-    await db.execute(delete(Service))
-    await db.execute(delete(FaqItem))
-    await db.execute(delete(SalonInfo))
-    await db.execute(delete(User))
-    await db.execute(delete(Expense))
-    await db.execute(delete(ScheduleTemplate))
-    await db.flush()
-
-    logger.info("Demo reset: all tables cleared")
-
-    # ── 2. Create demo users ──────────────────────────────────────────
+    # ── 1. Create demo users ──────────────────────────────────────────
     client_user = User(
         telegram_id=DEMO_CLIENT_TG_ID,
         username="demo_client",
@@ -209,7 +183,7 @@ async def reset_demo(
     db.add_all([client_user, admin_user])
     await db.flush()
 
-    # ── 3. Insert salon_info ──────────────────────────────────────────
+    # ── 2. Insert salon_info ──────────────────────────────────────────
     if body.preset:
         preset_data = PRESETS[body.preset]
         salon = _build_salon(preset_data["salon_data"])
@@ -217,6 +191,7 @@ async def reset_demo(
         # Custom preset
         custom = body.custom  # guaranteed not None
         salon = SalonInfo(
+            id=DEFAULT_SALON_ID,
             name=custom.name,
             description=f"Добро пожаловать в {custom.name}!",
             address=custom.address,
@@ -228,7 +203,7 @@ async def reset_demo(
     db.add(salon)
     await db.flush()
 
-    # ── 4. Insert services ────────────────────────────────────────────
+    # ── 3. Insert services ────────────────────────────────────────────
     if body.preset:
         services = _build_services(preset_data["services_data"])
     else:
@@ -258,7 +233,7 @@ async def reset_demo(
     db.add_all(services)
     await db.flush()
 
-    # ── 5. Insert FAQ ─────────────────────────────────────────────────
+    # ── 4. Insert FAQ ─────────────────────────────────────────────────
     if body.preset:
         faq_items = _build_faq(preset_data["faq_data"])
     else:
@@ -266,9 +241,7 @@ async def reset_demo(
     db.add_all(faq_items)
     await db.flush()
 
-    # ── 6. Generate slots for 14 days ─────────────────────────────────
-    today = datetime.now(MINSK_TZ).date()
-
+    # ── 5. Generate slots for 14 days ─────────────────────────────────
     if body.preset:
         wh = preset_data["working_hours"]
         start_hour = wh["start_hour"]
@@ -290,13 +263,7 @@ async def reset_demo(
     db.add_all(all_slots)
     await db.flush()
 
-    logger.info(
-        "Demo reset: generated %d slots for 14 days (interval=%d min)",
-        len(all_slots),
-        interval,
-    )
-
-    # ── 7. Create 3 demo bookings for tomorrow ───────────────────────
+    # ── 6. Create 3 demo bookings for tomorrow ───────────────────────
     tomorrow = today + timedelta(days=1)
     tomorrow_slots = [s for s in all_slots if s.date == tomorrow]
 
@@ -318,13 +285,162 @@ async def reset_demo(
             bookings_created += 1
 
     await db.commit()
+    await revenue.rebuild(db)
+    return {"services": len(services), "slots": len(all_slots), "bookings": bookings_created}
+
+
+# ---------------------------------------------------------------------------
+# Шаблоны: каждый пресет собирается один раз в in-memory SQLite
+# ---------------------------------------------------------------------------
+# Сброс = копия шаблона поверх БД песочницы через SQLite online backup API + сдвиг
+# дат слотов на "сегодня" одним UPDATE. ORM-сборка (сотни INSERT) выполняется
+# только при первом сбросе пресета после старта процесса.
+
+TEMPLATE_CACHE_SIZE = 16  # 10 пресетов + несколько последних «Своих»
+
+# Формат DateTime в SQLite у SQLAlchemy: "YYYY-MM-DD HH:MM:SS.ffffff" (%f у SQLite — "SS.SSS")
+_SQLITE_DATETIME = "%Y-%m-%d %H:%M:%f000"
+
+# SQLite проверяет uq_slot_datetime после каждой строки, а сдвинутый день может
+# совпасть с ещё не сдвинутым — поэтому даты слотов идут через временный префикс "~"
+_SHIFT_DATES_SQL = (
+    f"UPDATE slots SET date = '~' || date(date, :shift), "
+    f"starts_at = strftime('{_SQLITE_DATETIME}', starts_at, :shift), "
+    f"ends_at = strftime('{_SQLITE_DATETIME}', ends_at, :shift)",
+    "UPDATE slots SET date = substr(date, 2)",
+    "UPDATE revenue_daily SET day = date(day, :shift)",
+)
+
+
+@dataclass
+class _Template:
+    conn: sqlite3.Connection
+    anchor: date  # от какого дня сгенерированы слоты шаблона
+    stats: dict[str, int]
+
+
+_templates: OrderedDict[str, _Template] = OrderedDict()
+_reset_lock = asyncio.Lock()
+
+
+def _template_key(body: ResetRequest) -> str:
+    if body.preset:
+        return body.preset
+    digest = hashlib.sha1(body.custom.model_dump_json().encode()).hexdigest()
+    return f"custom:{digest}"
+
+
+async def _build_template(body: ResetRequest) -> _Template:
+    """Собирает пресет через ORM в отдельной in-memory БД и копирует её в sqlite3-шаблон."""
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        anchor = datetime.now(MINSK_TZ).date()
+        async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+            stats = await _populate(db, body, anchor)
+
+        # Бэкап выполняется в потоке aiosqlite — шаблону нужен check_same_thread=False
+        template = sqlite3.connect(":memory:", check_same_thread=False)
+        async with engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.backup(template)
+    finally:
+        await engine.dispose()
+    return _Template(template, anchor, stats)
+
+
+async def _get_template(body: ResetRequest) -> _Template:
+    key = _template_key(body)
+    template = _templates.get(key)
+    if template is None:
+        template = _templates[key] = await _build_template(body)
+        while len(_templates) > TEMPLATE_CACHE_SIZE:
+            _templates.popitem(last=False)[1].conn.close()
+    _templates.move_to_end(key)
+    return template
+
+
+def _restore(template: _Template, db_path: str, shift_days: int) -> None:
+    """Копирует шаблон поверх файла БД и сдвигает даты на shift_days (выполняется в потоке)."""
+    dest = sqlite3.connect(db_path)
+    try:
+        template.conn.backup(dest)
+        if shift_days:
+            params = {"shift": f"{shift_days:+d} days"}
+            for sql in _SHIFT_DATES_SQL:
+                dest.execute(sql, params)
+            dest.commit()
+    finally:
+        dest.close()
+
+
+async def restore_preset(db_path: str, body: ResetRequest) -> _Template:
+    """Заменяет содержимое файла БД копией шаблона пресета со слотами от сегодня."""
+    async with _reset_lock:
+        template = await _get_template(body)
+        shift_days = (datetime.now(MINSK_TZ).date() - template.anchor).days
+        await asyncio.to_thread(_restore, template, db_path, shift_days)
+    return template
+
+
+async def warm_templates() -> None:
+    """Собирает шаблоны всех пресетов заранее (вызывается при старте демо)."""
+    async with _reset_lock:
+        for preset in PRESETS:
+            await _get_template(ResetRequest(preset=preset))
+    logger.info("Demo templates ready: %d presets", len(PRESETS))
+
+
+# ---------------------------------------------------------------------------
+# Endpoint
+# ---------------------------------------------------------------------------
+@router.post("/reset")
+async def reset_demo(
+    body: ResetRequest,
+    db: AsyncSession = Depends(get_db),
+) -> dict[str, str]:
+    """Полный сброс демо-данных и пересоздание с выбранным пресетом.
+
+    Заменяет ВСЮ БД копией шаблона пресета (см. _populate) со слотами от сегодня.
+    """
+    # ── Validate input ────────────────────────────────────────────────
+    preset_name: str = "custom"
+
+    if body.preset and body.custom:
+        raise HTTPException(
+            status_code=400,
+            detail="Укажите либо preset, либо custom, но не оба.",
+        )
+
+    if body.preset:
+        if body.preset not in PRESETS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Неизвестный пресет: {body.preset}. Доступные: {', '.join(PRESETS.keys())}",
+            )
+        preset_name = body.preset
+    elif not body.custom:
+        raise HTTPException(
+            status_code=400,
+            detail="Укажите preset (название пресета) или custom (свои данные).",
+        )
+
+    # Файл БД берём у движка запроса: сессия ещё не открыла соединение и не держит блокировок.
+    # URL песочницы в URI-форме (file:<путь>?mode=rw) — путь без префикса
+    db_path = db.bind.url.database.removeprefix("file:")
+    started = perf_counter()
+    template = await restore_preset(db_path, body)
+    await invalidate("slots")
+    await invalidate("catalog")
 
     logger.info(
-        "Demo reset complete: preset=%s, services=%d, slots=%d, bookings=%d",
+        "Demo reset complete in %.1f ms: preset=%s, services=%d, slots=%d, bookings=%d",
+        (perf_counter() - started) * 1000,
         preset_name,
-        len(services),
-        len(all_slots),
-        bookings_created,
+        template.stats["services"],
+        template.stats["slots"],
+        template.stats["bookings"],
     )
 
     return {"status": "ok", "preset": preset_name}
@@ -0,0 +1,261 @@
+"""Песочницы демо: у каждого посетителя своя SQLite-БД и свой кэш ответов.
+
+Ключ песочницы — параметр demo_session в (фейковом) initData, его генерирует
+демо-фронтенд и хранит в localStorage. Запросы без ключа (curl из README)
+попадают в общую песочницу "shared".
+
+Песочницы живут в ограниченном пуле: при переполнении вытесняется давно не
+использованная (LRU), простаивающие дольше DEMO_SANDBOX_IDLE_MINUTES удаляются
+фоновой задачей. Занятые песочницы (идёт запрос, включая стриминг тела, или
+открыта сессия фоновой задачи) не вытесняются; если свободных нет — 503.
+Новая песочница сразу заполняется пресетом по умолчанию из шаблона
+(demo_reset.restore_preset) — копия файла, без ORM.
+
+Маршрутизация — через contextvar: SandboxMiddleware ставит песочницу запроса
+и держит её до конца ответа, а sandbox_session() и SandboxCache берут её из контекста.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import shutil
+import tempfile
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from urllib.parse import parse_qs
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.cache import CacheBackend, MemoryCache
+
+from demo.backend.demo_reset import ResetRequest, restore_preset
+
+logger = logging.getLogger(__name__)
+
+MAX_SANDBOXES = int(os.getenv("DEMO_MAX_SANDBOXES", "50"))
+IDLE_TIMEOUT_SECONDS = float(os.getenv("DEMO_SANDBOX_IDLE_MINUTES", "30")) * 60
+REAP_INTERVAL_SECONDS = 60.0
+SANDBOX_CACHE_ENTRIES = 500  # кэш ответов одной песочницы: слоты на пару недель + каталог
+DEFAULT_PRESET = "barbershop"  # совпадает с пресетом по умолчанию в DemoOverlay
+SHARED_KEY = "shared"
+
+_KEY_RE = re.compile(r"^[A-Za-z0-9_-]{8,64}$")
+
+
+@dataclass(eq=False)
+class Sandbox:
+    key: str
+    path: str
+    engine: AsyncEngine
+    session_factory: async_sessionmaker
+    cache: MemoryCache = field(default_factory=lambda: MemoryCache(SANDBOX_CACHE_ENTRIES))
+    last_used: float = field(default_factory=time.monotonic)
+    users: int = 0  # запросы и сессии, которые сейчас работают с файлом
+    closed: bool = False
+
+
+class SandboxPoolFull(Exception):
+    """Все песочницы заняты — новую создать нельзя, не вытеснив чужой запрос."""
+
+
+class SandboxPool:
+    def __init__(self, directory: str, max_size: int = MAX_SANDBOXES, idle_timeout: float = IDLE_TIMEOUT_SECONDS):
+        self.directory = directory
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._sandboxes: OrderedDict[str, Sandbox] = OrderedDict()
+        self._creating: dict[str, asyncio.Task[Sandbox]] = {}
+        self._reserved = 0  # создаются прямо сейчас: место в пуле уже занято
+
+    def __len__(self) -> int:
+        return len(self._sandboxes)
+
+    async def acquire(self, key: str) -> Sandbox:
+        """Песочница по ключу, занятая до release(); нет — создаётся (параллельные ждут одну и ту же)."""
+        while True:
+            sandbox = self._sandboxes.get(key)
+            if sandbox is None:
+                task = self._creating.get(key)
+                if task is None:
+                    task = self._creating[key] = asyncio.create_task(self._create(key))
+                    task.add_done_callback(lambda _: self._creating.pop(key, None))
+                sandbox = await task
+            # Пока ждали создания, песочницу могли вытеснить — тогда заново
+            if not sandbox.closed:
+                break
+        sandbox.users += 1
+        sandbox.last_used = time.monotonic()
+        self._sandboxes.move_to_end(key)
+        return sandbox
+
+    def release(self, sandbox: Sandbox) -> None:
+        sandbox.users -= 1
+        sandbox.last_used = time.monotonic()
+
+    async def _create(self, key: str) -> Sandbox:
+        # Место резервируется до первого await — параллельные создания не превысят max_size
+        victims = []
+        while len(self._sandboxes) + self._reserved >= self.max_size:
+            victim = next((sb for sb in self._sandboxes.values() if not sb.users), None)
+            if victim is None:
+                raise SandboxPoolFull(f"{len(self._sandboxes)} busy, {self._reserved} being created")
+            del self._sandboxes[victim.key]
+            victims.append(victim)
+        self._reserved += 1
+        try:
+            for victim in victims:
+                logger.info("Demo sandbox evicted (LRU): %s", victim.key)
+                await self._dispose(victim)
+
+            path = os.path.join(self.directory, f"{key}.db")
+            await restore_preset(path, ResetRequest(preset=DEFAULT_PRESET))
+            # NullPool: соединения с файлом открываются на запрос, у десятков
+            # простаивающих песочниц не висят потоки aiosqlite и дескрипторы.
+            # mode=rw: удалённый файл — ошибка, а не молча созданная пустая БД
+            engine = create_async_engine(
+                f"sqlite+aiosqlite:///file:{path}?mode=rw&uri=true",
+                connect_args={"check_same_thread": False},
+                poolclass=NullPool,
+            )
+            sandbox = Sandbox(key, path, engine, async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False))
+            self._sandboxes[key] = sandbox
+        finally:
+            self._reserved -= 1
+        logger.info("Demo sandbox created: %s (%d active)", key, len(self._sandboxes))
+        return sandbox
+
+    async def _dispose(self, sandbox: Sandbox) -> None:
+        sandbox.closed = True
+        await sandbox.engine.dispose()
+        try:
+            os.remove(sandbox.path)
+        except FileNotFoundError:
+            pass
+
+    async def evict_idle(self) -> int:
+        """Удаляет незанятые песочницы, простаивающие дольше idle_timeout."""
+        deadline = time.monotonic() - self.idle_timeout
+        idle = [sb for sb in self._sandboxes.values() if sb.last_used < deadline and not sb.users]
+        for sandbox in idle:
+            del self._sandboxes[sandbox.key]
+            await self._dispose(sandbox)
+        if idle:
+            logger.info("Demo sandboxes expired: %d (%d active)", len(idle), len(self._sandboxes))
+        return len(idle)
+
+    async def reap_forever(self) -> None:
+        while True:
+            await asyncio.sleep(REAP_INTERVAL_SECONDS)
+            try:
+                await self.evict_idle()
+            except Exception as e:
+                logger.warning("Demo sandbox reaper error: %s", e)
+
+    async def close(self) -> None:
+        for sandbox in self._sandboxes.values():
+            await self._dispose(sandbox)
+        self._sandboxes.clear()
+
+
+# DEMO_SANDBOX_DIR не задан — временный каталог, удаляется при остановке
+_SANDBOX_DIR = os.getenv("DEMO_SANDBOX_DIR", "")
+pool = SandboxPool(_SANDBOX_DIR or tempfile.mkdtemp(prefix="demo-sandboxes-"))
+
+_current: ContextVar[Sandbox | None] = ContextVar("demo_sandbox", default=None)
+
+
+async def close_pool() -> None:
+    await pool.close()
+    if not _SANDBOX_DIR:
+        shutil.rmtree(pool.directory, ignore_errors=True)
+
+
+def session_key(authorization: str) -> str:
+    """demo_session из initData ("tma user=...&demo_session=<key>"); иначе общая песочница."""
+    if authorization.startswith("tma "):
+        key = parse_qs(authorization[4:]).get("demo_session", [""])[0]
+        if _KEY_RE.match(key):
+            return key
+    return SHARED_KEY
+
+
+class SandboxMiddleware:
+    """Песочница запроса в контекст и занята до конца ответа — включая стриминг тела
+    (выгрузки, SSE), который идёт уже после выхода из зависимостей FastAPI."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            sandbox = await pool.acquire(session_key(Headers(scope=scope).get("authorization", "")))
+        except SandboxPoolFull as e:
+            logger.warning("Demo sandbox pool full: %s", e)
+            response = JSONResponse({"detail": "Демо перегружено, попробуйте через минуту"}, status_code=503)
+            await response(scope, receive, send)
+            return
+
+        token = _current.set(sandbox)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current.reset(token)
+            pool.release(sandbox)
+
+
+def current_sandbox() -> Sandbox:
+    sandbox = _current.get()
+    if sandbox is None:
+        raise RuntimeError("Demo sandbox is not selected for this context")
+    return sandbox
+
+
+@asynccontextmanager
+async def sandbox_session() -> AsyncIterator[AsyncSession]:
+    """Сессия песочницы текущего контекста (вместо async_sessionmaker).
+
+    Держит песочницу занятой, пока сессия открыта: фоновая задача, выполняемая
+    после ответа, не потеряет файл из-под себя.
+    """
+    sandbox = current_sandbox()
+    if sandbox.closed:
+        raise RuntimeError(f"Demo sandbox {sandbox.key} was evicted")
+    sandbox.users += 1
+    try:
+        async with sandbox.session_factory() as session:
+            yield session
+    finally:
+        pool.release(sandbox)
+
+
+class SandboxCache(CacheBackend):
+    """Кэш ответов и счётчики — отдельные у каждой песочницы, уходят вместе с ней."""
+
+    async def get(self, key: str) -> bytes | None:
+        return await current_sandbox().cache.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await current_sandbox().cache.set(key, value, ttl)
+
+    async def delete(self, *keys: str) -> None:
+        await current_sandbox().cache.delete(*keys)
+
+    async def incr(self, key: str, ttl: float | None = None) -> int:
+        return await current_sandbox().cache.incr(key, ttl)
+
+    async def single_flight(self, key: str, producer: Callable[[], Awaitable[bytes]]) -> bytes:
+        # Ключи песочниц совпадают (салон один) — склеиваем только внутри песочницы
+        return await current_sandbox().cache.single_flight(key, producer)
@@ -1,4 +1,4 @@
-import type { Booking, Expense, FaqItem, SalonInfo, ScheduleTemplate, Service, Slot, User } from "../types";
+import type { Booking, Expense, FaqItem, SalonInfo, ScheduleTemplate, Service, Slot, SlotBulkResult, BookingBulkResult, RevenuePoint, ExpenseMonthTotal, Job, LiveEvent, User } from "../types";
 
 const API_BASE = import.meta.env.VITE_API_URL || "";
 
@@ -14,16 +14,24 @@ export function setInitData(initData: string) {
   _initData = initData;
 }
 
-async function request<T>(path: string, options?: RequestInit): Promise<T> {
+/** Салон: бот открывает Mini App со ссылкой ?salon=<id> (у салона по умолчанию параметра нет) */
+const SALON_ID = new URLSearchParams(window.location.search).get("salon") || "";
+
+function authHeaders(): Record<string, string> {
+  const headers: Record<string, string> = {};
+  // Добавляем Authorization с initData для всех запросов
+  if (_initData) headers["Authorization"] = `tma ${_initData}`;
+  if (SALON_ID) headers["X-Salon-Id"] = SALON_ID;
+  return headers;
+}
+
+async function request<T>(path: string, options?: RequestInit, extraHeaders?: Record<string, string>): Promise<T> {
   const headers: Record<string, string> = {
     "Content-Type": "application/json",
+    ...authHeaders(),
+    ...extraHeaders,
   };
 
-  // Добавляем Authorization с initData для всех запросов
-  if (_initData) {
-    headers["Authorization"] = `tma ${_initData}`;
-  }
-
   const res = await fetch(`${API_BASE}${path}`, {
     ...options,
     headers,
@@ -36,10 +44,30 @@ async function request<T>(path: string, options?: RequestInit): Promise<T> {
   return res.json();
 }
 
+// --- Идемпотентные мутации ---
+// WebView в Telegram теряет ответы на плохой сети. Запись/отмена/перенос уходят с
+// Idempotency-Key: при сетевой ошибке запрос повторяется с тем же ключом, и сервер
+// возвращает сохранённый ответ, не трогая слоты и не рассылая уведомления повторно.
+const MUTATION_RETRIES = 2;
+
+async function idempotentRequest<T>(path: string, options: RequestInit): Promise<T> {
+  const key = crypto.randomUUID();
+  for (let attempt = 0; ; attempt++) {
+    try {
+      return await request<T>(path, options, { "Idempotency-Key": key });
+    } catch (e) {
+      // fetch бросает TypeError только при сетевой ошибке — ответ сервера не дошёл
+      if (!(e instanceof TypeError) || attempt >= MUTATION_RETRIES) throw e;
+      await new Promise((resolve) => setTimeout(resolve, 500 * (attempt + 1)));
+    }
+  }
+}
+
 // --- Stale-while-revalidate cache (TTL: 1 hour) ---
 const CACHE_TTL_MS = 60 * 60 * 1000;
 
 function cachedGet<T>(path: string, cacheKey: string): { cached: T | null; fresh: Promise<T> } {
+  if (SALON_ID) cacheKey = `${cacheKey}_${SALON_ID}`;
   let cached: T | null = null;
   try {
     const raw = localStorage.getItem(cacheKey);
@@ -114,7 +142,7 @@ export const getSlotAvailability = (from: string, to: string) =>
 
 // Bookings — telegram_id берётся из initData
 export const createBooking = (service_id: number, slot_id: number, remind_before_hours: number = 2) =>
-  request<Booking>("/api/bookings/", {
+  idempotentRequest<Booking>("/api/bookings/", {
     method: "POST",
     body: JSON.stringify({ service_id, slot_id, remind_before_hours }),
   });
@@ -125,7 +153,7 @@ export const getMyBookings = () =>
   request<Booking[]>("/api/bookings/my");
 
 export const cancelBooking = (bookingId: number) =>
-  request<Booking>(`/api/bookings/${bookingId}/cancel`, {
+  idempotentRequest<Booking>(`/api/bookings/${bookingId}/cancel`, {
     method: "PATCH",
   });
 
@@ -153,12 +181,51 @@ export const generateSlots = (
     }),
   });
 
+/** Генерация слотов по шаблонам на диапазон дат — фоновая задача, статус через getJob */
+export const generateSlotsRange = (dateFrom: string, dateTo: string) =>
+  request<Job>("/api/slots/generate-range", {
+    method: "POST",
+    body: JSON.stringify({ date_from: dateFrom, date_to: dateTo }),
+  });
+
+export const getJob = (jobId: string) => request<Job>(`/api/jobs/${jobId}`);
+
 export const updateSlot = (slotId: number, status: string) =>
   request<Slot>(`/api/slots/${slotId}`, {
     method: "PATCH",
     body: JSON.stringify({ status }),
   });
 
+export const bulkUpdateSlots = (
+  status: "available" | "blocked",
+  dateFrom: string,
+  dateTo: string,
+  startTime?: string,
+  endTime?: string,
+) =>
+  request<SlotBulkResult>("/api/slots/bulk", {
+    method: "PATCH",
+    body: JSON.stringify({
+      status,
+      date_from: dateFrom,
+      date_to: dateTo,
+      start_time: startTime ?? null,
+      end_time: endTime ?? null,
+    }),
+  });
+
+export const bulkCancelBookings = (dateFrom: string, dateTo: string, blockSlots = true) =>
+  request<BookingBulkResult>("/api/bookings/admin-bulk-cancel", {
+    method: "PATCH",
+    body: JSON.stringify({ date_from: dateFrom, date_to: dateTo, block_slots: blockSlots }),
+  });
+
+export const bulkRescheduleBookings = (dateFrom: string, dateTo: string, shiftDays: number, blockSlots = true) =>
+  request<BookingBulkResult>("/api/bookings/admin-bulk-reschedule", {
+    method: "PATCH",
+    body: JSON.stringify({ date_from: dateFrom, date_to: dateTo, shift_days: shiftDays, block_slots: blockSlots }),
+  });
+
 export const getAllBookings = (date?: string, status?: string, limit?: number) => {
   const params = new URLSearchParams();
   if (date) params.set("date", date);
@@ -169,12 +236,12 @@ export const getAllBookings = (date?: string, status?: string, limit?: number) =
 };
 
 export const adminCancelBooking = (bookingId: number) =>
-  request<Booking>(`/api/bookings/${bookingId}/admin-cancel`, {
+  idempotentRequest<Booking>(`/api/bookings/${bookingId}/admin-cancel`, {
     method: "PATCH",
   });
 
 export const adminRescheduleBooking = (bookingId: number, newSlotId: number) =>
-  request<Booking>(`/api/bookings/${bookingId}/admin-reschedule`, {
+  idempotentRequest<Booking>(`/api/bookings/${bookingId}/admin-reschedule`, {
     method: "PATCH",
     body: JSON.stringify({ new_slot_id: newSlotId }),
   });
@@ -257,3 +324,60 @@ export const upsertScheduleTemplates = (templates: Omit<ScheduleTemplate, "id">[
     method: "PUT",
     body: JSON.stringify({ templates }),
   });
+
+// Статистика — из свёртки revenue_daily
+export const getRevenue = (dateFrom: string, dateTo: string, group: "day" | "month" = "day") =>
+  request<RevenuePoint[]>(`/api/stats/revenue?date_from=${dateFrom}&date_to=${dateTo}&group=${group}`);
+
+export const getExpenseTotals = (monthFrom: string, monthTo: string) =>
+  request<ExpenseMonthTotal[]>(`/api/expenses/totals?month_from=${monthFrom}&month_to=${monthTo}`);
+
+// --- Live events (SSE) ---
+// EventSource не умеет слать Authorization, поэтому поток читаем через fetch.
+const EVENTS_RETRY_MS = 3000;
+
+export function subscribeEvents(onEvent: (event: LiveEvent) => void): () => void {
+  const controller = new AbortController();
+
+  const connect = async () => {
+    let reconnect = false;
+    while (!controller.signal.aborted) {
+      try {
+        const res = await fetch(`${API_BASE}/api/events/`, {
+          headers: authHeaders(),
+          signal: controller.signal,
+        });
+        if (!res.ok || !res.body) throw new Error(res.statusText);
+
+        // Пока соединения не было, события могли быть пропущены — пусть экран перечитает данные
+        if (reconnect) onEvent({ type: "resync" });
+        reconnect = true;
+
+        const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+        let buffer = "";
+        for (;;) {
+          const { value, done } = await reader.read();
+          if (done) break;
+          buffer += value;
+          let sep: number;
+          while ((sep = buffer.indexOf("\n\n")) !== -1) {
+            const block = buffer.slice(0, sep);
+            buffer = buffer.slice(sep + 2);
+            const data = block
+              .split("\n")
+              .filter((line) => line.startsWith("data: "))
+              .map((line) => line.slice(6))
+              .join("\n");
+            if (data) onEvent(JSON.parse(data) as LiveEvent);
+          }
+        }
+      } catch {
+        if (controller.signal.aborted) return;
+      }
+      await new Promise((r) => setTimeout(r, EVENTS_RETRY_MS));
+    }
+  };
+
+  connect();
+  return () => controller.abort();
+}
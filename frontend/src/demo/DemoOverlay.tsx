@@ -72,7 +72,11 @@ const EMPTY_SERVICE: CustomService = { name: "", price: "", duration: "" };
 async function resetDemo(body: Record<string, unknown>): Promise<unknown> {
   const res = await fetch(`${API_BASE}/api/demo/reset`, {
     method: "POST",
-    headers: { "Content-Type": "application/json" },
+    headers: {
+      "Content-Type": "application/json",
+      // initData carries demo_session — the reset hits this visitor's sandbox only
+      Authorization: `tma ${window.Telegram?.WebApp?.initData ?? ""}`,
+    },
     body: JSON.stringify(body),
   });
   if (!res.ok) {
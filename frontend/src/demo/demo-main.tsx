@@ -9,6 +9,22 @@ import DemoOverlay from "./DemoOverlay";
 const DEMO_CLIENT_ID = 1000001;
 const DEMO_ADMIN_ID = 1000002;
 
+const DEMO_SESSION_KEY = "demo_session";
+
+/**
+ * Per-visitor sandbox key: the demo backend gives every key its own SQLite DB,
+ * so one visitor's bookings and resets are invisible to others.
+ * Persisted in localStorage — a page reload keeps the same sandbox.
+ */
+function demoSessionId(): string {
+  let id = localStorage.getItem(DEMO_SESSION_KEY);
+  if (!id) {
+    id = crypto.randomUUID();
+    localStorage.setItem(DEMO_SESSION_KEY, id);
+  }
+  return id;
+}
+
 /**
  * Build a fake initData query string (mimics Telegram's WebApp.initData format).
  * The demo backend validates with SKIP_TELEGRAM_VALIDATION=true,
@@ -25,7 +41,7 @@ function buildFakeInitData(
     first_name: firstName,
   });
   const authDate = Math.floor(Date.now() / 1000);
-  return `user=${encodeURIComponent(user)}&auth_date=${authDate}&hash=demo_hash`;
+  return `user=${encodeURIComponent(user)}&auth_date=${authDate}&demo_session=${demoSessionId()}&hash=demo_hash`;
 }
 
 /**
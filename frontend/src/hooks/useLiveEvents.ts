@@ -0,0 +1,11 @@
+import { useEffect, useRef } from "react";
+import { subscribeEvents } from "../api/client";
+import type { LiveEvent } from "../types";
+
+/** Подписка на живые события на время жизни компонента. handler может меняться между рендерами. */
+export function useLiveEvents(handler: (event: LiveEvent) => void) {
+  const handlerRef = useRef(handler);
+  handlerRef.current = handler;
+
+  useEffect(() => subscribeEvents((event) => handlerRef.current(event)), []);
+}
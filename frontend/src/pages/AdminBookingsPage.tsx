@@ -1,5 +1,6 @@
 import { useEffect, useState, useCallback } from "react";
 import { getAllBookings, adminCancelBooking, getAllSlots, adminRescheduleBooking } from "../api/client";
+import { useLiveEvents } from "../hooks/useLiveEvents";
 import type { Booking, Slot } from "../types";
 import { todayMinsk } from "../utils/timezone";
 import { ChevronLeft, ChevronRight, CalendarClock } from "lucide-react";
@@ -70,6 +71,15 @@ export default function AdminBookingsPage() {
     load(selectedDate);
   }, [selectedDate, load]);
 
+  // Новые/отменённые/перенесённые записи появляются без ручного обновления
+  useLiveEvents((event) => {
+    const onThisDay =
+      event.type === "booking" && (event.date === selectedDate || event.old_date === selectedDate);
+    if (onThisDay || event.type === "resync") {
+      getAllBookings(selectedDate, "confirmed").then(setBookings).catch(() => {});
+    }
+  });
+
   const handleCancel = async (bookingId: number, clientName: string) => {
     if (!confirm(`Отменить запись клиента ${clientName}?`)) return;
     setCancellingId(bookingId);
@@ -1,5 +1,5 @@
 import { useEffect, useState } from "react";
-import { getAllSlots, generateSlots, updateSlot, getAllBookings, adminCancelBooking, getScheduleTemplates } from "../api/client";
+import { getAllSlots, generateSlots, generateSlotsRange, getJob, updateSlot, bulkUpdateSlots, bulkCancelBookings, getAllBookings, adminCancelBooking, getScheduleTemplates } from "../api/client";
 import type { Slot, Booking, ScheduleTemplate } from "../types";
 import Calendar from "../components/Calendar";
 import TimeGrid from "../components/TimeGrid";
@@ -15,6 +15,16 @@ function getTemplateForDate(dateStr: string, templates: ScheduleTemplate[]): Sch
   return templates.find(t => t.day_of_week === dow && t.is_active) || null;
 }
 
+/** YYYY-MM-DD + days, без timezone-сдвига */
+function addDays(dateStr: string, days: number): string {
+  const [y, m, d] = dateStr.split("-").map(Number);
+  const dt = new Date(y, m - 1, d + days);
+  return `${dt.getFullYear()}-${String(dt.getMonth() + 1).padStart(2, "0")}-${String(dt.getDate()).padStart(2, "0")}`;
+}
+
+const RANGE_DAYS = 28;
+const JOB_POLL_MS = 1500;
+
 const DEFAULT_START_H = 8, DEFAULT_START_M = 30, DEFAULT_END_H = 21, DEFAULT_END_M = 0, DEFAULT_INTERVAL = 20;
 
 export default function AdminPage() {
@@ -79,6 +89,28 @@ export default function AdminPage() {
     }
   };
 
+  const handleGenerateRange = async () => {
+    if (!selectedDate) return;
+    setLoading(true);
+    setError("");
+    try {
+      let job = await generateSlotsRange(selectedDate, addDays(selectedDate, RANGE_DAYS - 1));
+      while (job.status === "queued" || job.status === "running") {
+        setSuccess(`Создаю слоты на ${RANGE_DAYS} дней... ${job.progress}%`);
+        await new Promise((r) => setTimeout(r, JOB_POLL_MS));
+        job = await getJob(job.id);
+      }
+      if (job.status === "failed") throw new Error(job.error || "Ошибка генерации");
+      setSuccess(`Создано слотов: ${job.result?.created ?? 0} (дней: ${job.result?.days ?? 0})`);
+      await loadSlots(selectedDate);
+    } catch (e) {
+      setSuccess("");
+      setError(e instanceof Error ? e.message : "Ошибка");
+    } finally {
+      setLoading(false);
+    }
+  };
+
   const handleSlotToggle = async (slot: Slot) => {
     if (slot.status === "booked" || togglingIds.has(slot.id)) return;
     const newStatus = slot.status === "available" ? "blocked" : "available";
@@ -94,6 +126,42 @@ export default function AdminPage() {
     }
   };
 
+  const handleDayToggle = async (status: "available" | "blocked") => {
+    if (!selectedDate) return;
+    setLoading(true);
+    setError("");
+    try {
+      const res = await bulkUpdateSlots(status, selectedDate, selectedDate);
+      const action = status === "blocked" ? "Заблокировано" : "Открыто";
+      setSuccess(
+        `${action} слотов: ${res.updated}` +
+          (res.skipped_booked ? `, занятых пропущено: ${res.skipped_booked}` : ""),
+      );
+      await loadSlots(selectedDate);
+    } catch (e) {
+      setError(e instanceof Error ? e.message : "Ошибка");
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  const handleCloseDay = async () => {
+    if (!selectedDate) return;
+    if (!confirm(`Отменить все записи на ${selectedDate} и закрыть день?`)) return;
+    setLoading(true);
+    setError("");
+    try {
+      const res = await bulkCancelBookings(selectedDate, selectedDate);
+      setSuccess(`Отменено записей: ${res.processed}`);
+      await loadBookings(selectedDate);
+      await loadSlots(selectedDate);
+    } catch (e) {
+      setError(e instanceof Error ? e.message : "Ошибка отмены");
+    } finally {
+      setLoading(false);
+    }
+  };
+
   const handleAdminCancel = async (bookingId: number, clientName: string) => {
     if (!confirm(`Отменить запись клиента ${clientName}?`)) return;
     setCancellingId(bookingId);
@@ -144,14 +212,27 @@ export default function AdminPage() {
               <button className="btn" onClick={handleGenerate} disabled={loading}>
                 {loading ? "Создаю..." : `Создать слоты (${scheduleLabel})`}
               </button>
+              <button className="btn btn-sm btn-outline" style={{ marginTop: 8 }} onClick={handleGenerateRange} disabled={loading}>
+                По шаблонам на {RANGE_DAYS} дней вперёд
+              </button>
             </div>
           ) : (
-            <TimeGrid
-              slots={slots}
-              selectedSlotId={null}
-              onSelect={handleSlotToggle}
-              mode="admin"
-            />
+            <>
+              <TimeGrid
+                slots={slots}
+                selectedSlotId={null}
+                onSelect={handleSlotToggle}
+                mode="admin"
+              />
+              <div style={{ display: "flex", gap: 8, marginTop: 12 }}>
+                <button className="btn btn-sm btn-outline" onClick={() => handleDayToggle("blocked")} disabled={loading}>
+                  Заблокировать день
+                </button>
+                <button className="btn btn-sm btn-outline" onClick={() => handleDayToggle("available")} disabled={loading}>
+                  Открыть день
+                </button>
+              </div>
+            </>
           )}
 
           {dateBookings.length > 0 && (
@@ -159,6 +240,16 @@ export default function AdminPage() {
               <div className="section-title" style={{ marginTop: 16 }}>
                 Записи на {selectedDate}
               </div>
+              {dateBookings.some((b) => b.status === "confirmed") && (
+                <button
+                  className="btn btn-sm btn-danger"
+                  style={{ marginBottom: 8 }}
+                  onClick={handleCloseDay}
+                  disabled={loading}
+                >
+                  Отменить все записи дня
+                </button>
+              )}
               {dateBookings.map((b) => (
                 <div key={b.id} className="booking-card">
                   <div className="booking-header">
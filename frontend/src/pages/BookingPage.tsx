@@ -1,6 +1,7 @@
 import { useEffect, useReducer, useRef, useState } from "react";
 import { useLocation } from "react-router-dom";
 import { getServicesCached, getSlots, createBooking, updateProfile } from "../api/client";
+import { useLiveEvents } from "../hooks/useLiveEvents";
 import type { Service, Slot, User } from "../types";
 import Calendar from "../components/Calendar";
 import TimeGrid from "../components/TimeGrid";
@@ -123,6 +124,28 @@ export default function BookingPage({ user, onUserUpdate }: Props) {
       .finally(() => setSlotsLoading(false));
   }, [selectedDate]);
 
+  // Живые изменения слотов: занятые пропадают сразу, а не после ошибки "Слот уже занят"
+  useLiveEvents((event) => {
+    if (!selectedDate) return;
+    const refetch = () => getSlots(selectedDate).then(setSlots).catch(() => {});
+    if (event.type === "slot" && event.date === selectedDate) {
+      if (event.status === "available") {
+        refetch();
+        return;
+      }
+      setSlots((prev) => prev.filter((s) => s.id !== event.slot_id));
+      if (selectedSlot?.id === event.slot_id) {
+        setSelectedSlot(null);
+        setError("Это время только что заняли — выберите другое");
+      }
+    } else if (
+      (event.type === "days" && event.date_from <= selectedDate && selectedDate <= event.date_to) ||
+      event.type === "resync"
+    ) {
+      refetch();
+    }
+  });
+
   useEffect(() => {
     if (selectedSlot && bookBtnRef.current) {
       const timer = setTimeout(() => {
@@ -1,6 +1,6 @@
 import { useEffect, useMemo, useState } from "react";
-import { getAllBookings, getExpenses, createExpense, deleteExpense } from "../api/client";
-import type { Booking, Expense } from "../types";
+import { getAllBookings, getExpenses, createExpense, deleteExpense, getRevenue } from "../api/client";
+import type { Booking, Expense, RevenuePoint } from "../types";
 import { todayMinsk, daysAgoMinsk, currentMonthMinsk } from "../utils/timezone";
 import { ChevronLeft, ChevronRight, X } from "lucide-react";
 
@@ -20,12 +20,27 @@ function shiftMonth(month: string, delta: number): string {
   return `${d.getFullYear()}-${String(d.getMonth() + 1).padStart(2, "0")}`;
 }
 
+function lastDayOfMonth(month: string): string {
+  const [y, m] = month.split("-").map(Number);
+  return `${month}-${String(new Date(y, m, 0).getDate()).padStart(2, "0")}`;
+}
+
+function sumPoints(points: RevenuePoint[], from: string, to: string) {
+  const inRange = points.filter((p) => p.period >= from && p.period <= to);
+  return {
+    count: inRange.reduce((s, p) => s + p.bookings, 0),
+    revenue: inRange.reduce((s, p) => s + p.revenue, 0),
+  };
+}
+
 function formatMoney(n: number): string {
   return n.toLocaleString("ru-RU") + " BYN";
 }
 
 export default function StatsPage() {
   const [bookings, setBookings] = useState<Booking[]>([]);
+  const [daily, setDaily] = useState<RevenuePoint[]>([]);
+  const [monthPoint, setMonthPoint] = useState<RevenuePoint | null>(null);
   const [expenses, setExpenses] = useState<Expense[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
@@ -46,40 +61,48 @@ export default function StatsPage() {
       .finally(() => setLoading(false));
   }, []);
 
-  // Load expenses when month changes
+  const today = todayMinsk();
+  const weekStart = daysAgoMinsk(6);
+  const monthStart = daysAgoMinsk(29);
+
+  // Выручка за последние 30 дней — по дням из свёртки
+  useEffect(() => {
+    getRevenue(monthStart, today)
+      .then(setDaily)
+      .catch(() => setError("Ошибка загрузки статистики"));
+  }, [monthStart, today]);
+
+  // Load expenses and month totals when month changes
   useEffect(() => {
     getExpenses(selectedMonth)
       .then(setExpenses)
       .catch(() => setExpenses([]));
+    getRevenue(`${selectedMonth}-01`, lastDayOfMonth(selectedMonth), "month")
+      .then((points) => setMonthPoint(points[0] ?? null))
+      .catch(() => setMonthPoint(null));
   }, [selectedMonth]);
 
-  // Revenue calculations — memoized to avoid O(n)*9 on each render
   const revenueBookings = useMemo(
     () => bookings.filter((b) => b.status === "confirmed" || b.status === "completed"),
     [bookings],
   );
 
-  const today = todayMinsk();
-  const weekStart = daysAgoMinsk(6);
-  const monthStart = daysAgoMinsk(29);
-
-  const { todayBookings, todayRevenue, weekBookings, weekRevenue, monthBookings, monthRevenue } =
-    useMemo(() => {
-      const tb = revenueBookings.filter((b) => b.slot.date === today);
-      const wb = revenueBookings.filter((b) => b.slot.date >= weekStart && b.slot.date <= today);
-      const mb = revenueBookings.filter((b) => b.slot.date >= monthStart && b.slot.date <= today);
-      return {
-        todayBookings: tb,
-        todayRevenue: tb.reduce((s, b) => s + b.service.price, 0),
-        weekBookings: wb,
-        weekRevenue: wb.reduce((s, b) => s + b.service.price, 0),
-        monthBookings: mb,
-        monthRevenue: mb.reduce((s, b) => s + b.service.price, 0),
-      };
-    }, [revenueBookings, today, weekStart, monthStart]);
+  const { todayCount, todayRevenue, weekCount, weekRevenue, monthCount, monthRevenue } = useMemo(() => {
+    const t = sumPoints(daily, today, today);
+    const w = sumPoints(daily, weekStart, today);
+    const m = sumPoints(daily, monthStart, today);
+    return {
+      todayCount: t.count,
+      todayRevenue: t.revenue,
+      weekCount: w.count,
+      weekRevenue: w.revenue,
+      monthCount: m.count,
+      monthRevenue: m.revenue,
+    };
+  }, [daily, today, weekStart, monthStart]);
 
   // Client stats for selected month
-  const { totalClients, newClients, returningClients, monthCancelled, selectedMonthRevenue } =
+  const { totalClients, newClients, returningClients } =
     useMemo(() => {
       const monthClientBookings = revenueBookings.filter((b) => b.slot.date.startsWith(selectedMonth));
       const monthClientIds = new Set(monthClientBookings.map((b) => b.client.telegram_id));
@@ -93,19 +116,16 @@ export default function StatsPage() {
       }
 
       const nc = [...monthClientIds].filter((id) => firstBookingMonth.get(id) === selectedMonth).length;
-      const cancelled = bookings.filter(
-        (b) => b.status === "cancelled" && b.slot.date.startsWith(selectedMonth),
-      ).length;
-      const smRevenue = monthClientBookings.reduce((s, b) => s + b.service.price, 0);
 
       return {
         totalClients: monthClientIds.size,
         newClients: nc,
         returningClients: monthClientIds.size - nc,
-        monthCancelled: cancelled,
-        selectedMonthRevenue: smRevenue,
       };
-    }, [revenueBookings, bookings, selectedMonth]);
+    }, [revenueBookings, selectedMonth]);
+
+  const monthCancelled = monthPoint?.cancelled ?? 0;
+  const selectedMonthRevenue = monthPoint?.revenue ?? 0;
 
   // Expenses
   const expensesTotal = useMemo(() => expenses.reduce((s, e) => s + e.amount, 0), [expenses]);
@@ -159,17 +179,17 @@ export default function StatsPage() {
         <div className="stats-card">
           <div className="stats-card-label">Сегодня</div>
           <div className="stats-card-value">{formatMoney(todayRevenue)}</div>
-          <div className="stats-card-count">{todayBookings.length} зап.</div>
+          <div className="stats-card-count">{todayCount} зап.</div>
         </div>
         <div className="stats-card">
           <div className="stats-card-label">Неделя</div>
           <div className="stats-card-value">{formatMoney(weekRevenue)}</div>
-          <div className="stats-card-count">{weekBookings.length} зап.</div>
+          <div className="stats-card-count">{weekCount} зап.</div>
         </div>
         <div className="stats-card">
           <div className="stats-card-label">Месяц</div>
           <div className="stats-card-value">{formatMoney(monthRevenue)}</div>
-          <div className="stats-card-count">{monthBookings.length} зап.</div>
+          <div className="stats-card-count">{monthCount} зап.</div>
         </div>
       </div>
 
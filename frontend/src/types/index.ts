@@ -28,6 +28,51 @@ export interface Slot {
   status: string;
 }
 
+/** События GET /api/events (Server-Sent Events) */
+export type LiveEvent =
+  | { type: "slot"; date: string; slot_id: number; start_time: string; end_time: string; status: string }
+  | { type: "days"; date_from: string; date_to: string }
+  | { type: "booking"; action: "created" | "cancelled" | "rescheduled"; booking_id: number; date: string; old_date?: string }
+  | { type: "resync" };
+
+export interface Job {
+  id: string;
+  kind: string;
+  status: "queued" | "running" | "done" | "failed";
+  progress: number;
+  message: string;
+  result: Record<string, number> | null;
+  error: string | null;
+  created_at: string;
+  started_at: string | null;
+  finished_at: string | null;
+}
+
+export interface ExpenseMonthTotal {
+  month: string;
+  total: number;
+  count: number;
+}
+
+export interface RevenuePoint {
+  period: string;
+  bookings: number;
+  revenue: number;
+  cancelled: number;
+}
+
+export interface BookingBulkResult {
+  processed: number;
+  skipped: number[];
+}
+
+export interface SlotBulkResult {
+  matched: number;
+  updated: number;
+  skipped_booked: number;
+  skipped_past: number;
+}
+
 export interface Booking {
   id: number;
   status: string;